@@ -0,0 +1,199 @@
+"""计时精度基准：用虚拟时钟模拟一周的提醒，统计触发抖动、节拍漂移、唤醒次数和倒计时漂移
+
+虚拟时钟跳过空闲时间，但在派发回调期间随真实 CPU 时间前进，所以回调本身的耗时
+（抽取提示语、提交提示音、通知界面）会计入后续提醒的延迟。操作系统唤醒计时线程和
+Tk after() 回调的延迟按 --wake-latency-ms（指数分布均值）和 --spike-rate 的偶发尖峰模拟。
+超过任一阈值时以状态码 1 退出，可用于发现性能回退。
+
+    python benchmarks/bench_accuracy.py --days 7 --json accuracy.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tigan_core.countdown import Countdown
+from tigan_core.reminder import ReminderCore
+from tigan_core.scheduler import TimerEngine
+
+# 2026-10-19 00:00（星期一，本地时间），让规则提醒覆盖完整的一周
+EPOCH = time.mktime((2026, 10, 19, 0, 0, 0, 0, 0, -1))
+MAIN_INTERVAL = 45
+PROFILES = [
+    {"name": "提肛", "interval": 60, "countdown": 60},
+    {"name": "站起来", "interval": 30, "countdown": 30},
+    {"name": "护眼", "interval": 20, "countdown": 20},
+    {"name": "工作日", "schedule": "every 45m mon-fri 09:00-18:00 skip 12:00-13:00", "countdown": 60},
+]
+
+
+class VirtualClock:
+    """空闲时直接跳到下一次唤醒，执行代码时随真实时间前进"""
+
+    def __init__(self):
+        self._base = 0.0
+        self._mark = time.perf_counter()
+
+    def __call__(self):
+        return self._base + (time.perf_counter() - self._mark)
+
+    def wall(self):
+        return EPOCH + self()
+
+    def skip_to(self, t):
+        if t > self():
+            self._base = t
+            self._mark = time.perf_counter()
+
+
+class LatencyModel:
+    def __init__(self, mean_ms, spike_rate, spike_ms, seed):
+        self.mean = mean_ms / 1000
+        self.spike_rate = spike_rate
+        self.spike = spike_ms / 1000
+        self.rng = random.Random(seed)
+
+    def sample(self):
+        latency = self.rng.expovariate(1 / self.mean) if self.mean > 0 else 0.0
+        if self.rng.random() < self.spike_rate:
+            latency += self.spike
+        return latency
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {}
+    pick = lambda q: samples[min(len(samples) - 1, int(len(samples) * q))]
+    return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": samples[-1]}
+
+
+def simulate_countdown(seconds, latency):
+    """按界面的方式驱动 Countdown：每次按 next_tick_ms() 安排下一次刷新，回调带有模拟的延迟"""
+    clock = VirtualClock()
+    session = Countdown(seconds, clock=clock)
+    while session.tick() > 0:
+        clock.skip_to(clock() + session.next_tick_ms() / 1000 + latency.sample())
+    report = session.finish()
+    return report["drift"], report["max_tick_lateness"], report["ticks"]
+
+
+def run(args):
+    clock = VirtualClock()
+    engine = TimerEngine(clock=clock, wall_clock=clock.wall)
+    latency = LatencyModel(args.wake_latency_ms, args.spike_rate, args.spike_ms, args.seed)
+    fires = []
+    countdowns = []
+    # 固定间隔的计划：第 k 次触发的截止时间应当正好是起点加 k 个间隔；
+    # 每个计划记录 [第一次的截止时间, 已触发次数, 最大偏差]
+    cadence = {}
+
+    def on_reminder(msg, profile):
+        schedule = profile.schedule if profile is not None else core.schedule
+        fires.append(clock() - schedule.last_deadline)
+        if profile is None or profile.rule is None:
+            entry = cadence.setdefault(schedule.name, [schedule.last_deadline, 0, 0.0])
+            entry[2] = max(entry[2], abs(schedule.last_deadline - (entry[0] + entry[1] * schedule.interval)))
+            entry[1] += 1
+        countdowns.append(profile.countdown if profile is not None else 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_file = os.path.join(tmp, "messages.json")
+        with open(config_file, "w", encoding="utf-8") as f:
+            json.dump({"messages": ["提肛 10 秒", "站起来走走", "看看远处"], "profiles": PROFILES}, f,
+                      ensure_ascii=False)
+        core = ReminderCore(on_reminder=on_reminder, config_file=config_file, engine=engine, history_dir=None)
+        core.load_config()
+        core.start(MAIN_INTERVAL)
+
+        end = args.days * 86400
+        wakeups = 0
+        begin = time.perf_counter()
+        while True:
+            deadline = engine.next_deadline()
+            if deadline is None or deadline > end:
+                break
+            clock.skip_to(deadline + latency.sample())
+            engine.run_due()
+            wakeups += 1
+        elapsed = time.perf_counter() - begin
+        core.shutdown()
+
+    drifts, tick_lateness = [], []
+    countdown_latency = LatencyModel(args.wake_latency_ms, args.spike_rate, args.spike_ms, args.seed + 1)
+    for seconds in countdowns[:args.countdowns]:
+        drift, lateness, _ = simulate_countdown(seconds, countdown_latency)
+        drifts.append(drift)
+        tick_lateness.append(lateness)
+
+    cadence_drift = max((entry[2] for entry in cadence.values()), default=0.0)
+    return {
+        "days": args.days,
+        "fires": len(fires),
+        "sim_seconds": elapsed,
+        "latency_ms": {k: v * 1000 for k, v in percentiles(fires).items()},
+        "cadence_drift_ms": cadence_drift * 1000,
+        "wakeups": wakeups,
+        "wakeups_per_fire": wakeups / len(fires) if fires else 0.0,
+        "legacy_wakeups": int(args.days * 86400),
+        "countdowns": len(drifts),
+        "countdown_drift_ms": {k: v * 1000 for k, v in percentiles(drifts).items()},
+        "countdown_tick_lateness_ms": {k: v * 1000 for k, v in percentiles(tick_lateness).items()},
+    }
+
+
+def check(result, args):
+    """返回超出阈值的项目"""
+    failures = []
+    if result["latency_ms"].get("p99", 0.0) > args.max_p99_ms:
+        failures.append(f"提醒延迟 p99 {result['latency_ms']['p99']:.2f}ms > {args.max_p99_ms}ms")
+    if result["cadence_drift_ms"] > args.max_cadence_drift_ms:
+        failures.append(f"节拍漂移 {result['cadence_drift_ms']:.3f}ms > {args.max_cadence_drift_ms}ms")
+    if result["wakeups_per_fire"] > args.max_wakeups_per_fire:
+        failures.append(f"每次提醒唤醒 {result['wakeups_per_fire']:.2f} 次 > {args.max_wakeups_per_fire}")
+    if abs(result["countdown_drift_ms"].get("p99", 0.0)) > args.max_countdown_drift_ms:
+        failures.append(f"倒计时漂移 p99 {result['countdown_drift_ms']['p99']:.2f}ms > {args.max_countdown_drift_ms}ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=float, default=7, help="模拟的天数")
+    parser.add_argument("--wake-latency-ms", type=float, default=1.0, help="唤醒延迟的均值（毫秒）")
+    parser.add_argument("--spike-rate", type=float, default=0.005, help="出现延迟尖峰的概率")
+    parser.add_argument("--spike-ms", type=float, default=20.0, help="延迟尖峰的大小（毫秒）")
+    parser.add_argument("--countdowns", type=int, default=200, help="模拟的倒计时次数")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-p99-ms", type=float, default=50.0, help="提醒延迟 p99 的阈值（毫秒）")
+    parser.add_argument("--max-cadence-drift-ms", type=float, default=1.0, help="固定间隔节拍漂移的阈值（毫秒）")
+    parser.add_argument("--max-wakeups-per-fire", type=float, default=1.5, help="每次提醒唤醒次数的阈值")
+    parser.add_argument("--max-countdown-drift-ms", type=float, default=50.0, help="倒计时漂移 p99 的阈值（毫秒）")
+    parser.add_argument("--json", default=None, help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    result = run(args)
+    lat, cd = result["latency_ms"], result["countdown_drift_ms"]
+    print(f"模拟 {result['days']:g} 天，{result['fires']} 次提醒，耗时 {result['sim_seconds']:.2f} 秒")
+    print(f"提醒延迟: p50 {lat['p50']:.2f}ms  p90 {lat['p90']:.2f}ms  p99 {lat['p99']:.2f}ms  最大 {lat['max']:.2f}ms")
+    print(f"固定间隔节拍漂移: 最大 {result['cadence_drift_ms']:.3f}ms")
+    print(f"计时线程唤醒: {result['wakeups']} 次（每次提醒 {result['wakeups_per_fire']:.2f} 次，"
+          f"旧版每秒轮询 {result['legacy_wakeups']} 次）")
+    print(f"倒计时漂移（{result['countdowns']} 次）: p50 {cd['p50']:.2f}ms  p99 {cd['p99']:.2f}ms  最大 {cd['max']:.2f}ms，"
+          f"单次刷新最大延迟 {result['countdown_tick_lateness_ms']['max']:.2f}ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    failures = check(result, args)
+    for failure in failures:
+        print(f"超出阈值: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""配置加载基准：10 到 100k 条提示语时，旧版解析、首次加载和命中缓存加载的耗时
+
+首次加载相当于进程启动后的第一次读取（解析 JSON + O(1) 结构检查），
+命中缓存相当于配置未变化时的再次加载（只有一次 os.stat）。
+
+    python benchmarks/bench_config_load.py --sizes 10,1000,10000,100000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tigan_core.config import DEFAULT_MESSAGES, clear_parse_cache, default_config, load_config, write_config
+
+
+def legacy_load(path):
+    """复刻 v1.0.4 load_messages 的读取和格式检查（不含打印）"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    loaded_config = json.loads(content)
+    if isinstance(loaded_config, dict):
+        messages = loaded_config.get("messages", DEFAULT_MESSAGES)
+        if isinstance(messages, list) and messages:
+            return messages
+    return DEFAULT_MESSAGES
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - begin)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,1000,10000,100000", help="逗号分隔的提示语数量")
+    parser.add_argument("--repeat", type=int, default=5, help="每项取最好成绩的重复次数")
+    args = parser.parse_args()
+
+    print("{:>8} {:>10} {:>12} {:>12} {:>12}".format("提示语数", "文件大小", "旧版解析", "首次加载", "命中缓存"))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "messages.json")
+        for n in (int(x) for x in args.sizes.split(",")):
+            config = default_config()
+            config["messages"] = [f"{DEFAULT_MESSAGES[i % len(DEFAULT_MESSAGES)]} #{i}" for i in range(n)]
+            write_config(path, config)
+
+            legacy_ms = best_of(lambda: legacy_load(path), args.repeat)
+
+            def cold():
+                clear_parse_cache()
+                load_config(path)
+            cold_ms = best_of(cold, args.repeat)
+            warm_ms = best_of(lambda: load_config(path), args.repeat)
+
+            size_kb = os.path.getsize(path) / 1024
+            print("{:>8} {:>8.1f}KB {:>10.3f}ms {:>10.3f}ms {:>10.3f}ms".format(n, size_kb, legacy_ms, cold_ms, warm_ms))
+
+
+if __name__ == "__main__":
+    main()
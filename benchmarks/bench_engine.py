@@ -0,0 +1,101 @@
+"""TimerEngine 扩展性基准：1 到 100k 个计划的内存占用、操作耗时和派发延迟
+
+    python benchmarks/bench_engine.py --sizes 1,10,100,1000,10000,100000 --window 2
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tigan_core.scheduler import TimerEngine
+
+
+def percentile(sorted_samples, q):
+    if not sorted_samples:
+        return float("nan")
+    return sorted_samples[min(len(sorted_samples) - 1, int(len(sorted_samples) * q))]
+
+
+def noop(schedule):
+    pass
+
+
+def bench_memory_and_ops(n):
+    """添加 n 个计划时每个计划的内存占用，以及 add/reschedule/cancel 的平均耗时"""
+    engine = TimerEngine()
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    schedules = [engine.add(3600 + i, noop) for i in range(n)]
+    per_schedule = (tracemalloc.get_traced_memory()[0] - base) / n
+    tracemalloc.stop()
+
+    # tracemalloc 会拖慢分配，耗时在另一个引擎上单独测量
+    engine = TimerEngine()
+    begin = time.perf_counter()
+    schedules = [engine.add(3600 + i, noop) for i in range(n)]
+    add_us = (time.perf_counter() - begin) * 1e6 / n
+
+    picks = random.sample(schedules, min(n, 1000))
+    begin = time.perf_counter()
+    for schedule in picks:
+        engine.reschedule(schedule, interval=7200)
+    reschedule_us = (time.perf_counter() - begin) * 1e6 / len(picks)
+
+    begin = time.perf_counter()
+    for schedule in picks:
+        engine.cancel(schedule)
+    cancel_us = (time.perf_counter() - begin) * 1e6 / len(picks)
+    return per_schedule, add_us, reschedule_us, cancel_us
+
+
+def bench_dispatch(n, window):
+    """n 个计划的首次触发均匀分布在 window 秒内，由计时线程派发，统计派发延迟"""
+    engine = TimerEngine()
+    lateness = []
+    done = threading.Event()
+
+    def on_fire(schedule):
+        lateness.append(time.monotonic() - schedule.data)
+        if len(lateness) >= n:
+            done.set()
+
+    # 预留添加全部计划所需的时间，保证计时线程启动时第一个计划尚未到期
+    start = time.monotonic() + 0.05 + n * 2e-5
+    for i in range(n):
+        delay = start - time.monotonic() + window * i / n
+        schedule = engine.add(3600, on_fire, delay=delay)
+        schedule.data = schedule.deadline
+    threads_before = threading.active_count()
+    engine.start()
+    threads_during = threading.active_count()
+    done.wait(window * 5 + 10)
+    engine.stop(timeout=1)
+    samples = sorted(x * 1000 for x in lateness)
+    return (len(samples), percentile(samples, 0.5), percentile(samples, 0.99),
+            samples[-1] if samples else float("nan"), threads_during - threads_before)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,10,100,1000,10000,100000", help="逗号分隔的计划数量")
+    parser.add_argument("--window", type=float, default=2.0, help="首次触发分布的时间窗口（秒）")
+    args = parser.parse_args()
+
+    header = ("计划数", "内存/计划", "add", "reschedule", "cancel", "派发数", "延迟p50", "延迟p99", "延迟max", "线程")
+    print("{:>8} {:>10} {:>9} {:>11} {:>9} {:>8} {:>9} {:>9} {:>9} {:>5}".format(*header))
+    for n in (int(x) for x in args.sizes.split(",")):
+        per_schedule, add_us, reschedule_us, cancel_us = bench_memory_and_ops(n)
+        count, p50, p99, worst, threads = bench_dispatch(n, args.window)
+        print("{:>8} {:>9.0f}B {:>7.2f}us {:>9.2f}us {:>7.2f}us {:>8} {:>7.3f}ms {:>7.3f}ms {:>7.3f}ms {:>5}".format(
+            n, per_schedule, add_us, reschedule_us, cancel_us, count, p50, p99, worst, threads))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""配置与提示语 I/O 基准：10、1k、100k、1M 条提示语时加载、保存、编辑解析和抽取的耗时与峰值内存
+
+提示语按 DEFAULT_MESSAGES 的风格生成：中文夹杂大量 emoji（包括 🧘‍♂️ 这样的组合序列）。
+- 加载：清空解析缓存后的 load_config（进程启动后第一次读取）
+- 保存：ConfigWriter 从 submit() 到写入完成（序列化、摘要、原子写入），以及 submit() 本身阻塞调用方的时间
+- 编辑解析：编辑窗口填充文本（messages_to_text）和点击保存时的拆分（parse_messages_text）
+- 抽取：第一次 pick_message（建立抽取器、计算提示语摘要）和之后每次抽取（含把抽取状态提交给后台线程）
+耗时取 --repeat 次中的最好成绩（100k 以上只测一次），峰值内存在单独的一次运行中用 tracemalloc 测量。
+结果可用 --json 保存，--baseline 指定以前保存的结果时输出耗时比值。
+
+    python benchmarks/bench_io.py --sizes 10,1000,100000,1000000 --json io.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tigan_core.config import (DEFAULT_MESSAGES, ConfigWriter, clear_parse_cache, default_config, load_config,
+                               messages_to_text, parse_messages_text, write_config)
+from tigan_core.reminder import ReminderCore
+
+EMOJI = ["💪", "🍑", "🕵️", "😄", "🧘‍♂️", "🌈", "🏋️", "🚽", "☯️", "🚀", "👨‍👩‍👧", "🇨🇳", "✨", "🔥"]
+# 超过这个数量时每项只测一次
+LARGE = 100000
+TIME_KEYS = ("load_ms", "save_ms", "submit_ms", "to_text_ms", "parse_ms", "first_pick_ms", "pick_us")
+
+
+def make_messages(n, seed=1):
+    rng = random.Random(seed)
+    messages = []
+    for i in range(n):
+        base = DEFAULT_MESSAGES[i % len(DEFAULT_MESSAGES)]
+        cjk = "".join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(rng.randint(4, 16)))
+        emoji = "".join(rng.choice(EMOJI) for _ in range(rng.randint(1, 4)))
+        messages.append(f"{base} {cjk}{emoji} #{i}")
+    return messages
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - begin)
+    return best
+
+
+def peak_mb(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def bench_size(n, repeat, draws, tmp):
+    repeat = repeat if n <= LARGE else 1
+    path = os.path.join(tmp, f"messages-{n}.json")
+    config = default_config()
+    config["messages"] = make_messages(n)
+    write_config(path, config)
+    result = {"n": n, "file_bytes": os.path.getsize(path)}
+
+    def load():
+        clear_parse_cache()
+        load_config(path)
+    result["load_ms"] = best_of(load, repeat) * 1000
+    result["load_peak_mb"] = peak_mb(load)
+
+    writer = ConfigWriter(path, debounce=0)
+    themes = iter(["light", "dark"] * (repeat + 2))
+
+    def save():
+        # 每次修改一个字段，避免内容相同被跳过
+        config["theme"] = next(themes)
+        writer.submit(config)
+        writer.flush()
+    result["save_ms"] = best_of(save, repeat) * 1000
+    result["save_peak_mb"] = peak_mb(save)
+    begin = time.perf_counter()
+    writer.submit(config)
+    result["submit_ms"] = (time.perf_counter() - begin) * 1000
+    writer.close()
+
+    messages = config["messages"]
+    text = messages_to_text(messages)
+    result["to_text_ms"] = best_of(lambda: messages_to_text(messages), repeat) * 1000
+    result["parse_ms"] = best_of(lambda: parse_messages_text(text), repeat) * 1000
+    result["parse_peak_mb"] = peak_mb(lambda: parse_messages_text(text))
+    assert parse_messages_text(text) == messages
+
+    core = ReminderCore(config_file=path, history_dir=None)
+    core.load_config()
+    core.pick_message()  # 让 load_config 之外的一次性开销（例如导入）不计入
+
+    def first_pick():
+        core.messages = list(messages)
+        core.pick_message()
+    result["first_pick_ms"] = best_of(first_pick, repeat) * 1000
+    result["first_pick_peak_mb"] = peak_mb(first_pick)
+    begin = time.perf_counter()
+    for _ in range(draws):
+        core.pick_message()
+    result["pick_us"] = (time.perf_counter() - begin) / draws * 1e6
+    core.shutdown()
+    return result
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {row["n"]: row for row in json.load(f)["results"]}
+    print(f"\n与 {baseline_path} 的耗时比值（>1 表示变慢）:")
+    print("{:>8} ".format("提示语数") + " ".join("{:>13}".format(key) for key in TIME_KEYS))
+    for row in results:
+        old = baseline.get(row["n"])
+        if old is None:
+            continue
+        ratios = [row[key] / old[key] if old.get(key) else float("nan") for key in TIME_KEYS]
+        print("{:>8} ".format(row["n"]) + " ".join("{:>13.2f}".format(r) for r in ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,1000,100000,1000000", help="逗号分隔的提示语数量")
+    parser.add_argument("--repeat", type=int, default=5, help="每项取最好成绩的重复次数")
+    parser.add_argument("--draws", type=int, default=200, help="测量每次抽取耗时的抽取次数")
+    parser.add_argument("--json", default=None, help="把结果写入 JSON 文件")
+    parser.add_argument("--baseline", default=None, help="与以前保存的 JSON 结果比较")
+    args = parser.parse_args()
+
+    print("{:>8} {:>9} {:>16} {:>16} {:>9} {:>9} {:>16} {:>16} {:>9}".format(
+        "提示语数", "文件", "加载(峰值)", "保存(峰值)", "submit", "填充文本", "编辑解析(峰值)", "首次抽取(峰值)", "每次抽取"))
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (int(x) for x in args.sizes.split(",")):
+            r = bench_size(n, args.repeat, args.draws, tmp)
+            results.append(r)
+            print("{:>8} {:>7.1f}MB {:>8.1f}ms({:>5.1f}M) {:>8.1f}ms({:>5.1f}M) {:>7.3f}ms {:>7.1f}ms "
+                  "{:>8.1f}ms({:>5.1f}M) {:>8.1f}ms({:>5.1f}M) {:>7.1f}us".format(
+                      n, r["file_bytes"] / (1024 * 1024), r["load_ms"], r["load_peak_mb"], r["save_ms"],
+                      r["save_peak_mb"], r["submit_ms"], r["to_text_ms"], r["parse_ms"], r["parse_peak_mb"],
+                      r["first_pick_ms"], r["first_pick_peak_mb"], r["pick_us"]))
+
+    if args.json:
+        meta = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                "platform": platform.platform()}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
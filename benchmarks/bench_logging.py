@@ -0,0 +1,60 @@
+"""日志基准：调用方每次输出的耗时——旧版 print、被过滤的 debug 日志和写入队列的 info 日志
+
+旧版 print 输出到 /dev/null（相当于无控制台的打包程序）；日志写入临时目录中的轮转文件，
+调用方只把记录放入队列，格式化和磁盘 I/O 在后台线程中进行。
+
+    python benchmarks/bench_logging.py --calls 100000
+"""
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tigan_core.config import default_config
+from tigan_core.log import setup_logging, shutdown_logging
+
+
+def per_call_us(func, calls):
+    begin = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - begin) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100000, help="每项的调用次数")
+    args = parser.parse_args()
+
+    config = default_config()
+    path = os.path.abspath(__file__)
+    log = logging.getLogger("bench")
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        legacy_print = per_call_us(lambda: print(f"资源路径: {path}, 文件存在: {os.path.exists(path)}"), args.calls)
+        legacy_config = per_call_us(lambda: print(f"配置已加载: {config}"), args.calls)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_logging("INFO", log_file=os.path.join(tmp, "bench.log"), console=False)
+        disabled = per_call_us(lambda: log.debug("配置已加载: %s", config), args.calls)
+        guarded = per_call_us(
+            lambda: log.isEnabledFor(logging.DEBUG) and log.debug("文件存在: %s", os.path.exists(path)), args.calls)
+        enabled = per_call_us(lambda: log.info("资源路径: %s", path), args.calls)
+        begin = time.perf_counter()
+        shutdown_logging()
+        drain_ms = (time.perf_counter() - begin) * 1000
+
+    print(f"旧版 print（含 os.path.exists）: {legacy_print:.3f}us/次")
+    print(f"旧版 print（整个配置）:          {legacy_config:.3f}us/次")
+    print(f"被过滤的 debug（整个配置）:     {disabled:.3f}us/次")
+    print(f"被过滤的 debug（含 exists）:    {guarded:.3f}us/次")
+    print(f"写入队列的 info:                {enabled:.3f}us/次（后台线程写完剩余日志 {drain_ms:.1f}ms）")
+
+
+if __name__ == "__main__":
+    main()
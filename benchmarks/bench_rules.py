@@ -0,0 +1,74 @@
+"""时间规则基准：稀疏和密集规则的编译耗时、计算下一次触发和连续产生 N 次触发的耗时
+
+对照组是逐分钟扫描直到找到下一次触发的朴素做法（只对较小的查询次数测量）。
+
+    python benchmarks/bench_rules.py --queries 100000 --count 1000
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tigan_core.rules import compile_rule
+
+RULES = (
+    ("密集", "every 1m"),
+    ("工作日", "every 45m mon-fri 09:00-18:00 skip 12:00-13:00"),
+    ("护眼", "every 20m 08:30-12:00 13:30-17:30"),
+    ("稀疏", "every 30m sat 10:00-11:00"),
+    ("每周一次", "at 09:00 mon"),
+)
+
+
+def naive_next(rule, after):
+    """逐分钟向后扫描，检查该分钟是否是触发时刻"""
+    fires = [set(table) for table in rule._tables]
+    t = datetime.datetime.fromtimestamp(after).replace(second=0, microsecond=0)
+    while True:
+        t += datetime.timedelta(minutes=1)
+        if t.hour * 3600 + t.minute * 60 in fires[t.weekday()]:
+            return t.timestamp()
+
+
+def per_call_us(func, args_list):
+    begin = time.perf_counter()
+    for args in args_list:
+        func(args)
+    return (time.perf_counter() - begin) / len(args_list) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=100000, help="计算下一次触发的查询次数")
+    parser.add_argument("--naive-queries", type=int, default=200, help="逐分钟扫描对照组的查询次数")
+    parser.add_argument("--count", type=int, default=1000, help="连续产生的触发次数")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    now = time.time()
+    # 查询时间均匀分布在未来一年内
+    queries = [now + rng.random() * 365 * 86400 for _ in range(args.queries)]
+
+    print("{:>8} {:>8} {:>10} {:>12} {:>14} {:>16}".format(
+        "规则", "每周次数", "编译", "下一次", "逐分钟扫描", f"连续 {args.count} 次"))
+    for label, text in RULES:
+        begin = time.perf_counter()
+        rule = compile_rule(text)
+        compile_ms = (time.perf_counter() - begin) * 1000
+        next_us = per_call_us(rule.next_fire, queries)
+        naive_us = per_call_us(lambda after: naive_next(rule, after), queries[:args.naive_queries])
+        for after in queries[:args.naive_queries]:
+            assert naive_next(rule, after) == rule.next_fire(after), text
+        begin = time.perf_counter()
+        rule.next_fires(now, args.count)
+        iter_ms = (time.perf_counter() - begin) * 1000
+        print("{:>8} {:>8} {:>8.2f}ms {:>10.2f}us {:>12.1f}us {:>14.2f}ms".format(
+            label, rule.fires_per_week(), compile_ms, next_us, naive_us, iter_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""提示语抽取基准：10 到 1M 条提示语时各抽取方式的建表耗时和每次抽取耗时
+
+对照组是旧版的 random.choice；洗牌袋的建表耗时是新一轮生成排列密钥和第一次抽取的耗时，
+恢复耗时是在一轮抽到一半时从保存的状态恢复（直接定位，不重放）所需的时间。
+
+    python benchmarks/bench_sampler.py --sizes 10,1000,100000,1000000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tigan_core.sampler import ShuffleBag, make_sampler
+
+
+def timed(func):
+    begin = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - begin) * 1000
+
+
+def per_draw_us(draw, rounds):
+    begin = time.perf_counter()
+    for _ in range(rounds):
+        draw()
+    return (time.perf_counter() - begin) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,1000,100000,1000000", help="逗号分隔的提示语数量")
+    parser.add_argument("--draws", type=int, default=100000, help="测量每次抽取耗时的抽取次数")
+    parser.add_argument("--window", type=int, default=5, help="最近记录窗口大小")
+    args = parser.parse_args()
+
+    print("{:>8} {:>16} {:>12} {:>12}".format("提示语数", "方式", "建表", "每次抽取"))
+    for n in (int(x) for x in args.sizes.split(",")):
+        items = list(range(n))
+        choice_us = per_draw_us(lambda: random.choice(items), args.draws)
+        print("{:>8} {:>16} {:>12} {:>10.3f}us".format(n, "random.choice", "-", choice_us))
+
+        weights = [random.random() + 0.01 for _ in range(n)]
+        for mode, w in (("shuffle", None), ("random", None), ("weighted", weights)):
+            sampler, build_ms = timed(lambda: make_sampler(mode, n, w, args.window))
+            if mode == "shuffle":
+                # 洗牌袋在第一次抽取时才生成这一轮的排列
+                _, build_ms = timed(sampler.draw)
+            draw_us = per_draw_us(sampler.draw, args.draws)
+            print("{:>8} {:>16} {:>10.1f}ms {:>10.3f}us".format(n, f"{mode}(窗口{sampler.window})", build_ms, draw_us))
+
+        bag = ShuffleBag(n, args.window)
+        for _ in range(n // 2 or 1):
+            bag.draw()
+        state = json.loads(json.dumps(bag.state()))
+        _, restore_ms = timed(lambda: ShuffleBag(n, args.window).restore(state))
+        print("{:>8} {:>16} {:>10.1f}ms".format(n, "shuffle 恢复", restore_ms))
+
+
+if __name__ == "__main__":
+    main()
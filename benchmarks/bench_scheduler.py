@@ -0,0 +1,129 @@
+"""对比旧版每秒轮询计时循环与 TimerEngine 的唤醒次数和触发抖动
+
+时间按比例压缩：--scale 表示模拟的一分钟对应多少真实秒数，
+旧版循环的 time.sleep(1) 也按同样比例缩短。
+
+    python benchmarks/bench_scheduler.py --minutes 60 --scale 0.02 --cycles 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tigan_core.scheduler import TimerEngine
+
+
+class LegacyTimer:
+    """复刻 v1.0.4 中 run_timer 的轮询循环"""
+
+    def __init__(self, callback, interval_minutes, tick):
+        self.callback = callback
+        self.interval_minutes = interval_minutes
+        self.tick = tick
+        self.running = False
+        self.thread = None
+        self.wakeups = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run_timer, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        self.running = False
+        if timeout is not None and self.thread:
+            self.thread.join(timeout)
+
+    def run_timer(self):
+        while self.running:
+            for i in range(self.interval_minutes * 60):
+                if not self.running:
+                    return
+                time.sleep(self.tick)
+                self.wakeups += 1
+            if self.running:
+                self.callback()
+
+
+class EngineTimer:
+    """只包含一个计划的 TimerEngine，对外提供与 LegacyTimer 相同的接口"""
+
+    def __init__(self, callback, interval):
+        self.engine = TimerEngine()
+        self.callback = callback
+        self.interval = interval
+
+    @property
+    def wakeups(self):
+        return self.engine.wakeups
+
+    def start(self):
+        self.engine.start()
+        self.engine.add(self.interval, lambda schedule: self.callback())
+
+    def stop(self, timeout=None):
+        self.engine.stop(timeout)
+
+
+def summarize(samples_ms):
+    samples = sorted(samples_ms)
+    if not samples:
+        return "n/a"
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return "mean={:.3f}ms p50={:.3f}ms p95={:.3f}ms max={:.3f}ms".format(
+        statistics.mean(samples), statistics.median(samples), p95, samples[-1])
+
+
+def measure(name, make_timer, interval, cycles, minutes):
+    fire_times = []
+    done = threading.Event()
+
+    def on_fire():
+        fire_times.append(time.monotonic())
+        if len(fire_times) >= cycles:
+            done.set()
+
+    timer = make_timer(on_fire)
+    start = time.monotonic()
+    timer.start()
+    done.wait(interval * cycles * 3 + 5)
+
+    # 触发抖动：相对理想触发时刻 start + k * interval 的偏差
+    jitter = [abs(t - (start + (k + 1) * interval)) * 1000 for k, t in enumerate(fire_times)]
+
+    stop_begin = time.perf_counter()
+    timer.stop(timeout=5)
+    stop_latency = (time.perf_counter() - stop_begin) * 1000
+
+    wakeups_per_cycle = timer.wakeups / max(1, len(fire_times))
+    wakeups_per_hour = wakeups_per_cycle * 60 / minutes
+    print(f"[{name}]")
+    print(f"  触发次数: {len(fire_times)}/{cycles}")
+    print(f"  每小时唤醒次数: {wakeups_per_hour:.1f}")
+    print(f"  触发抖动: {summarize(jitter)}")
+    print(f"  停止延迟: {stop_latency:.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=int, default=60, help="模拟的提醒间隔（分钟）")
+    parser.add_argument("--scale", type=float, default=0.02, help="模拟一分钟对应的真实秒数")
+    parser.add_argument("--cycles", type=int, default=5, help="每种实现触发的提醒次数")
+    args = parser.parse_args()
+
+    interval = args.minutes * args.scale
+    tick = args.scale / 60
+    print(f"模拟间隔 {args.minutes} 分钟 -> 实际 {interval:.3f}s，旧版轮询周期 {tick * 1000:.3f}ms")
+
+    measure("legacy run_timer", lambda cb: LegacyTimer(cb, args.minutes, tick),
+            interval, args.cycles, args.minutes)
+    measure("TimerEngine", lambda cb: EngineTimer(cb, interval),
+            interval, args.cycles, args.minutes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""对比每次 music.load 重新解码与 SoundCache 常驻内存两种方式的提示音播放延迟
+
+没有声卡的环境可以使用 SDL 的 dummy 音频驱动（默认）：
+
+    python benchmarks/bench_sound.py --runs 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from tigan_core.audio import SoundCache, load_pygame
+from tigan_core.resources import SOUND_FILE
+
+
+def legacy_play(pygame, sound_file):
+    """复刻 v1.0.4 的播放方式：每次都检查文件并重新加载解码"""
+    if not os.path.exists(sound_file):
+        return False
+    pygame.mixer.music.load(sound_file)
+    pygame.mixer.music.play()
+    return True
+
+
+def summarize(name, samples):
+    samples = sorted(x * 1000 for x in samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"[{name}] mean={statistics.mean(samples):.3f}ms p50={statistics.median(samples):.3f}ms "
+          f"p95={p95:.3f}ms max={samples[-1]:.3f}ms stdev={statistics.pstdev(samples):.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50, help="每种方式的播放次数")
+    parser.add_argument("--sound", default=SOUND_FILE, help="提示音文件")
+    args = parser.parse_args()
+
+    pygame = load_pygame()
+    if pygame is None:
+        print("pygame 不可用，无法运行该基准")
+        return 1
+
+    legacy = []
+    for _ in range(args.runs):
+        deadline = time.monotonic()
+        legacy_play(pygame, args.sound)
+        legacy.append(time.monotonic() - deadline)
+        pygame.mixer.music.stop()
+
+    cache = SoundCache(args.sound)
+    begin = time.perf_counter()
+    cache.load()
+    print(f"首次解码耗时: {(time.perf_counter() - begin) * 1000:.3f}ms")
+    cached = []
+    for _ in range(args.runs):
+        cache.play(time.monotonic())
+        cached.append(cache.last_latency)
+        pygame.mixer.stop()
+
+    summarize("music.load 每次解码", legacy)
+    summarize("SoundCache", cached)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
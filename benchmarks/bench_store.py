@@ -0,0 +1,86 @@
+"""提示语包基准：JSON 列表与内存映射提示语包的加载耗时、常驻内存和随机抽取耗时
+
+JSON 列表对应 messages.json 中的 messages，需要整体读入并解析；提示语包只映射文件，
+首次打开时建立偏移索引（写入 .idx），之后再次打开直接复用索引。
+
+    python benchmarks/bench_store.py --sizes 10000,100000,1000000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tigan_core.config import DEFAULT_MESSAGES
+from tigan_core.store import MessageStore, write_pack
+
+
+def measure_load(func):
+    """返回 (结果, 耗时毫秒, 加载后仍占用的 Python 内存 KB)"""
+    tracemalloc.start()
+    begin = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - begin) * 1000
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current / 1024
+
+
+def per_pick_us(pick, rounds):
+    begin = time.perf_counter()
+    for _ in range(rounds):
+        pick()
+    return (time.perf_counter() - begin) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="逗号分隔的提示语数量")
+    parser.add_argument("--picks", type=int, default=10000, help="测量随机抽取的次数")
+    args = parser.parse_args()
+
+    print("{:>8} {:>6} {:>12} {:>12} {:>12} {:>10}".format("提示语数", "方式", "加载", "增量索引", "Python内存", "每次抽取"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (int(x) for x in args.sizes.split(",")):
+            messages = [f"{DEFAULT_MESSAGES[i % len(DEFAULT_MESSAGES)]} #{i}" for i in range(n)]
+            json_path = os.path.join(tmp, f"messages-{n}.json")
+            pack_path = os.path.join(tmp, f"messages-{n}.txt")
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump({"messages": messages}, f, ensure_ascii=False)
+            write_pack(pack_path, messages)
+            del messages
+
+            def load_json():
+                with open(json_path, "r", encoding="utf-8") as f:
+                    return json.load(f)["messages"]
+            loaded, json_ms, json_kb = measure_load(load_json)
+            json_pick = per_pick_us(lambda: random.choice(loaded), args.picks)
+            del loaded
+            print("{:>8} {:>6} {:>10.1f}ms {:>12} {:>10.0f}KB {:>8.2f}us".format(
+                n, "JSON", json_ms, "-", json_kb, json_pick))
+
+            begin = time.perf_counter()
+            MessageStore(pack_path).close()
+            build_ms = (time.perf_counter() - begin) * 1000
+            store, reuse_ms, store_kb = measure_load(lambda: MessageStore(pack_path))
+            # 追加 1% 的提示语，只扫描新增部分
+            with open(pack_path, "a", encoding="utf-8") as f:
+                for i in range(max(1, n // 100)):
+                    f.write(f"追加的提示语 #{i}\n")
+            begin = time.perf_counter()
+            store.refresh()
+            append_ms = (time.perf_counter() - begin) * 1000
+            store_pick = per_pick_us(store.pick, args.picks)
+            store.close()
+            print("{:>8} {:>6} {:>10.1f}ms {:>10.1f}ms {:>10.0f}KB {:>8.2f}us".format(
+                n, "建索引", build_ms, append_ms, store_kb, store_pick))
+            print("{:>8} {:>6} {:>10.1f}ms".format(n, "复用", reuse_ms))
+
+
+if __name__ == "__main__":
+    main()
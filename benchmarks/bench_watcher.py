@@ -0,0 +1,69 @@
+"""配置热重载基准：从修改 messages.json 到新配置生效的延迟，以及空闲时检测的 CPU 开销
+
+    python benchmarks/bench_watcher.py --rounds 5 --idle 10
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tigan_core.config import atomic_write, default_config, dump_config
+from tigan_core.reminder import ReminderCore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5, help="修改配置文件的次数")
+    parser.add_argument("--idle", type=float, default=10.0, help="测量空闲开销的秒数")
+    parser.add_argument("--min-interval", type=float, default=0.2, help="检测的最小间隔（秒）")
+    parser.add_argument("--max-interval", type=float, default=2.0, help="检测的最大间隔（秒）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "messages.json")
+        changed = threading.Event()
+        core = ReminderCore(config_file=path, on_config_change=lambda keys: changed.set())
+        core.watcher.min_interval = args.min_interval
+        core.watcher.max_interval = args.max_interval
+        core.load_config()
+        core.watch_config()
+
+        latencies = []
+        for i in range(args.rounds):
+            # 等检测间隔退避到最大值，测量最坏情况下的延迟
+            time.sleep(args.max_interval * 2)
+            config = default_config()
+            config["messages"] = [f"提示语 {i}-{j}" for j in range(10)]
+            changed.clear()
+            begin = time.monotonic()
+            atomic_write(path, dump_config(config))
+            if not changed.wait(args.max_interval * 2):
+                print(f"第 {i + 1} 次修改未被检测到")
+                continue
+            latencies.append(time.monotonic() - begin)
+            print(f"第 {i + 1} 次修改: 生效延迟 {latencies[-1] * 1000:.1f}ms")
+
+        checks_before = core.watcher.checks
+        cpu_before = core.watcher.check_cpu_time
+        time.sleep(args.idle)
+        stats = core.watcher.stats()
+        core.shutdown()
+
+    if latencies:
+        print(f"生效延迟: 平均 {sum(latencies) / len(latencies) * 1000:.1f}ms, 最大 {max(latencies) * 1000:.1f}ms"
+              f"（上限约为检测最大间隔 {args.max_interval}s）")
+    idle_checks = stats["checks"] - checks_before
+    idle_cpu = stats["check_cpu_time"] - cpu_before
+    print(f"空闲 {args.idle:.0f}s: 检测 {idle_checks} 次, CPU {idle_cpu * 1000:.3f}ms"
+          f"（{idle_cpu / args.idle * 100:.4f}%）")
+    print(f"最近一次重新加载耗时: {(stats['last_reload_duration'] or 0) * 1000:.3f}ms")
+    print(json.dumps(stats, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""指标端点检查：像 Prometheus 一样抓取 /metrics，校验文本格式和各项指标的数值
+
+默认在本进程中启动一个 ReminderCore（虚拟时钟驱动，不需要等待真实的提醒间隔），
+触发若干次提醒、报告倒计时结果并保存配置，然后在系统分配的端口上启动指标端点并抓取，
+检查计数与实际操作一致、直方图的分桶单调且 +Inf 等于 _count、线程数和常驻内存存在。
+指定 --url 时只抓取已经运行的程序（例如 TIGAN_METRICS_PORT=9464 启动的界面）并校验格式。
+有任何问题时以状态码 1 退出。
+
+    python benchmarks/check_metrics.py --reminders 20
+    python benchmarks/check_metrics.py --url http://127.0.0.1:9464/metrics
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tigan_core.metrics import CONTENT_TYPE, MetricsServer
+from tigan_core.reminder import ReminderCore
+from tigan_core.scheduler import TimerEngine
+
+SAMPLE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$")
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+PROFILES = [{"name": "站起来", "interval": 30, "countdown": 30}]
+
+
+class ManualClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def scrape(url, timeout):
+    begin = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        content_type = response.headers.get("Content-Type", "")
+        body = response.read().decode("utf-8")
+    return body, content_type, time.perf_counter() - begin
+
+
+def parse(text):
+    """解析 Prometheus 文本格式，返回 ({指标名: 类型}, [(样本名, {标签}, 值)], 问题列表)"""
+    types, samples, problems = {}, [], []
+    helped = set()
+    for n, line in enumerate(text.splitlines(), 1):
+        if not line:
+            continue
+        if line.startswith("# HELP "):
+            helped.add(line.split(" ", 3)[2])
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ", 3)
+            if name in types:
+                problems.append(f"第 {n} 行: {name} 重复声明类型")
+            types[name] = kind
+            continue
+        match = SAMPLE.match(line)
+        if match is None:
+            problems.append(f"第 {n} 行格式无效: {line!r}")
+            continue
+        name, labels, value = match.groups()
+        try:
+            value = float(value)
+        except ValueError:
+            problems.append(f"第 {n} 行数值无效: {line!r}")
+            continue
+        samples.append((name, dict(LABEL.findall(labels or "")), value))
+    for name in types:
+        if name not in helped:
+            problems.append(f"{name} 缺少 HELP")
+    return types, samples, problems
+
+
+def family(name, types):
+    for suffix in ("_bucket", "_sum", "_count"):
+        if name.endswith(suffix) and types.get(name[:-len(suffix)]) == "histogram":
+            return name[:-len(suffix)]
+    return name
+
+
+def check_format(types, samples):
+    problems = []
+    buckets = {}
+    counts = {}
+    for name, labels, value in samples:
+        base = family(name, types)
+        if base not in types:
+            problems.append(f"{name} 没有声明类型")
+        if types.get(base) == "counter" and value < 0:
+            problems.append(f"计数器 {name} 为负数")
+        key = (base, tuple(sorted((k, v) for k, v in labels.items() if k != "le")))
+        if name.endswith("_bucket"):
+            buckets.setdefault(key, []).append((float(labels["le"]), value))
+        elif name.endswith("_count") and types.get(base) == "histogram":
+            counts[key] = value
+    for key, rows in buckets.items():
+        values = [value for _, value in sorted(rows)]
+        if any(b < a for a, b in zip(values, values[1:])):
+            problems.append(f"{key[0]} {dict(key[1])} 的分桶不是单调递增")
+        if sorted(rows)[-1][0] != float("inf") or values[-1] != counts.get(key):
+            problems.append(f"{key[0]} {dict(key[1])} 的 +Inf 分桶与 _count 不一致")
+    return problems
+
+
+def value_of(samples, name, **labels):
+    return sum(value for sample, sample_labels, value in samples
+               if sample == name and all(sample_labels.get(k) == v for k, v in labels.items()))
+
+
+def exercise(reminders, tmp):
+    """用虚拟时钟触发提醒、报告倒计时结果并保存配置，返回预期的计数"""
+    clock = ManualClock()
+    engine = TimerEngine(clock=clock)
+    config_file = os.path.join(tmp, "messages.json")
+    with open(config_file, "w", encoding="utf-8") as f:
+        json.dump({"messages": ["提肛 10 秒", "站起来走走"], "profiles": PROFILES}, f, ensure_ascii=False)
+    fired = {"main": 0, "站起来": 0}
+    outcomes = {"completed": 0, "dismissed": 0}
+
+    def on_reminder(msg, profile):
+        label = profile.name if profile is not None else "main"
+        fired[label] += 1
+        completed = sum(fired.values()) % 3 != 0
+        outcomes["completed" if completed else "dismissed"] += 1
+        core.record_countdown(profile, 60, 60.0 if completed else 12.0, completed, 0.004 if completed else None)
+
+    core = ReminderCore(on_reminder=on_reminder, config_file=config_file, engine=engine,
+                        history_dir=os.path.join(tmp, "history"))
+    core.load_config()
+    core.start(60)
+    while sum(fired.values()) < reminders:
+        # 每次唤醒都比截止时间晚 3 ms
+        clock.t = engine.next_deadline() + 0.003
+        engine.run_due()
+    for theme in ("light", "dark", "dark"):
+        core.save_config(theme=theme)
+        core.writer.flush()
+    core.shutdown()
+    return fired, outcomes
+
+
+def check_values(samples, fired, outcomes):
+    problems = []
+
+    def expect(actual, expected, what):
+        if actual != expected:
+            problems.append(f"{what}: 抓取到 {actual:g}，应为 {expected:g}")
+
+    for label, count in fired.items():
+        expect(value_of(samples, "tigan_reminders_fired_total", schedule=label), count, f"提醒次数（{label}）")
+        expect(value_of(samples, "tigan_scheduler_lateness_seconds_count", schedule=label), count,
+               f"计时延迟观测数（{label}）")
+        lateness = value_of(samples, "tigan_scheduler_lateness_seconds_sum", schedule=label) / max(count, 1)
+        if not 0.002 <= lateness < 0.1:
+            problems.append(f"平均计时延迟（{label}）{lateness * 1000:.2f}ms 不在预期范围")
+    expect(value_of(samples, "tigan_reminders_completed_total"), outcomes["completed"], "完成次数")
+    expect(value_of(samples, "tigan_reminders_dismissed_total"), outcomes["dismissed"], "提前关闭次数")
+    expect(value_of(samples, "tigan_countdown_drift_seconds_count"), outcomes["completed"], "倒计时漂移观测数")
+    # 第三次保存的内容与第二次相同，会被跳过
+    expect(value_of(samples, "tigan_config_saves_total", result="written"), 2, "写入配置次数")
+    expect(value_of(samples, "tigan_config_saves_total", result="skipped"), 1, "跳过写入次数")
+    expect(value_of(samples, "tigan_config_save_seconds_count"), 2, "保存耗时观测数")
+    if value_of(samples, "tigan_threads") < 1:
+        problems.append("缺少线程数")
+    if sys.platform.startswith("linux") or sys.platform == "win32":
+        if value_of(samples, "process_resident_memory_bytes") <= 0:
+            problems.append("缺少常驻内存")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="抓取已经运行的程序的指标端点，只校验格式")
+    parser.add_argument("--reminders", type=int, default=20, help="本进程中触发的提醒次数")
+    parser.add_argument("--scrapes", type=int, default=20, help="测量抓取耗时的次数")
+    parser.add_argument("--timeout", type=float, default=5.0, help="抓取超时（秒）")
+    args = parser.parse_args()
+
+    if args.url:
+        body, content_type, elapsed = scrape(args.url, args.timeout)
+        types, samples, problems = parse(body)
+        problems += check_format(types, samples)
+        print(f"{args.url}: {len(types)} 个指标，{len(samples)} 个样本，抓取耗时 {elapsed * 1000:.1f}ms")
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            server = MetricsServer(0).start()
+            try:
+                fired, outcomes = exercise(args.reminders, tmp)
+                body, content_type, _ = scrape(server.url, args.timeout)
+                types, samples, problems = parse(body)
+                problems += check_format(types, samples)
+                problems += check_values(samples, fired, outcomes)
+                timings = sorted(scrape(server.url, args.timeout)[2] for _ in range(args.scrapes))
+            finally:
+                server.stop(timeout=2.0)
+        print(f"触发 {sum(fired.values())} 次提醒（{fired}），{len(types)} 个指标，{len(samples)} 个样本")
+        print(f"抓取耗时: 中位数 {timings[len(timings) // 2] * 1000:.2f}ms，最大 {timings[-1] * 1000:.2f}ms")
+    if content_type != CONTENT_TYPE:
+        problems.append(f"Content-Type 为 {content_type!r}，应为 {CONTENT_TYPE!r}")
+
+    for problem in problems:
+        print(f"问题: {problem}")
+    print("指标检查未通过" if problems else "指标检查通过")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
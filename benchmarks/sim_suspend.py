@@ -0,0 +1,113 @@
+"""系统休眠恢复模拟：用虚拟的单调时钟和墙上时钟驱动 TimerEngine，检查各策略下休眠后下一次提醒的时间
+
+分两种时钟模型：Linux、macOS 的计时时钟在休眠期间停止，计时线程在它到达截止时间时才会醒来；
+Windows 的 time.monotonic 在休眠期间继续走，休眠由另一个停止的时钟（QueryUnbiasedInterruptTime）发现。
+companion 表示另有一个 60 秒的计划（相当于配置文件检测和托盘徽标），休眠在恢复后
+最多 60 秒内就会被发现；没有时要等到原来的截止时间才会发现。
+
+    python benchmarks/sim_suspend.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tigan_core.scheduler import RESUME_POLICIES, RESUME_RESTART, SUSPEND_THRESHOLD, TimerEngine
+
+INTERVAL = 3600.0
+SUSPEND_AT = 1000.0
+GAPS = (10.0, 45.0, 600.0, 2600.0, 3540.0, 7200.0, 25 * 3600.0)
+
+
+class SimClock:
+    """mono 在休眠期间停止，wall 继续走（Windows 模型中也用作继续走的 time.monotonic）"""
+
+    def __init__(self):
+        self.mono = 0.0
+        self.wall = 0.0
+
+    def advance(self, seconds):
+        self.mono += seconds
+        self.wall += seconds
+
+    def suspend(self, seconds):
+        self.wall += seconds
+
+
+def simulate(policy, gap, companion, clock_stops=True):
+    """返回 (发现休眠时的墙上时间, 恢复后第一次提醒的墙上时间)"""
+    clock = SimClock()
+    if clock_stops:
+        engine = TimerEngine(clock=lambda: clock.mono, wall_clock=lambda: clock.wall, resume_policy=policy)
+        now = lambda: clock.mono
+    else:
+        wall = lambda: clock.wall
+        engine = TimerEngine(clock=wall, wall_clock=wall, resume_policy=policy,
+                             suspend_clocks=(lambda: clock.mono, wall))
+        now = wall
+    fires = []
+    detected = []
+    engine.add(INTERVAL, lambda s: fires.append(clock.wall), name="default")
+    if companion:
+        engine.add(60.0, lambda s: None, name="companion")
+    engine.add_resume_listener(lambda g: detected.append(clock.wall))
+
+    suspended = False
+    while len(fires) < 1 or fires[-1] <= SUSPEND_AT + gap:
+        deadline = engine.next_deadline()
+        if not suspended and deadline > SUSPEND_AT:
+            clock.advance(SUSPEND_AT - clock.mono)
+            clock.suspend(gap)
+            suspended = True
+        clock.advance(max(0.0, deadline - now()))
+        engine.run_due()
+        if clock.wall > SUSPEND_AT + gap + 3 * INTERVAL:
+            break
+    resumed = [t for t in fires if t > SUSPEND_AT]
+    return (detected[0] if detected else None), (resumed[0] if resumed else None)
+
+
+def expected(policy, gap, detect_wall, clock_stops=True):
+    """按策略的定义推算恢复后第一次提醒的墙上时间"""
+    if detect_wall is None or policy == "ignore":
+        if not clock_stops:
+            # 计时时钟继续走：按原来的截止时间，已过期的在恢复后立即提醒
+            return max(INTERVAL, SUSPEND_AT + gap)
+        # 未发现休眠（或忽略）：单调时钟走满一个间隔后才提醒
+        return INTERVAL + gap
+    if policy == RESUME_RESTART:
+        return detect_wall + INTERVAL
+    if INTERVAL > detect_wall:
+        return INTERVAL  # 按墙上时间仍未到期
+    if policy == "fire":
+        return detect_wall
+    k = int((detect_wall - INTERVAL) // INTERVAL) + 1
+    return INTERVAL + k * INTERVAL  # skip：保持原来的节拍
+
+
+def main():
+    failures = 0
+    print("{:>8} {:>8} {:>8} {:>6} {:>12} {:>12} {:>12} {}".format(
+        "时钟", "休眠", "策略", "陪伴", "发现于", "下次提醒", "预期", ""))
+    for clock_stops in (True, False):
+        for gap in GAPS:
+            for policy in RESUME_POLICIES:
+                for companion in (True, False):
+                    detect, fire = simulate(policy, gap, companion, clock_stops)
+                    want = expected(policy, gap, detect, clock_stops)
+                    ok = fire is not None and abs(fire - want) < 1e-6
+                    # 低于阈值的休眠不应被发现；超过阈值且有陪伴计划时应在恢复后 60 秒内发现
+                    if gap < SUSPEND_THRESHOLD:
+                        ok = ok and detect is None
+                    elif companion:
+                        ok = ok and detect is not None and detect - (SUSPEND_AT + gap) <= 60.0
+                    failures += not ok
+                    print("{:>8} {:>7.0f}s {:>8} {:>6} {:>11} {:>11.0f}s {:>11.0f}s {}".format(
+                        "停止" if clock_stops else "继续", gap, policy, "是" if companion else "否",
+                        "-" if detect is None else f"{detect:.0f}s", fire or 0, want, "" if ok else "失败"))
+    print("全部通过" if not failures else f"{failures} 项失败")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
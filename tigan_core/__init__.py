@@ -0,0 +1 @@
+"""提肛提醒器核心模块（不依赖 tkinter 的调度、配置等逻辑）"""
@@ -0,0 +1,5 @@
+import sys
+
+from tigan_core.headless import main
+
+sys.exit(main())
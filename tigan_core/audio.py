@@ -0,0 +1,246 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# pygame 导入和 mixer 初始化较慢，推迟到第一次播放提示音时进行
+_pygame = None
+_pygame_checked = False
+_pygame_lock = threading.Lock()
+
+
+def load_pygame():
+    """首次调用时导入 pygame 并初始化混音器，返回 pygame 模块，不可用时返回 None"""
+    global _pygame, _pygame_checked
+    if _pygame_checked:
+        return _pygame
+    with _pygame_lock:
+        if not _pygame_checked:
+            # 尝试导入 pygame 用于播放声音
+            try:
+                import pygame
+                pygame.mixer.init()
+                _pygame = pygame
+                log.debug("成功导入 pygame")
+            except ImportError:
+                log.warning("pygame 模块未安装或无法加载")
+            except Exception as e:
+                log.error("初始化 pygame 时发生错误: %s", e)
+            _pygame_checked = True
+    return _pygame
+
+
+def pygame_available():
+    """pygame 是否可用（首次调用时会加载 pygame）"""
+    return load_pygame() is not None
+
+
+class SoundCache:
+    """把提示音解码为常驻内存的 pygame.mixer.Sound，避免每次提醒都重新读取和解码 MP3
+
+    check_changes 为 True 时每次播放前用 os.stat 检查文件的修改时间和大小，
+    文件变化后重新解码；也可以手动调用 invalidate()。
+    """
+
+    def __init__(self, sound_file, check_changes=False):
+        self.sound_file = sound_file
+        self.check_changes = check_changes
+        self._sound = None
+        self._signature = None
+        self._lock = threading.Lock()
+        # 统计信息：从提醒截止时间到开始播放的延迟（秒）
+        self.plays = 0
+        self.last_latency = None
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.sound_file)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _get(self):
+        with self._lock:
+            sound = self._sound
+            if sound is not None and not (self.check_changes and self._stat_signature() != self._signature):
+                return sound
+
+            pygame = load_pygame()
+            if pygame is None:
+                return None
+            signature = self._stat_signature()
+            if signature is None:
+                log.warning("声音文件 '%s' 未找到", self.sound_file)
+                self._sound = None
+                return None
+            try:
+                self._sound = pygame.mixer.Sound(self.sound_file)
+                self._signature = signature
+                log.debug("提示音已解码到内存: %s", self.sound_file)
+            except Exception as e:
+                log.error("pygame 解码声音出错: %s", e)
+                self._sound = None
+            return self._sound
+
+    def load(self):
+        """解码提示音到内存（已加载时直接返回），成功时返回 True"""
+        return self._get() is not None
+
+    def invalidate(self):
+        """丢弃已解码的声音，下次播放时重新解码"""
+        with self._lock:
+            self._sound = None
+            self._signature = None
+
+    def play(self, deadline=None):
+        """播放提示音；deadline 是提醒的 time.monotonic() 截止时间，用于统计播放延迟"""
+        sound = self._get()
+        if sound is None:
+            return False
+        try:
+            sound.play()
+        except Exception as e:
+            log.error("pygame 播放声音出错: %s", e)
+            return False
+        if deadline is not None:
+            self.last_latency = time.monotonic() - deadline
+        self.plays += 1
+        return True
+
+
+# 队列中的控制请求
+_LOAD = object()
+_STOP = object()
+
+
+class AudioWorker:
+    """长期运行的提示音播放线程，通过有界队列接收播放请求
+
+    多个提醒同时到期时，队列中积压的播放请求会被合并为一次播放；
+    距上次播放不足 coalesce_window 秒的请求也会被合并，避免提示音叠在一起。
+    队列已满时新请求直接丢弃，调用方永远不会被阻塞。
+    submit() 和 preload() 可以指定其他 SoundCache（例如不同提醒配置的提示音），默认使用 cache。
+    """
+
+    def __init__(self, cache, maxsize=8, coalesce_window=1.0):
+        self.cache = cache
+        self.coalesce_window = coalesce_window
+        self._maxsize = maxsize
+        self._queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = None  # 当前播放线程的退出标志
+        self._last_play = None
+        # 统计信息
+        self.submitted = 0
+        self.played = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.last_latency = None
+        self.total_latency = 0.0
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def start(self):
+        """启动播放线程（已启动时忽略）"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            # 每个线程有自己的队列和退出标志，重新启动后还没退出的上一个线程不会取走新线程的请求
+            self._stopping = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._queue, self._stopping),
+                                            name="AudioWorker", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """通知播放线程退出；timeout 不为 None 时等待线程结束"""
+        with self._lock:
+            thread, stopping, old_queue = self._thread, self._stopping, self._queue
+            if thread is None:
+                return
+            self._thread = self._stopping = None
+            # 之后提交的请求进入新队列，由下一次 start() 的线程处理
+            self._queue = queue.Queue(self._maxsize)
+        stopping.set()
+        try:
+            # 只用来唤醒阻塞在空队列上的线程；队列已满时线程不会阻塞，取出下一个请求时就会看到退出标志
+            old_queue.put_nowait(_STOP)
+        except queue.Full:
+            pass
+        if timeout is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def preload(self, cache=None):
+        """在播放线程中预先解码提示音"""
+        self._put((_LOAD, cache or self.cache))
+
+    def submit(self, deadline=None, cache=None):
+        """提交一次播放请求，deadline 为提醒的单调时钟截止时间；队列已满时返回 False"""
+        if deadline is None:
+            deadline = time.monotonic()
+        self.submitted += 1
+        return self._put((deadline, cache or self.cache))
+
+    def metrics(self):
+        """返回队列深度、播放次数和延迟等统计信息"""
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_depth,
+            "submitted": self.submitted,
+            "played": self.played,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "last_latency": self.last_latency,
+            "mean_latency": self.total_latency / self.played if self.played else None,
+        }
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    def _run(self, requests, stopping):
+        while True:
+            item = requests.get()
+            if stopping.is_set():
+                return
+            deadline, cache = item
+            if deadline is _LOAD:
+                cache.load()
+                continue
+
+            # 合并队列里已经积压的播放请求，只播放第一个请求的提示音，保留最早的截止时间
+            while True:
+                try:
+                    pending = requests.get_nowait()
+                except queue.Empty:
+                    break
+                if stopping.is_set():
+                    return
+                if pending[0] is _LOAD:
+                    pending[1].load()
+                    continue
+                self.coalesced += 1
+                deadline = min(deadline, pending[0])
+
+            now = time.monotonic()
+            if self._last_play is not None and now - self._last_play < self.coalesce_window:
+                self.coalesced += 1
+                continue
+            if cache.play(deadline):
+                self._last_play = now
+                self.played += 1
+                self.last_latency = cache.last_latency
+                self.total_latency += self.last_latency
@@ -0,0 +1,394 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from tigan_core.metrics import CONFIG_SAVE_SECONDS, CONFIG_SAVES
+from tigan_core.profiling import profiled
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MESSAGES = [
+    "快提一下菊花，坚持就是胜利 💪🍑",
+    "系统检测你坐太久了，是时候提一提了 🕵️",
+    "你的菊花提醒上线了～ 快动一动～ 😄",
+    "放下鼠标，提一提，然后继续战斗！🧘‍♂️",
+    "提肛一分钟，通畅一整天 🌈",
+    "姿势不变，肌肉在练！🏋️",
+    "每小时提一下，痔疮远离你家！🚽",
+    "来，跟我一起：吸～ 提～ 呼～ ☯️",
+    "提升战斗力，从这一提开始 🚀"
+]
+
+# 配置文件格式版本：1 为只有 messages/auto_start/minimize_to_tray_on_start/theme 的旧版，
+# 2 起在文件中写入 version 字段
+CONFIG_VERSION = 2
+
+# 默认配置
+DEFAULT_CONFIG = {
+    "version": CONFIG_VERSION,
+    "messages": DEFAULT_MESSAGES,
+    "auto_start": False,
+    "minimize_to_tray_on_start": False,
+    "theme": "dark"
+}
+
+
+def default_config(theme="dark"):
+    """返回一份新的默认配置"""
+    config = DEFAULT_CONFIG.copy()
+    config["theme"] = theme
+    return config
+
+
+def dump_config(config):
+    """把配置序列化为 JSON 文本"""
+    return json.dumps(config, indent=2, ensure_ascii=False)
+
+
+def messages_to_text(messages):
+    """把提示语列表转换为编辑框中每行一条的文本"""
+    return "\n".join(messages)
+
+
+def parse_messages_text(text):
+    """把编辑框的文本按行拆分为提示语，去掉首尾空白和空行（每行只 strip 一次）"""
+    return [line for line in (raw.strip() for raw in text.splitlines()) if line]
+
+
+def atomic_write(path, text, sync=True):
+    """先写入同目录下的临时文件再原子替换，写入中途崩溃不会损坏原文件
+
+    sync 为 False 时不调用 fsync，只用于丢失后可以重建的状态文件。
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        # mkstemp 创建的文件权限为 0600，保持与原文件一致
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_config(path, config, text=None):
+    """把配置写入文件，并同步更新已解析配置的缓存"""
+    atomic_write(path, dump_config(config) if text is None else text)
+    _remember(path, config)
+
+
+# 已解析配置的进程内缓存：路径 -> ((修改时间, 大小), 配置)
+# 注：持久化的 marshal/pickle 缓存实测比 json.loads 解析这类以字符串为主的配置更慢，因此只在进程内缓存
+_parsed_cache = {}
+
+
+def _stat_signature(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _remember(path, config):
+    try:
+        _parsed_cache[path] = (_stat_signature(path), dict(config))
+    except OSError:
+        _parsed_cache.pop(path, None)
+
+
+def clear_parse_cache():
+    """清空已解析配置的进程内缓存"""
+    _parsed_cache.clear()
+
+
+def _cached(path, signature):
+    entry = _parsed_cache.get(path)
+    if entry is not None and entry[0] == signature:
+        return dict(entry[1])
+    return None
+
+
+def migrate_config(loaded):
+    """把旧版格式转换为当前版本，返回 (config, 是否发生了迁移)
+
+    不论版本都用默认值补齐缺失的字段；只检查结构（O(1)），不逐条遍历提示语。
+    只有内容无法使用（不是列表或字典、messages 不是非空列表）时才抛出 ValueError。
+    """
+    # 兼容旧版本只保存消息列表的配置文件
+    if isinstance(loaded, list):
+        if not loaded:
+            raise ValueError("Messages content is not a non-empty list")
+        config = default_config("dark")
+        config["messages"] = loaded
+        return config, True
+    if not isinstance(loaded, dict):
+        raise ValueError("Content is not a valid config format")
+
+    messages = loaded.get("messages")
+    # 确保消息是列表且不为空
+    if not isinstance(messages, list) or not messages:
+        raise ValueError("Messages content is not a non-empty list")
+
+    raw_version = loaded.get("version", 1)
+    version = parse_version(raw_version)
+
+    # 手工编辑或旧版写入的文件可能缺少字段，任何版本都用默认值补齐
+    config = default_config(loaded.get("theme", "dark"))
+    config.update(loaded)
+    migrated = version < CONFIG_VERSION
+    if migrated:
+        # 版本 1：写入版本号
+        config["version"] = CONFIG_VERSION
+    elif type(raw_version) is not int:
+        # "2"、2.0 之类的写法改回整数后写回文件
+        config["version"] = version
+        migrated = True
+    return config, migrated
+
+
+def parse_version(value):
+    """把配置中的 version 转换为整数
+
+    手工编辑或其他工具可能写成 "2"、2.0 或 true；能转换的整数值直接使用，
+    其他值只记录警告并按版本 1 处理，保留文件中的提示语。
+    """
+    # bool 是 int 的子类，要先排除
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    log.warning("配置中的版本号无效: %r，按版本 1 处理", value)
+    return 1
+
+
+def check_messages(config):
+    """保存前检查 messages，不是列表时用默认提示语代替"""
+    if not isinstance(config.get("messages"), list):
+        log.error("尝试保存非列表类型的消息: %s。将使用默认消息覆盖。", type(config.get("messages")))
+        config["messages"] = DEFAULT_MESSAGES # 重置为默认值以防万一
+    elif not config["messages"]: # 确保列表不为空，如果为空则可能使用默认值（或保持空，取决于需求）
+        log.warning("尝试保存空的消息列表。")
+    return config
+
+
+def save_config(path, config):
+    """立即保存配置"""
+    write_config(path, check_messages(config))
+    log.info("配置已成功保存")
+
+
+class ConfigWriter:
+    """在后台线程中合并、去重并原子写入配置
+
+    submit() 只复制一份配置快照就返回，调用方（界面线程）不会等待磁盘 I/O；
+    debounce 秒内的多次修改只写一次，内容与上次写入相同时跳过写入。
+    写入失败时在后台线程中调用 on_error(exception)，last_error 保存最近一次写入的错误（成功时为 None）。
+    每次写入文件后在后台线程中调用 on_write(文件的 (修改时间, 大小))，供文件监视器识别自己的写入。
+    submit(config, on_saved) 的 on_saved() 在这份（或之后合并进来的）配置成功写入后于后台线程中调用。
+    close() 之后提交的配置不再写入，只记录警告（退出过程中界面回调仍可能调用保存）。
+    """
+
+    def __init__(self, path, debounce=0.5, on_error=None, on_write=None):
+        self.path = path
+        self.debounce = debounce
+        self.on_error = on_error
+        self.on_write = on_write
+        self._cond = threading.Condition()
+        self._pending = None
+        self._on_saved = []
+        self._due = None
+        self._writing = False
+        self._closed = False
+        self._last_digest = None
+        self._thread = None
+        # 统计信息
+        self.writes = 0
+        self.skipped = 0
+        self.last_error = None
+
+    def submit(self, config, on_saved=None):
+        """提交要保存的配置，debounce 秒内没有新的提交时才真正写入"""
+        snapshot = dict(config)
+        with self._cond:
+            if self._closed:
+                log.warning("配置写入线程已关闭，忽略保存 %s", self.path)
+                return
+            self._pending = snapshot
+            if on_saved is not None:
+                self._on_saved.append(on_saved)
+            self._due = time.monotonic() + self.debounce
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ConfigWriter", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    @property
+    def pending(self):
+        """是否有已提交但尚未写完的配置"""
+        with self._cond:
+            return self._pending is not None or self._writing
+
+    def flush(self, timeout=None):
+        """立即写入尚未保存的配置并等待写入完成，返回是否已全部写入"""
+        with self._cond:
+            if self._pending is not None:
+                self._due = time.monotonic()
+                self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def close(self, timeout=None):
+        """写入剩余配置后停止后台线程"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    @staticmethod
+    def _digest(text):
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def _run(self):
+        with self._cond:
+            while True:
+                if self._pending is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    continue
+                delay = self._due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+
+                config, self._pending = self._pending, None
+                on_saved, self._on_saved = self._on_saved, []
+                self._writing = True
+                self._cond.release()
+                try:
+                    if self._write(config):
+                        for callback in on_saved:
+                            try:
+                                callback()
+                            except Exception:
+                                log.exception("保存完成回调出错")
+                finally:
+                    self._cond.acquire()
+                    self._writing = False
+                    self._cond.notify_all()
+
+    @profiled("save_messages")
+    def _write(self, config):
+        """写入配置，返回是否成功（内容未变化而跳过也算成功）"""
+        begin = time.perf_counter()
+        try:
+            text = dump_config(check_messages(config))
+            digest = self._digest(text)
+            if digest == self._last_digest:
+                self.skipped += 1
+                self.last_error = None
+                CONFIG_SAVES.inc(result="skipped")
+                return True
+            write_config(self.path, config, text)
+            if self.on_write is not None:
+                try:
+                    signature = _stat_signature(self.path)
+                except OSError:
+                    signature = None
+                self.on_write(signature)
+            self._last_digest = digest
+            self.writes += 1
+            self.last_error = None
+            CONFIG_SAVE_SECONDS.observe(time.perf_counter() - begin)
+            CONFIG_SAVES.inc(result="written")
+            log.info("配置已成功保存")
+            return True
+        except Exception as e:
+            CONFIG_SAVES.inc(result="error")
+            self.last_error = e
+            log.error("无法保存配置到 %s: %s", self.path, e)
+            if self.on_error:
+                self.on_error(e)
+            return False
+
+
+def read_config(path, use_cache=True):
+    """读取并校验配置文件，返回 (config, 是否需要迁移)，不写入任何文件
+
+    配置文件的修改时间和大小与上次加载或写入时一致时直接返回缓存的配置，不再读取和校验；
+    带有当前 version 的文件只做 O(1) 的结构检查。读取失败时抛出 OSError，格式无效时抛出 ValueError。
+    """
+    signature = _stat_signature(path)
+    if use_cache:
+        config = _cached(path, signature)
+        if config is not None:
+            return config, False
+
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if not content.strip():
+         raise ValueError("File is empty or contains only whitespace")
+    config, migrated = migrate_config(json.loads(content))
+    if not migrated:
+        _parsed_cache[path] = (signature, dict(config))
+    return config, migrated
+
+
+def load_config(path, default_theme="dark", use_cache=True):
+    """加载配置文件，返回当前版本格式的配置字典
+
+    旧版格式只在第一次加载时迁移并写回文件；文件不存在或格式无效时会写入默认配置。
+    """
+    try:
+        config, migrated = read_config(path, use_cache)
+    except FileNotFoundError:
+        log.info("配置文件 %s 不存在，创建默认配置", path)
+        config = default_config(default_theme)
+        try:
+            write_config(path, config)
+        except Exception as e:
+            log.error("无法创建或写入默认配置文件 '%s': %s", path, e)
+        return config
+    except ValueError as e:
+        # json.JSONDecodeError 也是 ValueError 的子类
+        log.warning("无法加载 %s (%s)。将使用默认配置并尝试重置文件。", path, e)
+        config = default_config(default_theme)
+        try:
+            write_config(path, config)
+        except OSError as e_reset:
+             log.error("无法重置 %s: %s。将使用默认配置。", path, e_reset)
+        return config
+    except Exception:
+         log.exception("读取 %s 时发生未知错误。将使用默认配置。", path)
+         return default_config(default_theme)
+
+    if migrated:
+        log.info("检测到旧版配置文件格式，正在升级到版本 %s...", CONFIG_VERSION)
+        try:
+            write_config(path, config)
+        except OSError as e:
+            log.error("无法写回升级后的配置 %s: %s", path, e)
+    log.debug("配置已加载，自动开始: %s, 最小化托盘: %s, 主题: %s",
+              config.get("auto_start"), config.get("minimize_to_tray_on_start"), config.get("theme"))
+    return config
@@ -0,0 +1,80 @@
+import math
+import time
+
+
+class Countdown:
+    """基于单调时钟固定结束时间的倒计时
+
+    剩余时间总是由结束时间减去当前时间得出，每次回调的延迟不会累积；
+    next_tick_delay() 给出到下一个整秒边界的等待时间，界面按它安排下一次刷新。
+    """
+
+    def __init__(self, seconds, clock=time.monotonic):
+        self.duration = seconds
+        self._clock = clock
+        self.started = clock()
+        self.end = self.started + seconds
+        self.ticks = 0
+        self.max_tick_lateness = 0.0
+        self.finished_at = None
+        self._expected_tick = self.started
+
+    def remaining(self):
+        """剩余秒数（浮点数），不小于 0"""
+        return max(0.0, self.end - self._clock())
+
+    def tick(self):
+        """记录一次刷新并返回要显示的剩余整秒数（向上取整）"""
+        now = self._clock()
+        lateness = now - self._expected_tick
+        if lateness > self.max_tick_lateness:
+            self.max_tick_lateness = lateness
+        self.ticks += 1
+        return math.ceil(max(0.0, self.end - now))
+
+    def progress(self):
+        """剩余进度百分比（100 到 0）"""
+        if self.duration <= 0:
+            return 0.0
+        return self.remaining() / self.duration * 100
+
+    def elapsed(self):
+        """已经坚持的秒数，不超过倒计时长度"""
+        finished = self.finished_at if self.finished_at is not None else self._clock()
+        return min(self.duration, max(0.0, finished - self.started))
+
+    def done(self):
+        return self._clock() >= self.end
+
+    def next_tick_delay(self):
+        """到下一个整秒边界的秒数，即显示的剩余秒数发生变化的时刻
+
+        同时记下该时刻，供下一次 tick() 统计刷新延迟。
+        """
+        remaining = self.end - self._clock()
+        if remaining <= 0:
+            return 0.0
+        delay = remaining - (math.ceil(remaining) - 1)
+        self._expected_tick = self._clock() + delay
+        return delay
+
+    def next_tick_ms(self):
+        """next_tick_delay() 换算成 Tk after() 使用的毫秒数，向上取整以确保越过边界"""
+        return max(1, math.ceil(self.next_tick_delay() * 1000))
+
+    def finish(self):
+        """结束倒计时，返回本次的漂移统计"""
+        if self.finished_at is None:
+            self.finished_at = self._clock()
+        return self.report()
+
+    def report(self):
+        """drift 是实际结束时间相对计划结束时间的偏差（秒）"""
+        finished = self.finished_at if self.finished_at is not None else self._clock()
+        return {
+            "duration": self.duration,
+            "elapsed": finished - self.started,
+            "drift": finished - self.end,
+            "ticks": self.ticks,
+            "max_tick_lateness": self.max_tick_lateness,
+        }
@@ -0,0 +1,93 @@
+"""无界面模式：只运行提醒核心，适用于服务器、CI 或没有显示器的环境
+
+    python -m tigan_core --interval 60
+    python tigan_reminder_v1.0.4.py --headless --interval 60
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+from tigan_core.log import setup_logging
+from tigan_core.history import HISTORY_DIR
+from tigan_core.metrics import start_metrics_server
+from tigan_core.profiling import PROFILE_DIR_NAME, configure as configure_profiling
+from tigan_core.reminder import ReminderCore
+from tigan_core.resources import CONFIG_FILE
+from tigan_core.stats import format_summary
+
+log = logging.getLogger(__name__)
+
+
+def print_reminder(msg, profile=None):
+    """无界面模式下把提醒输出到标准输出，额外的提醒配置会带上名称"""
+    label = f"提醒（{profile.name}）" if profile is not None else "提醒"
+    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {label}: {msg}", flush=True)
+
+
+def data_dirs(config_file):
+    """按配置文件返回 (剖析结果目录, 历史目录)
+
+    使用默认配置文件时与界面共用历史；用 --config 指定其他配置时都放在该配置文件旁，
+    不会把无界面运行的记录混进桌面用户的历史。
+    """
+    config_dir = os.path.dirname(os.path.abspath(config_file))
+    if os.path.abspath(config_file) == os.path.abspath(CONFIG_FILE):
+        return os.path.join(config_dir, PROFILE_DIR_NAME), HISTORY_DIR
+    return os.path.join(config_dir, PROFILE_DIR_NAME), os.path.join(config_dir, "history")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="提肛提醒器（无界面模式）")
+    parser.add_argument("--headless", action="store_true", help="无界面运行（本入口始终无界面）")
+    parser.add_argument("--interval", type=int, default=60, help="提醒间隔（分钟）")
+    parser.add_argument("--config", default=CONFIG_FILE, help="配置文件路径")
+    parser.add_argument("--stats", action="store_true", help="显示提醒统计后退出")
+    parser.add_argument("--log-level", default=None, help="日志级别：debug、info、warning 或 error（默认读取 TIGAN_LOG_LEVEL，否则为 info）")
+    parser.add_argument("--perf-profile", nargs="?", const="all", default=None, metavar="SECTIONS",
+                        help="剖析加载和保存配置，可指定逗号分隔的代码段（默认读取 TIGAN_PERF_PROFILE）")
+    parser.add_argument("--metrics-port", default=None, metavar="PORT",
+                        help="在 127.0.0.1 的该端口提供 Prometheus 指标（默认读取 TIGAN_METRICS_PORT）")
+    args = parser.parse_args(argv)
+    profile_dir, history_dir = data_dirs(args.config)
+    try:
+        setup_logging(args.log_level)
+        configure_profiling(args.perf_profile, profile_dir)
+    except ValueError as e:
+        parser.error(str(e))
+
+    core = ReminderCore(on_reminder=print_reminder, config_file=args.config, history_dir=history_dir)
+    if args.stats:
+        print(format_summary(core.load_stats().summary()))
+        return 0
+    try:
+        metrics_server = start_metrics_server(args.metrics_port)
+    except ValueError as e:
+        parser.error(str(e))
+    core.load_config()
+    core.watch_config()
+    try:
+        core.start(args.interval)
+    except ValueError as e:
+        log.error("%s", e)
+        return 2
+
+    log.info("无界面模式已启动，每 %d 分钟提醒一次，按 Ctrl+C 退出。", args.interval)
+    stop_event = threading.Event()
+    try:
+        # Event.wait 不带超时会阻塞 Ctrl+C，这里用较长超时循环等待
+        while not stop_event.wait(3600):
+            pass
+    except KeyboardInterrupt:
+        log.info("检测到 Ctrl+C，正在退出...")
+    finally:
+        core.shutdown()
+        if metrics_server is not None:
+            metrics_server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from tigan_core.config import atomic_write
+
+log = logging.getLogger(__name__)
+
+# 提醒历史保存在用户目录，与日志放在一起
+HISTORY_DIR = os.path.join(os.path.expanduser("~"), ".tigan_reminder", "history")
+ACTIVE_FILE = "history.jsonl"
+SEGMENT_PATTERN = "history-*.jsonl"
+SEGMENT_TIME_FORMAT = "%Y%m%d-%H%M%S"
+DAILY_FILE = "history_daily.json"
+
+# 事件类型：提醒触发、倒计时完成、倒计时未结束就被关闭
+EVENT_FIRE = "fire"
+EVENT_COMPLETE = "complete"
+EVENT_DISMISS = "dismiss"
+
+# 当前文件超过这个大小时轮转为一个只读分段
+SEGMENT_BYTES = 256 * 1024
+# 最后写入时间早于这么多天的分段会被压缩为每日汇总
+KEEP_DAYS = 30
+# 分段个数上限，超过时不论新旧先压缩最旧的，保证原始记录占用的空间有上限
+MAX_SEGMENTS = 32
+# 检查是否有需要压缩的旧分段的间隔（秒）
+COMPACT_INTERVAL = 3600.0
+
+
+def event_date(t):
+    """事件时间戳对应的本地日期（YYYY-MM-DD）"""
+    return time.strftime("%Y-%m-%d", time.localtime(t))
+
+
+def segment_time(path):
+    """分段的轮转时间（即最后写入的时间），从文件名 history-<时间>-<序号>.jsonl 中读出"""
+    stamp = os.path.basename(path)[len("history-"):].rsplit("-", 1)[0]
+    try:
+        return time.mktime(time.strptime(stamp, SEGMENT_TIME_FORMAT))
+    except ValueError:
+        return os.path.getmtime(path)
+
+
+def read_events(path):
+    """逐行读取一个历史文件中的事件，跳过损坏的行（例如写入中途断电留下的半行）"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(event, dict) and "t" in event and "e" in event:
+                    yield event
+    except FileNotFoundError:
+        return
+
+
+def summarize(events, days=None):
+    """把事件按 (日期, 提醒配置) 汇总为每日计数，合并进 days 并返回"""
+    if days is None:
+        days = {}
+    for event in events:
+        key = (event_date(event["t"]), event.get("p"))
+        day = days.get(key)
+        if day is None:
+            day = days[key] = {"fired": 0, "completed": 0, "dismissed": 0, "held": 0.0}
+        kind = event["e"]
+        if kind == EVENT_FIRE:
+            day["fired"] += 1
+        elif kind in (EVENT_COMPLETE, EVENT_DISMISS):
+            day["completed" if kind == EVENT_COMPLETE else "dismissed"] += 1
+            day["held"] += event.get("held", 0.0)
+    return days
+
+
+class HistoryLog:
+    """只追加的提醒历史：每行一个 JSON 事件，由后台线程批量写入
+
+    record() 只把事件放进内存中的批次就返回；后台线程每 flush_interval 秒或批次达到
+    batch_size 时一次性追加到 history.jsonl。文件超过 segment_bytes 时轮转为
+    history-<时间>.jsonl 分段；超过 keep_days 天的分段（或分段数超过 MAX_SEGMENTS 时最旧的）
+    被压缩进 history_daily.json 的每日汇总后删除，多年的历史占用的空间也是有限的。
+    每批事件写入后在后台线程中调用 on_flush()（例如保存增量统计）。
+    """
+
+    def __init__(self, directory=HISTORY_DIR, flush_interval=5.0, batch_size=64, segment_bytes=SEGMENT_BYTES,
+                 keep_days=KEEP_DAYS, clock=time.time, on_flush=None):
+        self.directory = directory
+        self.path = os.path.join(directory, ACTIVE_FILE)
+        self.daily_path = os.path.join(directory, DAILY_FILE)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.segment_bytes = segment_bytes
+        self.keep_days = keep_days
+        self._clock = clock
+        self.on_flush = on_flush
+        self._cond = threading.Condition()
+        self._batch = []
+        self._writing = False
+        self._flush_requested = False
+        self._closed = False
+        self._thread = None
+        self._next_compact = 0.0
+        # 统计信息
+        self.written = 0
+        self.flushes = 0
+        self.rotations = 0
+        self.compacted = 0
+        self.last_error = None
+
+    def record(self, event, profile=None, **fields):
+        """记录一个事件，返回事件字典；不会等待磁盘 I/O"""
+        entry = {"t": round(self._clock(), 3), "e": event}
+        if profile is not None:
+            entry["p"] = profile
+        entry.update(fields)
+        with self._cond:
+            if self._closed:
+                return entry
+            self._batch.append(entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="HistoryLog", daemon=True)
+                self._thread.start()
+            if len(self._batch) >= self.batch_size:
+                self._cond.notify_all()
+        return entry
+
+    def flush(self, timeout=None):
+        """立即写入尚未写入的事件并等待完成，返回是否已全部写入"""
+        with self._cond:
+            if self._batch:
+                self._flush_requested = True
+                self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._batch and not self._writing, timeout)
+
+    def close(self, timeout=None):
+        """写入剩余事件后停止后台线程"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def segments(self):
+        """已轮转的分段，按时间从旧到新"""
+        return sorted(glob.glob(os.path.join(self.directory, SEGMENT_PATTERN)))
+
+    def iter_events(self):
+        """按时间顺序读取尚未压缩的全部事件（分段和当前文件），不包括内存中尚未写入的批次"""
+        compacted, _ = self.load_daily()
+        for path in self.segments() + [self.path]:
+            if os.path.basename(path) not in compacted:
+                yield from read_events(path)
+
+    def load_daily(self):
+        """读取每日汇总，返回 (已压缩的分段名集合, {(日期, 提醒配置): 计数})"""
+        try:
+            with open(self.daily_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return set(), {}
+        except (OSError, ValueError) as e:
+            log.warning("无法读取历史汇总 %s: %s", self.daily_path, e)
+            return set(), {}
+        days = {}
+        for row in saved.get("days", []):
+            row = dict(row)
+            days[(row.pop("date"), row.pop("profile", None))] = row
+        return set(saved.get("compacted", [])), days
+
+    def compact(self, now=None, force=False):
+        """把过期的分段压缩进每日汇总并删除，返回压缩的分段数"""
+        if now is None:
+            now = self._clock()
+        segments = self.segments()
+        cutoff = now - self.keep_days * 86400
+        old = []
+        for i, path in enumerate(segments):
+            try:
+                rotated = segment_time(path)
+            except OSError:
+                continue
+            if force or rotated < cutoff or len(segments) - i > MAX_SEGMENTS:
+                old.append(path)
+        if not old:
+            return 0
+        compacted, days = self.load_daily()
+        for path in old:
+            # 汇总写入后、删除分段前中断时，下次根据记录的分段名跳过，不会重复计数
+            if os.path.basename(path) not in compacted:
+                summarize(read_events(path), days)
+        # 只记录本次压缩的和仍未删除的分段名，记录不会无限增长
+        existing = {os.path.basename(path) for path in segments}
+        names = sorted(compacted.intersection(existing).union(os.path.basename(path) for path in old))
+        rows = [dict(counts, held=round(counts["held"], 1), date=date, profile=profile)
+                for (date, profile), counts in sorted(days.items(), key=lambda item: (item[0][0], item[0][1] or ""))]
+        atomic_write(self.daily_path, json.dumps({"version": 1, "compacted": names, "days": rows},
+                                                 ensure_ascii=False))
+        for path in old:
+            try:
+                os.remove(path)
+            except OSError as e:
+                log.warning("无法删除已压缩的历史分段 %s: %s", path, e)
+        self.compacted += len(old)
+        log.info("已将 %d 个历史分段压缩为每日汇总", len(old))
+        return len(old)
+
+    def _rotate(self):
+        stamp = time.strftime(SEGMENT_TIME_FORMAT, time.localtime(self._clock()))
+        # 同一秒内多次轮转时用序号区分，文件名的顺序就是时间顺序
+        n = 0
+        target = os.path.join(self.directory, f"history-{stamp}-{n:03d}.jsonl")
+        while os.path.exists(target):
+            n += 1
+            target = os.path.join(self.directory, f"history-{stamp}-{n:03d}.jsonl")
+        os.replace(self.path, target)
+        self.rotations += 1
+        log.debug("历史文件已轮转为 %s", target)
+
+    def _write(self, batch):
+        data = "".join(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n" for entry in batch)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            size = f.tell()
+        self.written += len(batch)
+        self.flushes += 1
+        if size >= self.segment_bytes:
+            self._rotate()
+            self._next_compact = 0.0
+
+    def _maintain(self):
+        if self._clock() < self._next_compact:
+            return
+        self._next_compact = self._clock() + COMPACT_INTERVAL
+        try:
+            self.compact()
+        except OSError as e:
+            self.last_error = e
+            log.warning("压缩提醒历史失败: %s", e)
+
+    def _run(self):
+        with self._cond:
+            while True:
+                if not self._batch:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    continue
+                # 第一条事件之后最多等待 flush_interval 秒凑成一批；批次满、flush() 或 close() 时立即写入
+                self._cond.wait_for(lambda: len(self._batch) >= self.batch_size or self._flush_requested
+                                    or self._closed, self.flush_interval)
+                self._flush_requested = False
+
+                batch, self._batch = self._batch, []
+                self._writing = True
+                self._cond.release()
+                try:
+                    self._write(batch)
+                    if self.on_flush is not None:
+                        self.on_flush()
+                    self._maintain()
+                except OSError as e:
+                    self.last_error = e
+                    log.warning("无法写入提醒历史 %s: %s", self.path, e)
+                finally:
+                    self._cond.acquire()
+                    self._writing = False
+                    self._cond.notify_all()
@@ -0,0 +1,86 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+
+# 日志写入用户目录，打包成无控制台窗口的程序后也能查看
+LOG_DIR = os.path.join(os.path.expanduser("~"), ".tigan_reminder")
+LOG_FILE = os.path.join(LOG_DIR, "tigan_reminder.log")
+# 单个日志文件的大小上限和保留的旧文件个数
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 3
+FILE_FORMAT = "%(asctime)s %(levelname)s [%(threadName)s] %(name)s: %(message)s"
+CONSOLE_FORMAT = "[%(levelname)s] %(message)s"
+# 未指定时从这个环境变量读取日志级别
+LOG_LEVEL_ENV = "TIGAN_LOG_LEVEL"
+
+_listener = None
+_queue_handler = None
+
+
+def parse_level(name):
+    """把 debug/info/warning/error 等名称转换为日志级别，无效时抛出 ValueError"""
+    level = logging.getLevelName(str(name).upper())
+    if not isinstance(level, int):
+        raise ValueError(f"未知的日志级别: {name}")
+    return level
+
+
+def setup_logging(level=None, log_file=LOG_FILE, console=None):
+    """配置日志：调用方只把记录放入队列，由后台线程写入轮转日志文件和控制台
+
+    低于 level 的日志在调用处就被丢弃，不会格式化参数；重复调用会替换之前的配置。
+    console 为 None 时仅在存在标准错误输出时（非无控制台窗口的打包程序）输出到控制台。
+    """
+    shutdown_logging()
+    if level is None:
+        level = os.environ.get(LOG_LEVEL_ENV) or "INFO"
+    if not isinstance(level, int):
+        level = parse_level(level)
+
+    handlers = []
+    if log_file:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8", delay=True)
+            file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+            handlers.append(file_handler)
+        except OSError as e:
+            if sys.stderr is not None:
+                sys.stderr.write(f"无法创建日志文件 {log_file}: {e}\n")
+    if console is None:
+        console = sys.stderr is not None
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+
+    global _listener, _queue_handler
+    records = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(records)
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(records, *handlers)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """写出队列中剩余的日志并停止后台线程"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,303 @@
+"""运行指标和只监听本机的 Prometheus 文本格式端点
+
+计时、提醒和保存配置的代码路径直接更新本模块中的计数器和直方图（每次只是加锁后加一），
+不开启端点时也只有这点开销。设置环境变量 TIGAN_METRICS_PORT 或使用 --metrics-port 参数后，
+在 127.0.0.1 上提供 /metrics，供本机的采集程序（Prometheus、Grafana Agent 等）抓取：
+
+    TIGAN_METRICS_PORT=9464 python tigan_reminder_v1.0.4.py
+    curl http://127.0.0.1:9464/metrics
+
+本模块只依赖标准库中的轻量模块，配置和提醒的代码可以直接导入；http.server
+在 MetricsServer.start() 中才导入，不开启端点时不增加启动时间。
+"""
+import bisect
+import logging
+import os
+import sys
+import threading
+
+log = logging.getLogger(__name__)
+
+METRICS_ENV = "TIGAN_METRICS_PORT"
+# 只监听本机，不对外暴露
+METRICS_HOST = "127.0.0.1"
+METRICS_PATH = "/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 计时线程的延迟通常在毫秒级，休眠恢复或界面卡顿时可能到秒级
+LATENESS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SAVE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """只增不减的计数，labelnames 非空时按标签值分别计数"""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name, _labels(self.labelnames, key), value
+
+
+class Histogram:
+    """按固定分桶统计观测值，observe() 是一次二分查找加一次加法"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets, labelnames=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        # 标签值 -> [各分桶（不累计）计数..., 超出最大分桶的计数, 总和]
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def count(self, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            counts = self._values.get(key)
+            return sum(counts[:-1]) if counts else 0
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, list(counts)) for key, counts in self._values.items())
+        for key, counts in values:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                yield self.name + "_bucket", _labels(self.labelnames, key, ("le", _number(bound))), cumulative
+            yield self.name + "_sum", _labels(self.labelnames, key), counts[-1]
+            yield self.name + "_count", _labels(self.labelnames, key), cumulative
+
+
+class Gauge:
+    """抓取时调用 func() 得到当前值，返回 None 时不输出"""
+
+    kind = "gauge"
+
+    def __init__(self, name, help, func):
+        self.name = name
+        self.help = help
+        self.func = func
+
+    def samples(self):
+        try:
+            value = self.func()
+        except Exception:
+            log.debug("读取指标 %s 失败", self.name, exc_info=True)
+            return
+        if value is not None:
+            yield self.name, "", value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, buckets, labelnames=()):
+        return self.register(Histogram(name, help, buckets, labelnames))
+
+    def gauge(self, name, help, func):
+        return self.register(Gauge(name, help, func))
+
+    def render(self):
+        """按 Prometheus 文本格式（0.0.4）输出全部指标"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def resident_memory():
+    """当前进程的常驻内存（字节），无法读取时返回 None"""
+    if sys.platform.startswith("linux"):
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+
+# 进程级别的指标，由各代码路径直接更新
+METRICS = MetricsRegistry()
+SCHEDULER_LATENESS = METRICS.histogram(
+    "tigan_scheduler_lateness_seconds", "计划到期后计时线程开始处理的延迟", LATENESS_BUCKETS, ("schedule",))
+REMINDER_LATENCY = METRICS.histogram(
+    "tigan_reminder_latency_seconds", "计划到期到提醒交给界面的耗时", LATENESS_BUCKETS, ("schedule",))
+COUNTDOWN_DRIFT = METRICS.histogram(
+    "tigan_countdown_drift_seconds", "倒计时结束时间与预定时间之差的绝对值", LATENESS_BUCKETS)
+REMINDERS_FIRED = METRICS.counter("tigan_reminders_fired_total", "已显示的提醒次数", ("schedule",))
+REMINDERS_COMPLETED = METRICS.counter("tigan_reminders_completed_total", "坚持到结束的倒计时次数", ("schedule",))
+REMINDERS_DISMISSED = METRICS.counter("tigan_reminders_dismissed_total", "提前关闭的倒计时次数", ("schedule",))
+CONFIG_SAVE_SECONDS = METRICS.histogram("tigan_config_save_seconds", "配置文件写入耗时", SAVE_BUCKETS)
+CONFIG_SAVES = METRICS.counter("tigan_config_saves_total", "配置保存次数（written、skipped 或 error）", ("result",))
+METRICS.gauge("tigan_threads", "进程中的线程数", threading.active_count)
+METRICS.gauge("process_resident_memory_bytes", "常驻内存（字节）", resident_memory)
+
+
+def schedule_label(profile):
+    """指标中区分提醒的标签值：主提醒为 main，其他为提醒配置的名称"""
+    return profile.name if profile is not None else "main"
+
+
+def _handler_class():
+    """导入 http.server 并定义请求处理类，只在启动端点时调用"""
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != METRICS_PATH:
+                self.send_error(404)
+                return
+            body = self.server.registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            log.debug("指标请求: " + format, *args)
+
+    return Handler
+
+
+class MetricsServer:
+    """在 127.0.0.1 的 port 端口提供 /metrics；port 为 0 时由系统分配，启动后从 port 读取"""
+
+    def __init__(self, port, registry=METRICS):
+        self.port = port
+        self.registry = registry
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{METRICS_HOST}:{self.port}{METRICS_PATH}"
+
+    def start(self):
+        """开始监听，端口被占用等错误时抛出 OSError"""
+        if self._server is not None:
+            return self
+        from http.server import ThreadingHTTPServer
+
+        server = ThreadingHTTPServer((METRICS_HOST, self.port), _handler_class())
+        server.daemon_threads = True
+        server.registry = self.registry
+        self._server = server
+        self.port = server.server_address[1]
+        self._thread = threading.Thread(target=server.serve_forever, name="MetricsServer", daemon=True)
+        self._thread.start()
+        log.info("指标端点已启动: %s", self.url)
+        return self
+
+    def stop(self, timeout=None):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        server.shutdown()
+        server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def parse_port(value):
+    """把参数或环境变量的值转换为端口号，空值返回 None；无效时抛出 ValueError"""
+    if value is None or str(value).strip() == "":
+        return None
+    port = int(value)
+    if not 0 <= port <= 65535:
+        raise ValueError(f"无效的指标端口: {value}")
+    return port
+
+
+def start_metrics_server(port=None):
+    """按参数（默认读取环境变量 TIGAN_METRICS_PORT）启动指标端点，未设置时返回 None
+
+    端口无效时抛出 ValueError；无法监听时只记录警告，不影响提醒。
+    """
+    if port is None:
+        port = os.environ.get(METRICS_ENV)
+    try:
+        port = parse_port(port)
+    except ValueError:
+        raise ValueError(f"无效的指标端口: {port}") from None
+    if port is None:
+        return None
+    try:
+        return MetricsServer(port).start()
+    except OSError as e:
+        log.warning("无法启动指标端点 %s:%s: %s", METRICS_HOST, port, e)
+        return None
@@ -0,0 +1,109 @@
+import logging
+import os
+
+from tigan_core.rules import compile_rule
+from tigan_core.sampler import RandomSampler
+
+log = logging.getLogger(__name__)
+
+# 提醒配置中倒计时的默认秒数
+DEFAULT_COUNTDOWN = 60
+
+
+class Profile:
+    """一个命名的提醒配置：间隔（分钟）或时间规则、倒计时（秒）、提示语和提示音
+
+    rule 不为 None 时按规则（tigan_core.rules.Rule）提醒，interval 为 None。
+    messages 为 None 时使用主配置的提示语和抽取方式，sound 为 None 时使用默认提示音。
+    自己的提示语只保存对配置中列表的引用，抽取器只记住上一次的下标，每个配置占用的内存是固定的。
+    """
+
+    __slots__ = ("name", "interval", "rule", "countdown", "messages", "sound", "enabled", "schedule", "next_fire",
+                 "_sampler")
+
+    def __init__(self, name, interval, countdown=DEFAULT_COUNTDOWN, messages=None, sound=None, enabled=True,
+                 rule=None):
+        self.name = name
+        self.interval = interval
+        self.rule = rule
+        self.countdown = countdown
+        self.messages = messages
+        self.sound = sound
+        self.enabled = enabled
+        self.schedule = None
+        self.next_fire = None  # 按规则提醒时下一次触发的时间戳
+        self._sampler = None
+
+    def __repr__(self):
+        timing = f"rule={self.rule.text!r}" if self.rule is not None else f"interval={self.interval}"
+        return f"Profile({self.name!r}, {timing}, countdown={self.countdown})"
+
+    def same_timing(self, other):
+        """间隔（或规则）相同时重新加载配置后可以沿用原来的计划，不重新计时"""
+        if other is None or self.interval != other.interval or self.enabled != other.enabled:
+            return False
+        return (self.rule.text if self.rule else None) == (other.rule.text if other.rule else None)
+
+    def pick_message(self):
+        """从自己的提示语中随机抽取一条（避开上一次），没有自己的提示语时返回 None"""
+        messages = self.messages
+        if not messages:
+            return None
+        sampler = self._sampler
+        if sampler is None or sampler.n != len(messages):
+            sampler = self._sampler = RandomSampler(len(messages))
+        return messages[sampler.draw()]
+
+
+def _parse_profile(entry, base_dir):
+    if not isinstance(entry, dict):
+        raise ValueError("每个提醒配置必须是一个对象")
+    name = entry.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("缺少 name")
+    rule = entry.get("schedule")
+    interval = None
+    if rule is not None:
+        rule = compile_rule(rule)
+    else:
+        interval = entry.get("interval")
+        if isinstance(interval, bool) or not isinstance(interval, int) or interval <= 0:
+            raise ValueError("interval 必须是大于 0 的整数（分钟），或者用 schedule 给出时间规则")
+    countdown = entry.get("countdown", DEFAULT_COUNTDOWN)
+    if isinstance(countdown, bool) or not isinstance(countdown, int) or countdown <= 0:
+        raise ValueError("countdown 必须是大于 0 的整数（秒）")
+    messages = entry.get("messages")
+    if messages is not None and (not isinstance(messages, list) or not all(isinstance(m, str) for m in messages)):
+        raise ValueError("messages 必须是字符串列表")
+    sound = entry.get("sound")
+    if sound is not None:
+        if not isinstance(sound, str) or not sound:
+            raise ValueError("sound 必须是文件路径")
+        sound = os.path.join(base_dir, sound)
+    return Profile(name.strip(), interval, countdown, messages or None, sound, bool(entry.get("enabled", True)),
+                   rule)
+
+
+def load_profiles(config, base_dir="."):
+    """解析配置中的 profiles 列表，只遍历各个配置一次；无效或重名的配置会被跳过并记录警告
+
+    sound 的相对路径相对于 base_dir（配置文件所在目录）。
+    """
+    entries = config.get("profiles") or []
+    if not isinstance(entries, list):
+        log.warning("profiles 必须是列表，已忽略")
+        return []
+    profiles = []
+    names = set()
+    for i, entry in enumerate(entries):
+        try:
+            profile = _parse_profile(entry, base_dir)
+        except ValueError as e:
+            log.warning("忽略第 %d 个提醒配置: %s", i + 1, e)
+            continue
+        if profile.name in names:
+            log.warning("忽略重名的提醒配置 %r", profile.name)
+            continue
+        names.add(profile.name)
+        profiles.append(profile)
+    return profiles
@@ -0,0 +1,146 @@
+"""按需开启的性能剖析
+
+用户反馈"提醒弹得慢""启动慢"时，可以设置环境变量 TIGAN_PERF_PROFILE 或使用 --perf-profile 参数，
+让下列代码段在 cProfile 和 tracemalloc 下运行，并把结果保存到配置文件所在目录的 perf-profiles/ 中
+（名称与提醒配置 profiles 区分开）：
+
+    startup         TiganReminderApp.__init__
+    load_messages   ReminderCore.load_config
+    show_reminder   show_reminder_with_countdown
+    save_messages   ConfigWriter 写入配置文件
+
+    TIGAN_PERF_PROFILE=all python tigan_reminder_v1.0.4.py
+    python tigan_reminder_v1.0.4.py --perf-profile startup,show_reminder
+
+每次运行生成 <代码段>-<时间>-<序号>.prof（可用 pstats 或 snakeviz 打开）、.snap（tracemalloc 快照）
+和 .txt（耗时最多的函数和分配最多的代码行）。未开启时包装函数只多一次集合判断，
+cProfile、pstats 和 tracemalloc 也只在第一次剖析时才导入，不增加启动时间。
+"""
+import functools
+import io
+import itertools
+import logging
+import os
+import threading
+import time
+
+from tigan_core.resources import CONFIG_FILE
+
+log = logging.getLogger(__name__)
+
+PROFILE_ENV = "TIGAN_PERF_PROFILE"
+SECTIONS = ("startup", "load_messages", "show_reminder", "save_messages")
+PROFILE_DIR_NAME = "perf-profiles"
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(CONFIG_FILE)), PROFILE_DIR_NAME)
+# tracemalloc 记录的调用栈深度和报告中列出的行数
+TRACE_FRAMES = 10
+REPORT_LINES = 25
+
+_active = frozenset()
+_out_dir = PROFILE_DIR
+# cProfile 和 tracemalloc 都是进程级的，同一时间只剖析一个代码段；嵌套或并发的代码段直接运行
+_busy = threading.Lock()
+_counter = itertools.count(1)
+
+
+def parse_sections(spec):
+    """把 "all"、"1" 或逗号分隔的代码段名称转换为集合，空字符串和 "0" 表示不开启；名称无效时抛出 ValueError"""
+    spec = (spec or "").strip().lower()
+    if spec in ("", "0", "off", "no"):
+        return frozenset()
+    if spec in ("1", "all", "on", "yes"):
+        return frozenset(SECTIONS)
+    sections = frozenset(name.strip() for name in spec.split(",") if name.strip())
+    unknown = sections.difference(SECTIONS)
+    if unknown:
+        raise ValueError(f"未知的剖析代码段: {', '.join(sorted(unknown))}（可选: {', '.join(SECTIONS)}）")
+    return sections
+
+
+def configure(spec=None, out_dir=None):
+    """开启剖析；spec 为 None 时读取环境变量 TIGAN_PERF_PROFILE，返回开启的代码段"""
+    global _active, _out_dir
+    if spec is None:
+        spec = os.environ.get(PROFILE_ENV, "")
+    _active = parse_sections(spec)
+    _out_dir = out_dir or PROFILE_DIR
+    if _active:
+        log.info("性能剖析已开启: %s，结果保存到 %s", ", ".join(sorted(_active)), _out_dir)
+    return _active
+
+
+def enabled(section):
+    return section in _active
+
+
+def profiled(section):
+    """装饰器：代码段开启剖析时在 cProfile 和 tracemalloc 下运行被装饰的函数"""
+    if section not in SECTIONS:
+        raise ValueError(f"未知的剖析代码段: {section}")
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if section not in _active or not _busy.acquire(blocking=False):
+                return func(*args, **kwargs)
+            try:
+                return _run(section, func, args, kwargs)
+            finally:
+                _busy.release()
+        return wrapper
+    return decorate
+
+
+def _run(section, func, args, kwargs):
+    import cProfile
+    import tracemalloc
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # 其他剖析工具（例如调试器）已经在运行时 cProfile 无法启用
+        log.warning("无法剖析 %s: %s", section, e)
+        return func(*args, **kwargs)
+    profiler.disable()
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    elif hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    begin = time.perf_counter()
+    profiler.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - begin
+        peak = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+        _dump(section, profiler, snapshot, elapsed, peak)
+
+
+def _dump(section, profiler, snapshot, elapsed, peak):
+    import pstats
+
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    base = os.path.join(_out_dir, f"{section}-{stamp}-{next(_counter)}")
+    try:
+        os.makedirs(_out_dir, exist_ok=True)
+        profiler.dump_stats(base + ".prof")
+        snapshot.dump(base + ".snap")
+        report = io.StringIO()
+        report.write(f"{section}: {elapsed * 1000:.1f} ms，峰值内存 {peak / 1024:.1f} KB\n\n")
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(REPORT_LINES)
+        report.write("\n分配内存最多的代码行:\n")
+        for stat in snapshot.statistics("lineno")[:REPORT_LINES]:
+            report.write(f"{stat}\n")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
+    except OSError as e:
+        log.warning("无法保存剖析结果 %s: %s", base, e)
+        return
+    log.info("%s 耗时 %.1f ms，峰值内存 %.1f KB，剖析结果: %s.prof", section, elapsed * 1000, peak / 1024, base)
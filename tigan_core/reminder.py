@@ -0,0 +1,409 @@
+import logging
+import os
+
+from tigan_core.audio import AudioWorker, SoundCache
+from tigan_core.config import DEFAULT_MESSAGES, ConfigWriter, default_config, load_config, read_config
+from tigan_core.history import EVENT_COMPLETE, EVENT_DISMISS, EVENT_FIRE, HISTORY_DIR, HistoryLog
+from tigan_core.metrics import (COUNTDOWN_DRIFT, REMINDER_LATENCY, REMINDERS_COMPLETED, REMINDERS_DISMISSED,
+                                REMINDERS_FIRED, SCHEDULER_LATENESS, schedule_label)
+from tigan_core.profiles import load_profiles
+from tigan_core.profiling import profiled
+from tigan_core.resources import CONFIG_FILE, SOUND_FILE
+from tigan_core.sampler import SamplerStateWriter, load_sampler_state, make_sampler, sampler_state, source_signature
+from tigan_core.scheduler import RESUME_IGNORE, RESUME_POLICIES, RESUME_RESTART, TimerEngine
+from tigan_core.stats import HistoryStats
+from tigan_core.store import MessageStore
+from tigan_core.watcher import ConfigWatcher
+
+log = logging.getLogger(__name__)
+
+# 外部修改配置文件后可以直接应用到运行中程序的字段
+RELOADABLE_KEYS = ("messages", "message_pack", "sampling", "message_weights", "recent_window", "resume_policy",
+                   "profiles", "theme", "auto_start", "minimize_to_tray_on_start")
+# 可以从配置文件中删除的字段，删除后视为恢复默认
+OPTIONAL_KEYS = ("message_pack", "sampling", "message_weights", "recent_window", "resume_policy", "profiles")
+# 按时间规则提醒的计划触发时墙上时钟早于预定时间超过这么多秒，认为时钟被调回，只重新安排不提醒
+RULE_EARLY_TOLERANCE = 1.0
+# 这些字段变化后需要重新建立提示语抽取器
+SAMPLER_KEYS = ("messages", "message_pack", "sampling", "message_weights", "recent_window")
+
+
+class ReminderCore:
+    """提醒器核心：配置、计时计划、提示语选择、提示音和提醒历史，不依赖任何界面
+
+    所有回调（on_reminder、on_prewarm、on_save_error、on_config_change）都在后台线程中调用，
+    界面需要自行切换到自己的线程；主提醒回调时 profile 为 None。
+    """
+
+    def __init__(self, on_reminder=None, config_file=CONFIG_FILE, sound_file=SOUND_FILE, engine=None,
+                 on_prewarm=None, prewarm_lead=5.0, on_save_error=None, on_config_change=None,
+                 history_dir=HISTORY_DIR):
+        self.on_reminder = on_reminder
+        self.on_prewarm = on_prewarm
+        self.prewarm_lead = prewarm_lead
+        self.config_file = config_file
+        self.writer = ConfigWriter(config_file, on_error=on_save_error)
+        self.on_config_change = on_config_change
+        # 提示音解码后常驻内存，由一个长期运行的播放线程负责播放；同一个文件只解码一次
+        self.audio = AudioWorker(SoundCache(sound_file))
+        self._sounds = {sound_file: self.audio.cache}
+        self.engine = engine if engine is not None else TimerEngine()
+        self.watcher = ConfigWatcher(self.engine, config_file, self.reload_config)
+        # 自己保存的配置不当作外部修改重新加载
+        self.writer.on_write = self.watcher.acknowledge
+        self.history = None
+        self.stats = None
+        if history_dir:
+            self.history = HistoryLog(history_dir)
+            self.stats = HistoryStats(self.history)
+            self.history.on_flush = self.stats.save
+        self.config = default_config()
+        self.store = None
+        self.sampler_state_file = os.path.join(self._config_dir(), "sampler_state.json")
+        self.sampler_writer = SamplerStateWriter(self.sampler_state_file)
+        self._sampler = None
+        self._sampler_source = None
+        self.schedule = None
+        self.prewarm_schedule = None
+        self.profiles = []
+
+    @property
+    def running(self):
+        return self.schedule is not None
+
+    @property
+    def messages(self):
+        return self.config["messages"]
+
+    @messages.setter
+    def messages(self, messages):
+        self.config["messages"] = messages
+        self._sampler = None
+
+    @profiled("load_messages")
+    def load_config(self):
+        """从配置文件加载配置并返回"""
+        self.config = load_config(self.config_file, self.config.get("theme", "dark"))
+        self._sampler = None
+        self.open_message_pack()
+        self.profiles = load_profiles(self.config, self._config_dir())
+        return self.config
+
+    def _config_dir(self):
+        return os.path.dirname(os.path.abspath(self.config_file))
+
+    def open_message_pack(self):
+        """按配置打开提示语包；未配置或无法打开时使用配置中的 messages"""
+        pack = self.config.get("message_pack")
+        if pack:
+            pack = os.path.join(self._config_dir(), pack)
+        if self.store is not None and self.store.path != pack:
+            self.store.close()
+            self.store = None
+        if pack and self.store is None:
+            try:
+                self.store = MessageStore(pack)
+                log.info("已打开提示语包 %s，共 %d 条", pack, len(self.store))
+            except OSError as e:
+                log.warning("无法打开提示语包 %s: %s。将使用配置中的提示语。", pack, e)
+        return self.store
+
+    def watch_config(self):
+        """开始检测配置文件的外部修改，只把变化的字段合并进来并调用 on_config_change(changed)"""
+        self.engine.start()
+        self.watcher.start()
+
+    def reload_config(self):
+        """重新读取配置文件并只应用发生变化的字段，返回 False 表示暂时不能应用，稍后重试"""
+        if self.writer.pending:
+            # 还有尚未写入的修改时文件中是旧内容，不能用它覆盖内存中的配置；写入后监视器会记录新的文件状态
+            log.debug("配置正在保存，暂不重新加载")
+            return False
+        try:
+            config, _ = read_config(self.config_file)
+        except (OSError, ValueError) as e:
+            log.warning("重新加载配置失败，稍后重试: %s", e)
+            return False
+        changed = {key: config.get(key) for key in RELOADABLE_KEYS
+                   if (key in config or key in OPTIONAL_KEYS) and config.get(key) != self.config.get(key)}
+        if changed:
+            self.config.update(changed)
+            for key in OPTIONAL_KEYS:
+                if self.config.get(key) is None:
+                    self.config.pop(key, None)
+            log.info("检测到配置文件变化，已更新: %s", ", ".join(changed))
+            if "message_pack" in changed:
+                self.open_message_pack()
+            if any(key in changed for key in SAMPLER_KEYS):
+                self._sampler = None
+            if "resume_policy" in changed and self.schedule is not None:
+                self.schedule.resume_policy = self.resume_policy()
+                for profile in self.profiles:
+                    if profile.schedule is not None and profile.rule is None:
+                        profile.schedule.resume_policy = self.schedule.resume_policy
+            if "profiles" in changed:
+                self.update_profiles(load_profiles(self.config, self._config_dir()))
+            if self.on_config_change:
+                self.on_config_change(changed)
+        return True
+
+    def save_config(self, on_saved=None, **changes):
+        """更新配置项并交给后台线程保存，不会阻塞调用方；写入成功后在后台线程中调用 on_saved()"""
+        self.config.update(changes)
+        self.writer.submit(self.config, on_saved)
+
+    def resume_policy(self):
+        """提醒计划在系统休眠恢复后的处理方式，配置无效时使用 restart"""
+        policy = self.config.get("resume_policy", RESUME_RESTART)
+        if policy not in RESUME_POLICIES:
+            log.warning("未知的休眠恢复策略 %r，将使用 %s", policy, RESUME_RESTART)
+            policy = RESUME_RESTART
+        return policy
+
+    def start(self, interval_minutes):
+        """按分钟间隔开始提醒，间隔无效时抛出 ValueError"""
+        interval_minutes = int(interval_minutes)
+        if interval_minutes <= 0:
+            raise ValueError("提醒间隔必须是大于 0 的整数。")
+        if self.running:
+            return
+        self.engine.start()
+        self.load_stats()
+        # 在播放线程中预先解码提示音，第一次提醒时无需再加载
+        self.audio.start()
+        self.audio.preload()
+        interval = interval_minutes * 60
+        self.schedule = self.engine.add(interval, self.run_timer, name="default", resume_policy=self.resume_policy())
+        if self.on_prewarm is not None:
+            self.prewarm_schedule = self.engine.add(interval, self.prewarm, name="prewarm",
+                                                    delay=max(0.0, interval - self.prewarm_lead))
+            self.engine.add_resume_listener(self.align_prewarm)
+        self.start_profiles()
+
+    def _sound(self, path):
+        """返回该文件的提示音缓存，同一个文件的多个配置共用一份"""
+        if path is None:
+            return self.audio.cache
+        cache = self._sounds.get(path)
+        if cache is None:
+            cache = self._sounds[path] = SoundCache(path)
+        return cache
+
+    def _start_profile(self, profile):
+        if not profile.enabled or profile.schedule is not None:
+            return
+        self.audio.preload(self._sound(profile.sound))
+        name = f"profile:{profile.name}"
+        if profile.rule is None:
+            profile.schedule = self.engine.add(profile.interval * 60, self.run_profile, name=name, data=profile,
+                                               resume_policy=self.resume_policy())
+            return
+        # 规则计划每次触发后重新计算，休眠恢复后由 align_rules 按墙上时钟重新安排
+        now = self.engine.wall_time()
+        profile.next_fire = profile.rule.next_fire(now)
+        delay = profile.next_fire - now
+        profile.schedule = self.engine.add(delay, self.run_profile, name=name, data=profile,
+                                           resume_policy=RESUME_IGNORE)
+        log.debug("提醒配置 %s 下一次在 %.0f 秒后", profile.name, delay)
+
+    def _arm_rule(self, profile, now):
+        profile.next_fire = profile.rule.next_fire(now)
+        self.engine.reschedule(profile.schedule, delay=profile.next_fire - now)
+
+    def align_rules(self, gap=None):
+        """系统休眠后按墙上时钟重新安排按规则提醒的计划，休眠期间错过的提醒不再补发"""
+        now = self.engine.wall_time()
+        for profile in self.profiles:
+            if profile.rule is not None and profile.schedule is not None:
+                self._arm_rule(profile, now)
+
+    def start_profiles(self):
+        """为每个启用的提醒配置添加一个计划，全部由同一个计时线程调度"""
+        for profile in self.profiles:
+            self._start_profile(profile)
+        if self.profiles:
+            self.engine.add_resume_listener(self.align_rules)
+            log.info("已启动 %d 个提醒配置", sum(1 for p in self.profiles if p.schedule is not None))
+
+    def stop_profiles(self):
+        self.engine.remove_resume_listener(self.align_rules)
+        for profile in self.profiles:
+            if profile.schedule is not None:
+                self.engine.cancel(profile.schedule)
+                profile.schedule = None
+
+    def update_profiles(self, profiles):
+        """应用重新加载的提醒配置：间隔不变的沿用原来的计划（不重新计时），其余的取消或新建"""
+        old = {profile.name: profile for profile in self.profiles}
+        for profile in profiles:
+            previous = old.pop(profile.name, None)
+            if previous is not None and previous.schedule is not None and profile.same_timing(previous):
+                profile.schedule = previous.schedule
+                profile.schedule.data = profile
+                previous.schedule = None
+        for previous in self.profiles:
+            # 已删除或间隔、启用状态变化的配置
+            if previous.schedule is not None:
+                self.engine.cancel(previous.schedule)
+                previous.schedule = None
+        self.profiles = profiles
+        if self.running:
+            self.start_profiles()
+
+    def align_prewarm(self, gap=None):
+        """休眠恢复后提醒的截止时间可能已改变，让预热仍然在提醒前 prewarm_lead 秒进行"""
+        schedule, prewarm = self.schedule, self.prewarm_schedule
+        if schedule is None or prewarm is None:
+            return
+        remaining = self.engine.remaining(schedule)
+        if remaining is not None:
+            self.engine.reschedule(prewarm, delay=max(0.0, remaining - self.prewarm_lead))
+
+    def time_to_next(self):
+        """距离下一次提醒的秒数，未运行时返回 None"""
+        schedule = self.schedule
+        return self.engine.remaining(schedule) if schedule is not None else None
+
+    def stop(self):
+        """停止提醒，取消计划即可，无需等待计时线程"""
+        if self.schedule is not None:
+            self.engine.cancel(self.schedule)
+            self.schedule = None
+            log.info("计时器已停止。")
+        if self.prewarm_schedule is not None:
+            self.engine.cancel(self.prewarm_schedule)
+            self.engine.remove_resume_listener(self.align_prewarm)
+            self.prewarm_schedule = None
+        self.stop_profiles()
+
+    def shutdown(self, timeout=0.5):
+        """停止提醒、计时线程和播放线程，并写入尚未保存的配置"""
+        self.stop()
+        self.watcher.stop()
+        self.writer.close(timeout=2.0)
+        self.sampler_writer.close(timeout=2.0)
+        if self.history is not None:
+            self.history.close(timeout=2.0)
+        self.engine.stop(timeout=timeout)
+        self.audio.stop(timeout=timeout)
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def run_timer(self, schedule=None):
+        """计划到期回调，在计时线程中执行"""
+        # 只有仍然是 running 状态时才显示提醒
+        if self.running:
+            log.debug("计时器时间到，准备显示提醒...")
+            self.show_reminder(schedule.last_deadline if schedule else None)
+        else:
+            log.debug("计时器时间到，但状态已变为停止，不显示提醒。")
+
+    def run_profile(self, schedule):
+        """提醒配置的计划到期回调，在计时线程中执行"""
+        profile = schedule.data
+        if profile.schedule is not schedule:
+            return
+        if profile.rule is not None:
+            now = self.engine.wall_time()
+            early = profile.next_fire - now > RULE_EARLY_TOLERANCE
+            # 提前不超过容差时从预定时间起算，避免同一时刻再触发一次
+            self._arm_rule(profile, now if early else max(now, profile.next_fire))
+            if early:
+                log.debug("提醒配置 %s 触发时墙上时钟早于预定时间，重新安排", profile.name)
+                return
+        self.show_reminder(schedule.last_deadline, profile)
+
+    def prewarm(self, schedule=None):
+        """提醒即将到期，通知界面提前准备"""
+        if self.running and self.on_prewarm:
+            self.on_prewarm()
+
+    def _message_source(self):
+        """返回 (提示语序列, 用于识别它的摘要)：有内容的提示语包优先，其次是配置中的提示语"""
+        store = self.store
+        if store is not None:
+            try:
+                store.refresh()
+            except OSError as e:
+                log.warning("读取提示语包失败: %s。将使用配置中的提示语。", e)
+            else:
+                if len(store):
+                    return store, f"pack:{store.path}:{len(store)}"
+        # 确保 self.messages 是列表且不为空
+        messages = self.messages
+        if not isinstance(messages, list) or not messages:
+            messages = DEFAULT_MESSAGES
+        if self._sampler is not None and self._sampler_source[0] is messages:
+            return messages, self._sampler_source[1]
+        return messages, source_signature(messages)
+
+    def _build_sampler(self, n, source):
+        mode = self.config.get("sampling", "shuffle")
+        window = self.config.get("recent_window", 1)
+        try:
+            sampler = make_sampler(mode, n, self.config.get("message_weights"), window)
+        except (TypeError, ValueError) as e:
+            log.warning("抽取设置无效 (%s)，将使用默认的洗牌抽取。", e)
+            sampler = make_sampler("shuffle", n)
+        if load_sampler_state(self.sampler_state_file, sampler, source):
+            log.debug("已恢复提示语抽取状态（%s）", sampler.mode)
+        return sampler
+
+    def pick_message(self):
+        """按抽取设置选择一条提示语，每次抽取为 O(1)；配置了提示语包时只读取被选中的那一行"""
+        items, source = self._message_source()
+        sampler = self._sampler
+        if sampler is None or sampler.n != len(items) or self._sampler_source[1] != source:
+            sampler = self._sampler = self._build_sampler(len(items), source)
+            self._sampler_source = (items, source)
+        msg = items[sampler.draw()]
+        # 由后台线程合并后保存，计时线程不等待磁盘 I/O
+        self.sampler_writer.submit(sampler_state(sampler, source))
+        return msg
+
+    def play_sound(self, deadline=None, sound=None):
+        """把播放请求交给播放线程，不会阻塞计时线程；sound 为提示音文件，默认使用主提示音"""
+        if not self.audio.submit(deadline, self._sound(sound)):
+            log.warning("播放队列已满，丢弃本次提示音")
+
+    def show_reminder(self, deadline=None, profile=None):
+        """播放提示音并把选中的提示语交给界面显示
+
+        deadline 是触发本次提醒的单调时钟截止时间，用于统计提示音延迟；
+        profile 为触发本次提醒的提醒配置，主提醒为 None。
+        """
+        label = schedule_label(profile)
+        if deadline is not None:
+            SCHEDULER_LATENESS.observe(max(0.0, self.engine.now() - deadline), schedule=label)
+        self.play_sound(deadline, profile.sound if profile is not None else None)
+        msg = profile.pick_message() if profile is not None else None
+        if msg is None:
+            msg = self.pick_message()
+        self._record(EVENT_FIRE, profile)
+        if self.on_reminder:
+            self.on_reminder(msg, profile)
+        REMINDERS_FIRED.inc(schedule=label)
+        if deadline is not None:
+            REMINDER_LATENCY.observe(max(0.0, self.engine.now() - deadline), schedule=label)
+        return msg
+
+    def load_stats(self):
+        """第一次使用前读取（或从历史重建）提醒统计，返回 stats；未记录历史时返回 None"""
+        if self.stats is not None and not self.stats.loaded:
+            self.stats.load()
+        return self.stats
+
+    def _record(self, event, profile, **fields):
+        if self.history is None:
+            return
+        entry = self.history.record(event, profile.name if profile is not None else None, **fields)
+        if self.stats.loaded:
+            self.stats.apply(entry)
+
+    def record_countdown(self, profile, planned, held, completed, drift=None):
+        """记录界面上一次倒计时的结果：completed 表示坚持到了结束，否则为提前关闭；drift 为结束时间的漂移（秒）"""
+        (REMINDERS_COMPLETED if completed else REMINDERS_DISMISSED).inc(schedule=schedule_label(profile))
+        if drift is not None:
+            COUNTDOWN_DRIFT.observe(abs(drift))
+        self._record(EVENT_COMPLETE if completed else EVENT_DISMISS, profile, planned=planned, held=round(held, 1))
@@ -0,0 +1,111 @@
+import logging
+import os
+import platform
+import sys
+
+log = logging.getLogger(__name__)
+
+
+# 程序自带的资源文件
+RESOURCE_NAMES = ("icon.png", "icon.ico", "ding.mp3")
+
+
+def resource_base():
+    """资源所在目录，适用于开发环境和打包后的环境"""
+    # PyInstaller 创建临时文件夹并将路径存储在 _MEIPASS
+    base_path = getattr(sys, "_MEIPASS", None)
+    if base_path is None:
+        # 如果不是通过 PyInstaller 运行，则使用脚本所在的目录
+        base_path = os.path.abspath(".")
+        # 特殊处理 macOS App Bundle
+        if platform.system() == "Darwin" and ".app" in base_path:
+             base_path = os.path.join(base_path, "Resources")
+    return base_path
+
+
+# 函数：获取资源文件的绝对路径
+def resource_path(relative_path):
+    """获取资源的绝对路径，适用于开发环境和打包后的环境"""
+    return os.path.join(resource_base(), relative_path)
+
+
+class ResourceEntry:
+    """清单中的一个资源：路径、是否存在，以及首次读取后缓存的内容"""
+
+    __slots__ = ("name", "path", "exists", "_data")
+
+    def __init__(self, name, path, exists):
+        self.name = name
+        self.path = path
+        self.exists = exists
+        self._data = None
+
+    def read(self):
+        """返回文件内容（只读取一次），不存在或读取失败时返回 None"""
+        if self._data is None and self.exists:
+            try:
+                with open(self.path, "rb") as f:
+                    self._data = f.read()
+            except OSError as e:
+                log.warning("无法读取资源 %s: %s", self.path, e)
+                self.exists = False
+        return self._data
+
+
+class ResourceManifest:
+    """启动时解析一次的资源清单
+
+    资源目录只在创建清单时用一次 os.scandir 扫描，之后查询路径和是否存在都不再访问文件系统。
+    """
+
+    def __init__(self, names=RESOURCE_NAMES, base_path=None):
+        self.base_path = base_path or resource_base()
+        try:
+            with os.scandir(self.base_path) as it:
+                files = {entry.name for entry in it if entry.is_file()}
+        except OSError:
+            files = set()
+        self._entries = {}
+        for name in names:
+            path = os.path.join(self.base_path, name)
+            exists = name in files if os.path.basename(name) == name else os.path.isfile(path)
+            self._entries[name] = ResourceEntry(name, path, exists)
+        if log.isEnabledFor(logging.DEBUG):
+            for entry in self._entries.values():
+                log.debug("资源 %s: %s, 文件存在: %s", entry.name, entry.path, entry.exists)
+
+    def __getitem__(self, name):
+        return self._entries[name]
+
+    def path(self, name):
+        return self._entries[name].path
+
+    def exists(self, name):
+        return self._entries[name].exists
+
+    def read(self, name):
+        return self._entries[name].read()
+
+
+# 获取配置文件路径 - 对于配置文件，我们希望它保存在用户可写的目录中
+def get_config_path():
+    """获取配置文件的路径，确保它可以被写入"""
+    try:
+        # PyInstaller 环境下，将配置文件保存在用户目录中
+        base_path = sys._MEIPASS
+        # 使用用户目录保存配置文件
+        config_dir = os.path.expanduser("~/.tigan_reminder")
+        if not os.path.exists(config_dir):
+            os.makedirs(config_dir)
+        return os.path.join(config_dir, "messages.json")
+    except Exception:
+        # 开发环境下或其他情况，使用当前目录
+        return os.path.join(os.path.abspath("."), "messages.json")
+
+
+# 资源清单只解析一次，之后使用缓存的路径和存在状态
+RESOURCES = ResourceManifest()
+CONFIG_FILE = get_config_path()
+TRAY_ICON_FILE = RESOURCES.path("icon.png") # 明确用于托盘图标
+WINDOW_ICON_FILE = RESOURCES.path("icon.ico") # 明确用于窗口图标 (.ico)
+SOUND_FILE = RESOURCES.path("ding.mp3")
@@ -0,0 +1,195 @@
+"""提醒时间规则，例如
+
+    every 45m mon-fri 09:00-18:00 skip 12:00-13:00
+    every 20m 08:30-12:00 13:30-17:30
+    at 10:00 15:30 weekends
+
+- every <N>m / <N>h：在每个时间段内从段的起点起每隔 N 分钟（小时）提醒一次
+- HH:MM-HH:MM：时间段（包含开始、不包含结束），可以有多个，省略时为全天
+- skip HH:MM-HH:MM：之后的时间段改为排除（例如午休），排除后的下午段从排除结束时重新计时
+- at HH:MM ...：固定时刻提醒
+- mon..sun、mon-fri、daily、weekdays、weekends：生效的星期，省略时为每天
+"""
+import array
+import bisect
+import datetime
+import itertools
+import re
+import time
+
+DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DAY_ALIASES = {"daily": range(7), "weekdays": range(5), "weekends": range(5, 7)}
+DAY_SECONDS = 24 * 3600
+
+_EVERY_RE = re.compile(r"^(\d+)(m|min|h)$")
+_TIME_RE = re.compile(r"^(\d{1,2}):(\d{2})$")
+_WINDOW_RE = re.compile(r"^(\d{1,2}:\d{2})-(\d{1,2}:\d{2})$")
+_DAYS_RE = re.compile(r"^([a-z]{3})(?:-([a-z]{3}))?$")
+
+
+def _parse_time(text):
+    m = _TIME_RE.match(text)
+    if not m:
+        raise ValueError(f"无效的时间: {text}")
+    hour, minute = int(m.group(1)), int(m.group(2))
+    if minute >= 60 or hour > 24 or (hour == 24 and minute):
+        raise ValueError(f"无效的时间: {text}")
+    return hour * 3600 + minute * 60
+
+
+def _parse_day(name):
+    if name not in DAY_NAMES:
+        raise ValueError(f"无效的星期: {name}")
+    return DAY_NAMES.index(name)
+
+
+def _merge(windows):
+    """合并重叠的时间段"""
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _subtract(windows, skips):
+    """从时间段中去掉排除的部分"""
+    result = []
+    for start, end in windows:
+        for skip_start, skip_end in skips:
+            if skip_end <= start or skip_start >= end:
+                continue
+            if skip_start > start:
+                result.append((start, skip_start))
+            start = max(start, skip_end)
+            if start >= end:
+                break
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+def _timestamp(day, seconds):
+    """本地日期加上当天的秒数转换为时间戳，夏令时切换由 mktime 处理"""
+    return time.mktime((day.year, day.month, day.day, seconds // 3600, seconds % 3600 // 60, seconds % 60,
+                        0, 0, -1))
+
+
+class Rule:
+    """编译后的提醒时间规则
+
+    编译时为一周的每一天预先算出排好序的触发时刻（当天的秒数），以及每一天之后
+    下一个有触发时刻的日子相隔几天；计算下一次触发只需一次二分查找，
+    不会逐分钟扫描，规则再稀疏也最多跳过一周。
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.every = None
+        days, windows, skips, at_times = set(), [], [], []
+        mode = None
+        tokens = text.lower().replace("，", ",").replace(",", " ").split()
+        for token in tokens:
+            if token in ("every", "at", "skip"):
+                if token == "every" and self.every is not None:
+                    raise ValueError("every 只能出现一次")
+                mode = token
+                continue
+            if mode == "every":
+                m = _EVERY_RE.match(token)
+                if not m:
+                    raise ValueError(f"无效的间隔: {token}")
+                self.every = int(m.group(1)) * (3600 if m.group(2) == "h" else 60)
+                if not self.every:
+                    raise ValueError("间隔必须大于 0")
+                mode = None
+                continue
+            m = _WINDOW_RE.match(token)
+            if m:
+                start, end = _parse_time(m.group(1)), _parse_time(m.group(2))
+                if end <= start:
+                    raise ValueError(f"时间段的结束必须晚于开始（不支持跨午夜）: {token}")
+                (skips if mode == "skip" else windows).append((start, end))
+                continue
+            if _TIME_RE.match(token):
+                if mode != "at":
+                    raise ValueError(f"固定时刻需要写在 at 之后: {token}")
+                seconds = _parse_time(token)
+                if seconds >= DAY_SECONDS:
+                    raise ValueError(f"无效的时间: {token}")
+                at_times.append(seconds)
+                continue
+            if token in DAY_ALIASES:
+                days.update(DAY_ALIASES[token])
+                mode = None
+                continue
+            m = _DAYS_RE.match(token)
+            if m:
+                first = _parse_day(m.group(1))
+                last = _parse_day(m.group(2)) if m.group(2) else first
+                # mon-fri、fri-mon 都可以
+                days.update((first + i) % 7 for i in range((last - first) % 7 + 1))
+                mode = None
+                continue
+            raise ValueError(f"无法识别: {token}")
+        if mode == "every":
+            raise ValueError("every 之后缺少间隔")
+        if self.every is None and not at_times:
+            raise ValueError("规则需要 every 间隔或 at 固定时刻")
+        if self.every is None and windows:
+            raise ValueError("时间段需要配合 every 使用")
+
+        skips = _merge(skips)
+        fires = set(t for t in at_times if not any(s <= t < e for s, e in skips))
+        if self.every is not None:
+            for start, end in _subtract(_merge(windows or [(0, DAY_SECONDS)]), skips):
+                fires.update(range(start + self.every, end, self.every))
+        table = array.array("l", sorted(fires))
+        empty = array.array("l")
+        self.days = tuple(sorted(days)) if days else tuple(range(7))
+        self._tables = tuple(table if wd in self.days else empty for wd in range(7))
+        if not table:
+            raise ValueError("规则永远不会触发")
+        # 每一天之后下一个有触发时刻的日子相隔的天数（1 到 7）
+        self._ahead = tuple(next(k for k in range(1, 8) if self._tables[(wd + k) % 7]) for wd in range(7))
+
+    def __repr__(self):
+        return f"Rule({self.text!r})"
+
+    def fires_per_week(self):
+        return sum(len(table) for table in self._tables)
+
+    def iter_fires(self, after):
+        """从时间戳 after 之后（不含）依次惰性地产生触发时间戳"""
+        lt = time.localtime(after)
+        day = datetime.date(lt.tm_year, lt.tm_mon, lt.tm_mday)
+        table = self._tables[day.weekday()]
+        i = bisect.bisect_right(table, lt.tm_hour * 3600 + lt.tm_min * 60 + lt.tm_sec)
+        last = after
+        while True:
+            for k in range(i, len(table)):
+                t = _timestamp(day, table[k])
+                # 夏令时结束时重复的一小时可能得到更早的时间，跳过以保证递增
+                if t > last:
+                    last = t
+                    yield t
+            day += datetime.timedelta(days=self._ahead[day.weekday()])
+            table = self._tables[day.weekday()]
+            i = 0
+
+    def next_fire(self, after):
+        """时间戳 after 之后的下一次触发时间戳"""
+        return next(self.iter_fires(after))
+
+    def next_fires(self, after, count):
+        """after 之后的 count 次触发时间戳"""
+        return list(itertools.islice(self.iter_fires(after), count))
+
+
+def compile_rule(text):
+    """解析并编译规则，无效时抛出 ValueError"""
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("规则不能为空")
+    return Rule(text.strip())
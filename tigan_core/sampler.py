@@ -0,0 +1,281 @@
+import array
+import collections
+import hashlib
+import json
+import logging
+import random
+
+from tigan_core.config import ConfigWriter, atomic_write
+
+log = logging.getLogger(__name__)
+
+SAMPLING_MODES = ("shuffle", "weighted", "random")
+# 抽到最近出现过的提示语时重新抽取的次数上限
+MAX_TRIES = 8
+# 洗牌袋排列的 Feistel 轮数
+FEISTEL_ROUNDS = 6
+
+
+def source_signature(messages):
+    """提示语列表的摘要，用于判断保存的抽取状态是否仍然适用"""
+    digest = hashlib.blake2b(digest_size=16)
+    for message in messages:
+        digest.update(message.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class RecencyWindow:
+    """最近 size 次抽到的下标，判断是否出现过为 O(1)"""
+
+    def __init__(self, size, recent=()):
+        self.size = max(0, size)
+        self._order = collections.deque()
+        self._counts = {}
+        for i in recent:
+            self.add(i)
+
+    def __contains__(self, i):
+        return i in self._counts
+
+    def add(self, i):
+        if not self.size:
+            return
+        self._order.append(i)
+        self._counts[i] = self._counts.get(i, 0) + 1
+        if len(self._order) > self.size:
+            old = self._order.popleft()
+            if self._counts[old] == 1:
+                del self._counts[old]
+            else:
+                self._counts[old] -= 1
+
+    def items(self):
+        return list(self._order)
+
+
+class AliasTable:
+    """Vose 别名表：O(n) 建表后每次按权重抽取为 O(1)"""
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights)) if n else 0.0
+        if not n or total <= 0 or any(w < 0 for w in weights):
+            raise ValueError("权重必须是非负数且总和大于 0")
+        self.prob = array.array("d", bytes(8 * n))
+        self.alias = array.array("q", bytes(8 * n))
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large[-1]
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            if scaled[l] < 1.0:
+                small.append(large.pop())
+        # 剩下的都是（因浮点误差）概率为 1 的列
+        for i in large + small:
+            self.prob[i] = 1.0
+            self.alias[i] = i
+
+    def __len__(self):
+        return len(self.prob)
+
+    def draw(self, rng=random):
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class FeistelPermutation:
+    """由种子决定的 range(n) 的随机排列，不为每个元素保存任何数据，可以直接求第 k 个位置上的值
+
+    在覆盖 n 的偶数位宽的定义域上做 FEISTEL_ROUNDS 轮 Feistel 变换（本身就是双射），
+    结果不小于 n 时继续变换（cycle walking），得到 range(n) 上的双射。定义域不超过 4n，
+    平均变换不到 4 次，每次取值都是 O(1)。
+    """
+
+    def __init__(self, n, seed):
+        self.n = n
+        bits = max(2, (n - 1).bit_length())
+        self._half = (bits + 1) // 2
+        self._mask = (1 << self._half) - 1
+        rng = random.Random(seed)
+        self._keys = [rng.getrandbits(64) for _ in range(FEISTEL_ROUNDS)]
+
+    def __getitem__(self, k):
+        half, mask = self._half, self._mask
+        while True:
+            left, right = k >> half, k & mask
+            for key in self._keys:
+                h = ((right ^ key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+                left, right = right, left ^ ((h ^ (h >> 29)) >> 32 & mask)
+            k = (left << half) | right
+            if k < self.n:
+                return k
+
+
+class ShuffleBag:
+    """洗牌袋：每一轮把全部下标取完之前不会重复，相邻两轮之间也避开最近 window 次
+
+    每一轮的顺序是由该轮种子决定的 FeistelPermutation，不需要为每条提示语保存排列，
+    一百万条提示语时也只占用常数内存。新一轮开头的几个下标如果在上一轮末尾刚出现过，
+    先放进 deferred，等它们离开最近记录后再补上（最多 window 个）。
+    保存状态只需要种子、位置、deferred 和最近记录，恢复为 O(window)，不需要重放。
+    """
+
+    mode = "shuffle"
+
+    def __init__(self, n, window=1, rng=None):
+        if n <= 0:
+            raise ValueError("提示语数量必须大于 0")
+        self.n = n
+        self.window = min(max(0, window), n - 1)
+        self._rng = rng or random.Random()
+        self._perm = None
+        self.seed = None
+        self.pos = n
+        self.deferred = []
+        self.recent = RecencyWindow(self.window)
+
+    def _new_bag(self, seed):
+        self.seed = seed
+        self._perm = FeistelPermutation(self.n, seed)
+        self.pos = 0
+
+    def draw(self):
+        if self.pos >= self.n and not self.deferred:
+            self._new_bag(self._rng.getrandbits(64))
+        recent = self.recent
+        # 推迟的下标已经不在最近记录中时优先补上
+        for k, i in enumerate(self.deferred):
+            if i not in recent:
+                del self.deferred[k]
+                break
+        else:
+            # window 不超过 n - 1，本轮剩下的下标不可能全部在最近记录中，所以一定能取到
+            while True:
+                i = self._perm[self.pos]
+                self.pos += 1
+                if i not in recent:
+                    break
+                self.deferred.append(i)
+        recent.add(i)
+        return i
+
+    def state(self):
+        return {"seed": self.seed, "pos": self.pos, "deferred": list(self.deferred), "recent": self.recent.items()}
+
+    def restore(self, state):
+        """直接定位到保存的位置，O(window)"""
+        if state.get("seed") is None:
+            return
+        if "deferred" not in state:
+            raise ValueError("旧版的抽取状态")
+        pos = state["pos"]
+        if not 0 <= pos <= self.n:
+            raise ValueError("抽取状态与提示语数量不符")
+        deferred = [int(i) for i in state["deferred"]]
+        recent = [int(i) for i in state.get("recent", [])]
+        if any(not 0 <= i < self.n for i in deferred + recent) or len(deferred) > self.window:
+            raise ValueError("抽取状态与提示语数量不符")
+        self._new_bag(state["seed"])
+        self.pos = pos
+        self.deferred = deferred
+        self.recent = RecencyWindow(self.window, recent)
+
+
+class RandomSampler:
+    """每次独立随机抽取（给出 weights 时按权重），抽到最近 window 次出现过的会重新抽取"""
+
+    def __init__(self, n, weights=None, window=1, rng=None):
+        if n <= 0:
+            raise ValueError("提示语数量必须大于 0")
+        self.n = n
+        self.mode = "weighted" if weights is not None else "random"
+        self.table = AliasTable(weights) if weights is not None else None
+        self.window = min(max(0, window), n - 1)
+        self.recent = RecencyWindow(self.window)
+        self._rng = rng or random.Random()
+
+    def _draw_once(self):
+        if self.table is not None:
+            return self.table.draw(self._rng)
+        return self._rng.randrange(self.n)
+
+    def draw(self):
+        i = self._draw_once()
+        for _ in range(MAX_TRIES - 1):
+            if i not in self.recent:
+                break
+            i = self._draw_once()
+        else:
+            # 权重极不均匀时按权重很难抽到其他提示语，改为在最近没出现过的提示语中均匀抽取；
+            # window 不超过 n - 1，所以一定存在，期望尝试次数为 n / (n - window)
+            while i in self.recent:
+                i = self._rng.randrange(self.n)
+        self.recent.add(i)
+        return i
+
+    def state(self):
+        return {"recent": self.recent.items()}
+
+    def restore(self, state):
+        recent = [i for i in state.get("recent", []) if 0 <= i < self.n]
+        self.recent = RecencyWindow(self.window, recent)
+
+
+def make_sampler(mode, n, weights=None, window=1, rng=None):
+    """按模式创建抽取器；weighted 模式缺少有效权重时抛出 ValueError"""
+    if mode == "shuffle":
+        return ShuffleBag(n, window, rng)
+    if mode == "weighted":
+        if weights is None or len(weights) != n:
+            raise ValueError("message_weights 的数量与提示语数量不一致")
+        return RandomSampler(n, weights, window, rng)
+    if mode == "random":
+        return RandomSampler(n, None, window, rng)
+    raise ValueError(f"未知的抽取方式: {mode}")
+
+
+def load_sampler_state(path, sampler, source):
+    """读取保存的抽取状态，模式、数量、窗口和提示语都一致时恢复，返回是否已恢复"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError) as e:
+        log.warning("无法读取抽取状态 %s: %s", path, e)
+        return False
+    if not isinstance(saved, dict) or saved.get("mode") != sampler.mode or saved.get("n") != sampler.n \
+            or saved.get("window") != sampler.window or saved.get("source") != source:
+        return False
+    try:
+        sampler.restore(saved.get("state", {}))
+    except (TypeError, ValueError, KeyError) as e:
+        log.warning("抽取状态无效，将重新开始: %s", e)
+        return False
+    return True
+
+
+def sampler_state(sampler, source):
+    """要保存的抽取状态（很小的字典），由 load_sampler_state 读回"""
+    return {"mode": sampler.mode, "n": sampler.n, "window": sampler.window, "source": source,
+            "state": sampler.state()}
+
+
+class SamplerStateWriter(ConfigWriter):
+    """在后台线程中合并并保存抽取状态，抽取本身不做任何 I/O
+
+    状态文件丢失或过期时只是重新开始一轮，因此不做 fsync；失败时只打印警告。
+    """
+
+    def _write(self, saved):
+        try:
+            atomic_write(self.path, json.dumps(saved), sync=False)
+        except OSError as e:
+            log.warning("无法保存抽取状态 %s: %s", self.path, e)
+            return False
+        return True
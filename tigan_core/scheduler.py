@@ -0,0 +1,391 @@
+import heapq
+import itertools
+import logging
+import math
+import sys
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# 系统休眠（挂起）恢复后计划的处理方式
+RESUME_FIRE = "fire"        # 休眠期间已到期的立即触发一次，未到期的按实际经过的时间提前
+RESUME_RESTART = "restart"  # 从恢复时起重新计时一个完整间隔
+RESUME_SKIP = "skip"        # 跳过休眠期间错过的触发，保持原来的节拍
+RESUME_IGNORE = "ignore"    # 只按单调时钟计时，忽略休眠
+RESUME_POLICIES = (RESUME_FIRE, RESUME_RESTART, RESUME_SKIP, RESUME_IGNORE)
+# 休眠期间继续走的时钟比停止的时钟多走超过这么多秒时认为系统休眠过
+SUSPEND_THRESHOLD = 30.0
+
+
+def _windows_unbiased_clock():
+    """Windows 的 QueryUnbiasedInterruptTime（秒）：不包括休眠和睡眠的时间，不可用时返回 None"""
+    import ctypes
+    try:
+        query = ctypes.windll.kernel32.QueryUnbiasedInterruptTime
+    except AttributeError:
+        return None
+
+    def unbiased():
+        value = ctypes.c_ulonglong()
+        query(ctypes.byref(value))
+        return value.value / 1e7  # 单位是 100 纳秒
+    return unbiased
+
+
+def platform_suspend_clocks():
+    """返回检测休眠用的 (休眠期间停止的时钟, 休眠期间继续走的时钟)，平台不支持时返回 None
+
+    Linux：CLOCK_MONOTONIC（即 time.monotonic）和 CLOCK_BOOTTIME；
+    macOS：time.monotonic（mach_absolute_time）和 CLOCK_MONOTONIC；
+    Windows：time.monotonic 在休眠期间继续走，改用 QueryUnbiasedInterruptTime 和 time.monotonic。
+    这些时钟都不受系统时间调整（NTP 校时、手动改时间）的影响。
+    """
+    if sys.platform.startswith("linux") and hasattr(time, "CLOCK_BOOTTIME"):
+        return time.monotonic, lambda: time.clock_gettime(time.CLOCK_BOOTTIME)
+    if sys.platform == "darwin" and hasattr(time, "CLOCK_MONOTONIC"):
+        return time.monotonic, lambda: time.clock_gettime(time.CLOCK_MONOTONIC)
+    if sys.platform == "win32":
+        unbiased = _windows_unbiased_clock()
+        if unbiased is not None:
+            return unbiased, time.monotonic
+    return None
+
+
+def resume_deadline(policy, deadline, interval, now, shift):
+    """系统休眠后按策略计算计划新的截止时间
+
+    shift 是计时用的时钟在休眠期间少走的秒数：时钟在休眠期间停止（Linux、macOS）时等于休眠时长，
+    继续走（Windows）时为 0，截止时间本来就是按实际经过的时间计算的。
+    """
+    if policy == RESUME_RESTART:
+        return now + interval
+    if policy == RESUME_IGNORE:
+        return deadline
+    # 按实际经过的时间，截止时间应提前 shift 秒
+    shifted = deadline - shift
+    if shifted > now:
+        return shifted
+    if policy == RESUME_SKIP:
+        return shifted + (math.floor((now - shifted) / interval) + 1) * interval
+    return now
+
+
+class Schedule:
+    """一个周期性提醒计划，由 TimerEngine.add 创建并作为句柄返回"""
+
+    __slots__ = ("interval", "callback", "name", "data", "resume_policy", "deadline", "last_deadline", "fired",
+                 "_entry")
+
+    def __init__(self, interval, callback, name=None, data=None, resume_policy=None):
+        self.interval = float(interval)
+        self.callback = callback
+        self.name = name
+        self.data = data
+        self.resume_policy = resume_policy  # None 表示使用引擎的默认策略
+        self.deadline = None
+        self.last_deadline = None  # 最近一次触发对应的截止时间
+        self.fired = 0
+        self._entry = None  # 当前在堆中的条目，取消时置空
+
+    @property
+    def active(self):
+        return self._entry is not None
+
+    def __repr__(self):
+        return f"<Schedule {self.name!r} interval={self.interval}s deadline={self.deadline}>"
+
+
+class TimerEngine:
+    """基于最小堆的多计划计时引擎
+
+    一个线程服务任意数量的 Schedule：堆顶是最近的截止时间，线程用
+    threading.Condition 等待到该时刻，两次到期之间不会被唤醒。
+    添加/重新计时的复杂度为 O(log n)；取消采用惰性删除，只把堆条目标记为失效，
+    失效条目过多时再整体重建堆。
+
+    每次唤醒时比较两个时钟各自走过的时间：一个在系统休眠期间停止，一个继续走
+    （见 platform_suspend_clocks），两者之差超过 suspend_threshold 即认为刚从休眠中恢复，
+    按各计划的 resume_policy（默认为引擎的 resume_policy）重新安排截止时间，
+    然后在计时线程中调用通过 add_resume_listener 注册的 callback(gap)。
+    检测只利用已有的唤醒，不会额外轮询。
+    suspend_clocks 可以指定这两个时钟；使用自定义 clock（例如虚拟时钟）或平台不支持时，
+    用 clock 和 wall_clock 比较，这时手动或 NTP 把系统时间往后调超过阈值也会被当作休眠。
+    """
+
+    # 失效条目超过该数量且占堆的一半以上时重建堆
+    COMPACT_THRESHOLD = 64
+
+    def __init__(self, clock=time.monotonic, wall_clock=time.time, resume_policy=RESUME_FIRE,
+                 suspend_threshold=SUSPEND_THRESHOLD, suspend_clocks=None):
+        if resume_policy not in RESUME_POLICIES:
+            raise ValueError(f"未知的休眠恢复策略: {resume_policy}")
+        self._clock = clock
+        self._wall_clock = wall_clock
+        if suspend_clocks is None and clock is time.monotonic:
+            suspend_clocks = platform_suspend_clocks()
+        if suspend_clocks is None:
+            suspend_clocks = (clock, wall_clock)
+        self._awake_clock, self._elapsed_clock = suspend_clocks
+        # 计时用的时钟就是休眠期间停止的那个时，恢复后要把截止时间提前休眠的时长
+        self._clock_stops_in_suspend = self._awake_clock is clock
+        self.resume_policy = resume_policy
+        self.suspend_threshold = suspend_threshold
+        self._resume_listeners = []
+        self._last_awake = None
+        self._last_elapsed = None
+        self._cond = threading.Condition()
+        self._heap = []
+        self._counter = itertools.count()  # 截止时间相同时按加入顺序触发
+        self._stale = 0
+        self._active = 0
+        self._running = False
+        self._generation = 0  # 每次 start 递增，旧线程发现代号变化后自行退出
+        self._thread = None
+        # 统计信息，供基准测试和调试使用
+        self.wakeups = 0
+        self.fired = 0
+        self.last_lateness = 0.0
+        self.suspends = 0
+        self.last_suspend_gap = None
+
+    def __len__(self):
+        return self._active
+
+    @property
+    def running(self):
+        return self._running
+
+    def now(self):
+        """引擎使用的单调时钟，与计划的截止时间可以直接比较"""
+        return self._clock()
+
+    def wall_time(self):
+        """引擎使用的墙上时钟（时间戳），按日历规则安排计划时使用"""
+        return self._wall_clock()
+
+    def start(self):
+        """启动计时线程"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._generation += 1
+            # 停止期间发生的休眠不需要处理
+            self._mark_clocks(self._clock())
+            self._thread = threading.Thread(target=self._run, args=(self._generation,),
+                                            name="TimerEngine", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """停止计时线程并立即唤醒它；timeout 不为 None 时等待线程结束"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            thread = self._thread
+            self._thread = None
+        if timeout is not None and thread and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def add(self, interval, callback, delay=None, name=None, data=None, resume_policy=None):
+        """添加计划，首次在 delay 秒（默认为一个间隔）后触发，返回 Schedule 句柄
+
+        callback 在计时线程中以 callback(schedule) 的形式调用。
+        """
+        if resume_policy is not None and resume_policy not in RESUME_POLICIES:
+            raise ValueError(f"未知的休眠恢复策略: {resume_policy}")
+        schedule = Schedule(interval, callback, name, data, resume_policy)
+        with self._cond:
+            now = self._clock()
+            if not self._active:
+                # 没有计划时发生的休眠与新计划无关，从现在起重新比较两个时钟
+                self._mark_clocks(now)
+            self._active += 1
+            self._push(schedule, now + (schedule.interval if delay is None else delay))
+        return schedule
+
+    def add_resume_listener(self, callback):
+        """注册系统休眠恢复后的回调 callback(gap)，在计划重新安排之后、到期计划执行之前调用；重复注册无效"""
+        if callback not in self._resume_listeners:
+            self._resume_listeners.append(callback)
+
+    def remove_resume_listener(self, callback):
+        if callback in self._resume_listeners:
+            self._resume_listeners.remove(callback)
+
+    def cancel(self, schedule):
+        """取消计划，返回该计划此前是否处于活动状态"""
+        with self._cond:
+            if schedule._entry is None:
+                return False
+            self._invalidate(schedule)
+            self._active -= 1
+            self._maybe_compact()
+            return True
+
+    def reschedule(self, schedule, interval=None, delay=None):
+        """修改间隔并从现在起重新计时；已取消的计划会被重新激活"""
+        with self._cond:
+            if interval is not None:
+                schedule.interval = float(interval)
+            if schedule._entry is None:
+                self._active += 1
+            else:
+                self._invalidate(schedule)
+            self._push(schedule, self._clock() + (schedule.interval if delay is None else delay))
+            self._maybe_compact()
+
+    def remaining(self, schedule):
+        """距离该计划下一次触发的秒数，已取消时返回 None"""
+        with self._cond:
+            if schedule._entry is None:
+                return None
+            return max(0.0, schedule.deadline - self._clock())
+
+    def next_deadline(self):
+        """最近的截止时间，没有活动计划时返回 None"""
+        with self._cond:
+            return self._peek()
+
+    def run_due(self, now=None):
+        """在当前线程中执行所有已到期的计划，返回触发数量
+
+        计时线程内部使用它，也可以配合虚拟时钟在测试和基准中手动驱动引擎。
+        """
+        with self._cond:
+            if now is None:
+                now = self._clock()
+            gap = self._check_suspend(now)
+        if gap:
+            self._notify_resume(gap)
+        with self._cond:
+            due = self._collect_due(now)
+        self._dispatch(due)
+        return len(due)
+
+    def _mark_clocks(self, now):
+        self._last_awake = now if self._clock_stops_in_suspend else self._awake_clock()
+        self._last_elapsed = self._elapsed_clock()
+
+    def _check_suspend(self, now):
+        """比较两次检查之间两个时钟走过的时间，发现休眠时重新安排计划并返回休眠秒数，否则返回 0"""
+        last_awake, last_elapsed = self._last_awake, self._last_elapsed
+        self._mark_clocks(now)
+        if last_awake is None:
+            return 0.0
+        gap = (self._last_elapsed - last_elapsed) - (self._last_awake - last_awake)
+        if gap < self.suspend_threshold:
+            return 0.0
+        self.suspends += 1
+        self.last_suspend_gap = gap
+        log.info("检测到系统休眠约 %.0f 秒，重新安排 %d 个计划", gap, self._active)
+        shift = gap if self._clock_stops_in_suspend else 0.0
+        entries = []
+        for _, order, schedule in self._heap:
+            if schedule is None:
+                continue
+            policy = schedule.resume_policy or self.resume_policy
+            deadline = resume_deadline(policy, schedule.deadline, schedule.interval, now, shift)
+            entry = [deadline, order, schedule]
+            schedule.deadline = deadline
+            schedule._entry = entry
+            entries.append(entry)
+        heapq.heapify(entries)
+        self._heap = entries
+        self._stale = 0
+        return gap
+
+    def _notify_resume(self, gap):
+        for callback in list(self._resume_listeners):
+            try:
+                callback(gap)
+            except Exception:
+                log.exception("休眠恢复回调执行出错")
+
+    def _push(self, schedule, deadline):
+        schedule.deadline = deadline
+        entry = [deadline, next(self._counter), schedule]
+        schedule._entry = entry
+        head = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, entry)
+        # 只有新计划成为最早的截止时间时才需要唤醒计时线程
+        if head is None or deadline < head:
+            self._cond.notify_all()
+
+    def _invalidate(self, schedule):
+        schedule._entry[2] = None
+        schedule._entry = None
+        self._stale += 1
+
+    def _maybe_compact(self):
+        if self._stale > self.COMPACT_THRESHOLD and self._stale * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if entry[2] is not None]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def _peek(self):
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+            self._stale -= 1
+        return heap[0][0] if heap else None
+
+    def _collect_due(self, now):
+        due = []
+        heap = self._heap
+        while heap:
+            deadline, _, schedule = heap[0]
+            if schedule is None:
+                heapq.heappop(heap)
+                self._stale -= 1
+                continue
+            if deadline > now:
+                break
+            self.last_lateness = now - deadline
+            # 按固定节拍推进截止时间，避免误差累积；落后超过一个间隔时从现在重新计时
+            next_deadline = deadline + schedule.interval
+            if next_deadline <= now:
+                next_deadline = now + schedule.interval
+            schedule.last_deadline = deadline
+            schedule.deadline = next_deadline
+            entry = [next_deadline, next(self._counter), schedule]
+            schedule._entry = entry
+            heapq.heapreplace(heap, entry)
+            schedule.fired += 1
+            due.append(schedule)
+        self.fired += len(due)
+        return due
+
+    def _dispatch(self, due):
+        for schedule in due:
+            if schedule._entry is None:
+                continue  # 在收集之后、执行之前被取消
+            try:
+                schedule.callback(schedule)
+            except Exception:
+                log.exception("提醒回调执行出错 (%s)", schedule.name)
+
+    def _run(self, generation):
+        with self._cond:
+            while self._running and self._generation == generation:
+                gap = self._check_suspend(self._clock())
+                if gap:
+                    self._cond.release()
+                    try:
+                        self._notify_resume(gap)
+                    finally:
+                        self._cond.acquire()
+                    continue
+                deadline = self._peek()
+                timeout = None if deadline is None else deadline - self._clock()
+                if timeout is None or timeout > 0:
+                    self._cond.wait(timeout)
+                    self.wakeups += 1
+                    continue
+
+                due = self._collect_due(self._clock())
+                self._cond.release()
+                try:
+                    self._dispatch(due)
+                finally:
+                    self._cond.acquire()
@@ -0,0 +1,50 @@
+import json
+import time
+
+
+class StartupReport:
+    """记录启动各阶段耗时，用于分析和约束冷启动时间
+
+    模块被导入时开始计时，因此入口脚本应尽早导入它。每次 mark(name)
+    记录从上一次 mark 到现在的耗时。
+    """
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self._last = self.t0
+        self.phases = []
+
+    def mark(self, name):
+        """结束当前阶段并记录其耗时（秒）"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def total(self):
+        """从开始计时到最后一次 mark 的总耗时（秒）"""
+        return self._last - self.t0
+
+    def to_dict(self):
+        return {
+            "phases_ms": {name: round(seconds * 1000, 3) for name, seconds in self.phases},
+            "total_ms": round(self.total() * 1000, 3),
+        }
+
+    def format(self):
+        lines = ["启动耗时报告:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<16} {seconds * 1000:>9.1f} ms")
+        lines.append(f"  {'total':<16} {self.total() * 1000:>9.1f} ms")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def within_budget(self, budget_ms):
+        """总耗时是否在预算之内；budget_ms 为 None 时总是返回 True"""
+        return budget_ms is None or self.total() * 1000 <= budget_ms
+
+
+# 进程级别的启动报告，入口脚本导入本模块时开始计时
+STARTUP = StartupReport()
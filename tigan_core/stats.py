@@ -0,0 +1,211 @@
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+from tigan_core.config import atomic_write
+from tigan_core.history import EVENT_COMPLETE, EVENT_DISMISS, EVENT_FIRE, event_date, read_events, segment_time
+
+log = logging.getLogger(__name__)
+
+STATS_FILE = "stats.json"
+STATS_VERSION = 1
+# 保留逐日计数的天数，更早的只计入总数
+DAYS_KEPT = 400
+
+
+def _new_counts():
+    return {"fired": 0, "completed": 0, "dismissed": 0, "held": 0.0}
+
+
+class HistoryStats:
+    """提醒历史的增量统计：每日提醒次数、完成率、连续天数和平均坚持时长
+
+    每个事件由 apply() 以 O(1) 更新各项累计值，查询直接读取累计值，不需要重新扫描历史。
+    累计值保存在历史目录的 stats.json 中（连同最后一个事件的时间）；文件丢失、损坏或
+    版本不符时由 rebuild() 从每日汇总和原始记录重新计算，程序异常退出后只补读更新的事件。
+    连续天数按至少完成一次倒计时的日子计算。
+    """
+
+    def __init__(self, history):
+        self.history = history
+        self.path = os.path.join(history.directory, STATS_FILE)
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._reset()
+
+    def _reset(self):
+        self.totals = _new_counts()
+        self.days = {}
+        self.last_t = 0.0
+        self._streak_last = None  # 最近一个有完成记录的日子（序数）
+        self.streak = 0
+        self.best_streak = 0
+
+    def _day(self, date):
+        counts = self.days.get(date)
+        if counts is None:
+            counts = self.days[date] = _new_counts()
+            # 日期按时间顺序加入，超出保留天数时丢弃最早的一天
+            while len(self.days) > DAYS_KEPT:
+                del self.days[next(iter(self.days))]
+        return counts
+
+    def _mark_active(self, date):
+        day = datetime.date.fromisoformat(date).toordinal()
+        if self._streak_last is not None and day <= self._streak_last:
+            return
+        self.streak = self.streak + 1 if self._streak_last == day - 1 else 1
+        self.best_streak = max(self.best_streak, self.streak)
+        self._streak_last = day
+
+    def _add(self, date, counts):
+        day = self._day(date)
+        for key in day:
+            value = counts.get(key, 0)
+            day[key] += value
+            self.totals[key] += value
+        if counts.get("completed"):
+            self._mark_active(date)
+
+    def apply(self, event):
+        """计入一个事件，O(1)"""
+        kind = event["e"]
+        if kind == EVENT_FIRE:
+            counts = {"fired": 1}
+        elif kind == EVENT_COMPLETE:
+            counts = {"completed": 1, "held": event.get("held", 0.0)}
+        elif kind == EVENT_DISMISS:
+            counts = {"dismissed": 1, "held": event.get("held", 0.0)}
+        else:
+            return
+        with self._lock:
+            self._add(event_date(event["t"]), counts)
+            self.last_t = max(self.last_t, event["t"])
+
+    # 查询，都是 O(1)
+
+    def day(self, date=None):
+        """某一天（默认今天）的计数"""
+        with self._lock:
+            return dict(self.days.get(date or event_date(time.time()), _new_counts()))
+
+    def completion_rate(self):
+        """倒计时坚持到结束的比例，没有记录时返回 None"""
+        with self._lock:
+            outcomes = self.totals["completed"] + self.totals["dismissed"]
+            return self.totals["completed"] / outcomes if outcomes else None
+
+    def average_held(self):
+        """每次倒计时平均坚持的秒数，没有记录时返回 None"""
+        with self._lock:
+            outcomes = self.totals["completed"] + self.totals["dismissed"]
+            return self.totals["held"] / outcomes if outcomes else None
+
+    def current_streak(self, today=None):
+        """到今天（今天还没完成时到昨天）为止连续完成的天数"""
+        today = datetime.date.fromisoformat(today or event_date(time.time())).toordinal()
+        with self._lock:
+            if self._streak_last is None or today - self._streak_last > 1:
+                return 0
+            return self.streak
+
+    def summary(self, today=None):
+        """界面和命令行显示用的全部统计值"""
+        today = today or event_date(time.time())
+        return {
+            "today": self.day(today),
+            "completion_rate": self.completion_rate(),
+            "average_held": self.average_held(),
+            "current_streak": self.current_streak(today),
+            "best_streak": self.best_streak,
+            "totals": dict(self.totals),
+        }
+
+    # 保存和重建
+
+    def save(self):
+        """保存累计值，由历史的后台线程在每批事件写入后调用；尚未读取时不保存，以免覆盖"""
+        if not self.loaded:
+            return
+        with self._lock:
+            saved = {
+                "version": STATS_VERSION,
+                "last_t": self.last_t,
+                "totals": self.totals,
+                "days": self.days,
+                "streak": {"last": self._streak_last, "length": self.streak, "best": self.best_streak},
+            }
+            data = json.dumps(saved, ensure_ascii=False)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            atomic_write(self.path, data)
+        except OSError as e:
+            log.warning("无法保存提醒统计 %s: %s", self.path, e)
+
+    def load(self):
+        """读取保存的累计值并补上之后写入的事件；无法使用时从历史重建"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("version") != STATS_VERSION:
+                raise ValueError(f"版本不符: {saved.get('version')}")
+            with self._lock:
+                self._reset()
+                self.totals.update(saved["totals"])
+                self.days.update(saved["days"])
+                self.last_t = saved["last_t"]
+                streak = saved["streak"]
+                self._streak_last, self.streak, self.best_streak = streak["last"], streak["length"], streak["best"]
+        except FileNotFoundError:
+            return self.rebuild()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log.warning("提醒统计无效 (%s)，将从历史重建", e)
+            return self.rebuild()
+        replayed = self._catch_up()
+        if replayed:
+            log.info("已补充 %d 个未计入统计的历史事件", replayed)
+        self.loaded = True
+        return self
+
+    def _catch_up(self):
+        """计入 last_t 之后写入的事件，只读取在那之后轮转的分段和当前文件"""
+        last_t = self.last_t
+        paths = [path for path in self.history.segments() if segment_time(path) >= int(last_t)]
+        count = 0
+        for path in paths + [self.history.path]:
+            for event in read_events(path):
+                if event["t"] > last_t:
+                    self.apply(event)
+                    count += 1
+        return count
+
+    def rebuild(self):
+        """从每日汇总和尚未压缩的原始记录重新计算全部累计值"""
+        with self._lock:
+            self._reset()
+            _, days = self.history.load_daily()
+            for (date, _profile), counts in sorted(days.items(), key=lambda item: item[0][0]):
+                self._add(date, counts)
+        for event in self.history.iter_events():
+            self.apply(event)
+        log.info("已从提醒历史重建统计")
+        self.loaded = True
+        self.save()
+        return self
+
+
+def format_summary(summary):
+    """把 summary() 的结果格式化为给用户看的几行文字"""
+    today = summary["today"]
+    rate = summary["completion_rate"]
+    held = summary["average_held"]
+    return "\n".join((
+        f"今日提醒：{today['fired']} 次，完成 {today['completed']} 次",
+        f"完成率：{rate:.0%}" if rate is not None else "完成率：暂无记录",
+        f"平均坚持：{held:.0f} 秒" if held is not None else "平均坚持：暂无记录",
+        f"连续打卡：{summary['current_streak']} 天（最长 {summary['best_streak']} 天）",
+        f"累计提醒：{summary['totals']['fired']} 次",
+    ))
@@ -0,0 +1,213 @@
+import array
+import hashlib
+import logging
+import mmap
+import os
+import random
+import struct
+
+log = logging.getLogger(__name__)
+
+# 索引文件头：魔数、已扫描到的位置、对应的修改时间和大小、记录数、已扫描部分末尾的摘要
+INDEX_MAGIC = b"TIGANIX1"
+INDEX_HEADER = struct.Struct("<8sQQQQ16s")
+# 增量更新时用已扫描部分最后这么多字节的摘要判断文件只是被追加
+TAIL_CHECK_SIZE = 4096
+# 扫描时每次写出的偏移量个数，保持构建索引时的内存占用固定
+WRITE_BATCH = 65536
+# 扫描时每次切分的字节数
+SCAN_CHUNK = 1 << 20
+
+
+def write_pack(path, messages):
+    """把提示语列表写成每行一条的提示语包（UTF-8），供 MessageStore 使用"""
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for message in messages:
+            f.write(message.replace("\n", " ") + "\n")
+
+
+def _tail_digest(mm, end):
+    return hashlib.blake2b(mm[max(0, end - TAIL_CHECK_SIZE):end], digest_size=16).digest()
+
+
+class MessageStore:
+    """基于内存映射和偏移索引的提示语包
+
+    提示语包是每行一条提示语的 UTF-8 文本文件（空行忽略），索引是同目录下的 <包>.idx，
+    保存每条提示语的起始偏移。两者都通过 mmap 访问，随机抽取只读取被选中的那一行，
+    常驻内存不随提示语包大小增长。提示语包只在末尾追加时，索引只扫描新增的部分。
+    """
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        self._pack_file = None
+        self._pack_map = None
+        self._index_file = None
+        self._index_map = None
+        self._offsets = None
+        self._signature = None
+        # 统计信息：最近一次索引更新的方式（reuse / append / full）和扫描的字节数
+        self.last_index_mode = None
+        self.last_scanned_bytes = 0
+        self.refresh()
+
+    def __len__(self):
+        return len(self._offsets) if self._offsets is not None else 0
+
+    def __getitem__(self, i):
+        start = self._offsets[i]
+        end = self._pack_map.find(b"\n", start)
+        if end < 0:
+            end = len(self._pack_map)
+        return self._pack_map[start:end].rstrip(b"\r").decode("utf-8", errors="replace")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def pick(self, rng=random):
+        """随机抽取一条提示语，提示语包有变化时先更新索引；包为空时返回 None"""
+        self.refresh()
+        if not len(self):
+            return None
+        return self[rng.randrange(len(self))]
+
+    def refresh(self):
+        """提示语包的修改时间或大小变化时重新映射并更新索引，返回是否发生了更新"""
+        st = os.stat(self.path)
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return False
+        self.close()
+        self._pack_file = open(self.path, "rb")
+        if st.st_size:
+            self._pack_map = mmap.mmap(self._pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._pack_map = b""
+        self._update_index(signature)
+        self._signature = signature
+        return True
+
+    def close(self):
+        """释放映射和文件句柄"""
+        if self._offsets is not None:
+            if isinstance(self._offsets, memoryview):
+                self._offsets.release()
+            self._offsets = None
+        for name in ("_index_map", "_index_file", "_pack_map", "_pack_file"):
+            handle = getattr(self, name)
+            if handle is not None and hasattr(handle, "close"):
+                handle.close()
+            setattr(self, name, None)
+        self._signature = None
+
+    def _read_header(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                header = f.read(INDEX_HEADER.size)
+        except OSError:
+            return None
+        if len(header) != INDEX_HEADER.size:
+            return None
+        fields = INDEX_HEADER.unpack(header)
+        if fields[0] != INDEX_MAGIC:
+            return None
+        return fields[1:]
+
+    def _update_index(self, signature):
+        pack = self._pack_map
+        header = self._read_header()
+        start, keep = 0, 0
+        if header is not None:
+            scanned, mtime_ns, size, count, digest = header
+            if (mtime_ns, size) == signature:
+                self.last_index_mode, self.last_scanned_bytes = "reuse", 0
+                self._map_index(count)
+                return
+            if scanned <= len(pack) and _tail_digest(pack, scanned) == digest:
+                # 只在末尾追加：保留完整行的偏移，从最后一个换行之后继续扫描
+                start = scanned
+                keep = self._count_before(count, scanned)
+
+        try:
+            count, scanned = self._write_index(start, keep, signature)
+        except OSError as e:
+            log.warning("无法写入提示语索引 %s: %s，改为在内存中建立索引", self.index_path, e)
+            self._offsets = self._scan(0)
+            self.last_index_mode, self.last_scanned_bytes = "memory", len(pack)
+            return
+        self.last_index_mode = "append" if start else "full"
+        self.last_scanned_bytes = len(pack) - start
+        self._map_index(count)
+
+    def _count_before(self, count, scanned):
+        """索引中起始偏移小于 scanned 的记录数（未以换行结尾的最后一行需要重新扫描）"""
+        with open(self.index_path, "rb") as f:
+            if count:
+                f.seek(INDEX_HEADER.size + (count - 1) * 8)
+                last = struct.unpack("Q", f.read(8))[0]
+                if last >= scanned:
+                    return count - 1
+        return count
+
+    def _scan(self, start, sink=None):
+        """从 start 开始扫描非空行的起始偏移；给出 sink 时分批写出，否则返回数组"""
+        pack = self._pack_map
+        size = len(pack)
+        offsets = array.array("Q")
+        append = offsets.append
+        pos = start
+        while pos < size:
+            # 按块切分行比逐行 find 快得多，块在换行处结束
+            chunk_end = pack.find(b"\n", min(size, pos + SCAN_CHUNK))
+            chunk_end = size if chunk_end < 0 else chunk_end + 1
+            for line in pack[pos:chunk_end].split(b"\n"):
+                if line.strip():
+                    append(pos)
+                pos += len(line) + 1
+            pos = chunk_end
+            if sink is not None and len(offsets) >= WRITE_BATCH:
+                sink(offsets)
+                offsets = array.array("Q")
+                append = offsets.append
+        if sink is not None:
+            sink(offsets)
+        return offsets
+
+    def _write_index(self, start, keep, signature):
+        """把 start 之后的偏移追加到保留的 keep 条记录后面，最后写入文件头"""
+        pack = self._pack_map
+        mode = "r+b" if keep else "w+b"
+        if keep and not os.path.exists(self.index_path):
+            mode = "w+b"
+        with open(self.index_path, mode) as f:
+            # 先写入无效的文件头，更新中途退出时下次会完整重建
+            f.seek(0)
+            f.write(b"\0" * INDEX_HEADER.size)
+            f.seek(INDEX_HEADER.size + keep * 8)
+            count = [keep]
+
+            def sink(offsets):
+                offsets.tofile(f)
+                count[0] += len(offsets)
+
+            self._scan(start, sink)
+            f.truncate()
+            # 已扫描到最后一个换行之后；未以换行结尾的最后一行下次追加时重新扫描
+            scanned = pack.rfind(b"\n") + 1 if len(pack) else 0
+            f.seek(0)
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, scanned, signature[0], signature[1], count[0],
+                                      _tail_digest(pack, scanned)))
+            f.flush()
+        return count[0], scanned
+
+    def _map_index(self, count):
+        if not count:
+            self._offsets = array.array("Q")
+            return
+        self._index_file = open(self.index_path, "rb")
+        self._index_map = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = memoryview(self._index_map)[INDEX_HEADER.size:INDEX_HEADER.size + count * 8].cast("Q")
@@ -0,0 +1,91 @@
+import io
+import math
+
+
+# 托盘图标的边长（像素），各平台会按需要缩放
+TRAY_ICON_SIZE = 64
+# 徽标上显示的最大分钟数，更长时显示为 "99+"
+MAX_BADGE_MINUTES = 99
+RUNNING_COLOR = (46, 160, 67, 255)
+PAUSED_COLOR = (128, 128, 128, 255)
+OUTLINE_COLOR = (255, 255, 255, 255)
+
+
+def badge_label(minutes):
+    return str(minutes) if minutes <= MAX_BADGE_MINUTES else f"{MAX_BADGE_MINUTES}+"
+
+
+def tray_state(remaining):
+    """把距离下一次提醒的秒数转换为托盘状态 (状态, 徽标文字)，remaining 为 None 表示已暂停"""
+    if remaining is None:
+        return ("paused", None)
+    return ("running", badge_label(max(1, math.ceil(remaining / 60))))
+
+
+def next_change_delay(remaining):
+    """到徽标上的分钟数发生变化还有多少秒"""
+    minutes = max(1, math.ceil(remaining / 60))
+    return max(0.0, remaining - (minutes - 1) * 60)
+
+
+class TrayIconCache:
+    """预先合成的托盘图标
+
+    基础图标只解码和缩放一次，每种状态的徽标图像只合成一次，之后按引用复用；
+    切换托盘状态时只替换图像对象，不再解码或合成。需要 PIL，创建时才导入。
+    """
+
+    def __init__(self, icon_data, size=TRAY_ICON_SIZE):
+        from PIL import Image, ImageDraw, ImageFont
+        self._draw = ImageDraw.Draw
+        self.size = size
+        base = Image.open(io.BytesIO(icon_data)).convert("RGBA")
+        self.base = base.resize((size, size), Image.LANCZOS) if base.size != (size, size) else base
+        try:
+            self._font = ImageFont.load_default(size=size // 3)
+        except TypeError:
+            # Pillow 10.1 之前的默认字体不能指定大小
+            self._font = ImageFont.load_default()
+        self._cache = {}
+        self.renders = 0
+
+    def get(self, state):
+        """返回该状态的图标，第一次使用时合成"""
+        image = self._cache.get(state)
+        if image is None:
+            image = self._cache[state] = self._render(state)
+        return image
+
+    def prerender(self, max_minutes):
+        """合成暂停状态和运行中 1 到 max_minutes 分钟的全部图标"""
+        self.get(tray_state(None))
+        for minutes in range(1, min(max_minutes, MAX_BADGE_MINUTES) + 1):
+            self.get(("running", badge_label(minutes)))
+        if max_minutes > MAX_BADGE_MINUTES:
+            self.get(("running", badge_label(max_minutes)))
+
+    def _render(self, state):
+        status, label = state
+        image = self.base.copy()
+        draw = self._draw(image)
+        size = self.size
+        # 右下角的圆形徽标，直径为图标的一半
+        box = (size // 2 - 1, size // 2 - 1, size - 1, size - 1)
+        draw.ellipse(box, fill=RUNNING_COLOR if status == "running" else PAUSED_COLOR,
+                     outline=OUTLINE_COLOR, width=max(1, size // 32))
+        cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+        if label:
+            try:
+                left, top, right, bottom = draw.textbbox((0, 0), label, font=self._font)
+            except AttributeError:
+                # Pillow 8 之前没有 textbbox
+                right, bottom = draw.textsize(label, font=self._font)
+                left = top = 0
+            draw.text((cx - (left + right) / 2, cy - (top + bottom) / 2), label, font=self._font, fill=OUTLINE_COLOR)
+        else:
+            # 暂停符号：两条竖线
+            bar_w, bar_h = max(2, size // 16), size // 5
+            for dx in (-bar_w * 1.5, bar_w * 0.5):
+                draw.rectangle((cx + dx, cy - bar_h / 2, cx + dx + bar_w, cy + bar_h / 2), fill=OUTLINE_COLOR)
+        self.renders += 1
+        return image
@@ -0,0 +1,74 @@
+import os
+import time
+
+
+class ConfigWatcher:
+    """基于 os.stat 的配置文件变化检测
+
+    作为一个计划挂在 TimerEngine 上运行，不额外占用线程。检查间隔从 min_interval 开始，
+    文件没有变化时逐次翻倍直到 max_interval；发现变化后回到 min_interval。
+    on_change() 返回 False 表示本次变化未能应用（例如文件写到一半），下次检查时会重试。
+    程序自己写入文件后调用 acknowledge()，这次写入不会被当作外部修改。
+    """
+
+    def __init__(self, engine, path, on_change, min_interval=2.0, max_interval=60.0):
+        self.engine = engine
+        self.path = path
+        self.on_change = on_change
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.schedule = None
+        self._signature = None
+        # 统计信息：检查次数、检查累计耗时（CPU 秒）和最近一次重新加载的耗时
+        self.checks = 0
+        self.reloads = 0
+        self.check_cpu_time = 0.0
+        self.last_reload_duration = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def start(self):
+        """记录文件当前状态并开始检测（已开始时忽略）"""
+        if self.schedule is not None:
+            return
+        self._signature = self._stat()
+        self.schedule = self.engine.add(self.min_interval, self._check, name="config-watcher")
+
+    def acknowledge(self, signature=None):
+        """记录程序自己写入后的文件状态；signature 为 None 时重新读取"""
+        self._signature = signature if signature is not None else self._stat()
+
+    def stop(self):
+        if self.schedule is not None:
+            self.engine.cancel(self.schedule)
+            self.schedule = None
+
+    def stats(self):
+        return {
+            "checks": self.checks,
+            "reloads": self.reloads,
+            "interval": self.schedule.interval if self.schedule else None,
+            "check_cpu_time": self.check_cpu_time,
+            "last_reload_duration": self.last_reload_duration,
+        }
+
+    def _check(self, schedule):
+        begin = time.thread_time()
+        signature = self._stat()
+        interval = min(self.max_interval, schedule.interval * 2)
+        if signature is not None and signature != self._signature:
+            reload_begin = time.perf_counter()
+            if self.on_change() is not False:
+                self._signature = signature
+                self.reloads += 1
+                self.last_reload_duration = time.perf_counter() - reload_begin
+            interval = self.min_interval
+        if interval != schedule.interval and self.schedule is schedule:
+            self.engine.reschedule(schedule, interval=interval)
+        self.checks += 1
+        self.check_cpu_time += time.thread_time() - begin
@@ -1,150 +1,169 @@
+# 尽早导入启动报告以便统计模块导入耗时
+from tigan_core.startup import STARTUP
+
+import sys
+
+# 无界面模式在导入 tkinter 之前就转交给无界面入口，没有安装 Tk 的服务器也能运行
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    from tigan_core.headless import main
+    sys.exit(main(sys.argv[1:]))
+
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
+import argparse
+import logging
 import threading
 import time
-import json
-import os
-import random
-# 只保留pygame音频库
-import sys
-import platform
-
-# 导入Sun Valley ttk主题
-import sv_ttk
-
-# 尝试导入 pygame 用于播放声音
-try:
-    import pygame
-    pygame_available = True
-    pygame.mixer.init()
-    print("成功导入 pygame")
-except ImportError:
-    pygame_available = False
-    print("警告: pygame 模块未安装或无法加载")
-except Exception as e:
-    pygame_available = False
-    print(f"初始化 pygame 时发生错误: {e}")
-
-from PIL import Image
-import pystray
-
-# 函数：获取资源文件的绝对路径
-def resource_path(relative_path):
-    """获取资源的绝对路径，适用于开发环境和打包后的环境"""
-    try:
-        # PyInstaller 创建临时文件夹并将路径存储在 _MEIPASS
-        base_path = sys._MEIPASS
-        full_path = os.path.join(base_path, relative_path)
-        print(f"打包环境资源路径: {full_path}, 文件存在: {os.path.exists(full_path)}")
-        return full_path
-    except Exception:
-        # 如果不是通过 PyInstaller 运行，则使用脚本所在的目录
-        base_path = os.path.abspath(".")
-        # 特殊处理 macOS App Bundle
-        if platform.system() == "Darwin" and ".app" in base_path:
-             base_path = os.path.join(base_path, "Resources")
-
-        full_path = os.path.join(base_path, relative_path)
-        print(f"开发环境资源路径: {full_path}, 文件存在: {os.path.exists(full_path)}")
-        return full_path
-
-
-# 获取配置文件路径 - 对于配置文件，我们希望它保存在用户可写的目录中
-def get_config_path():
-    """获取配置文件的路径，确保它可以被写入"""
-    try:
-        # PyInstaller 环境下，将配置文件保存在用户目录中
-        base_path = sys._MEIPASS
-        # 使用用户目录保存配置文件
-        config_dir = os.path.expanduser("~/.tigan_reminder")
-        if not os.path.exists(config_dir):
-            os.makedirs(config_dir)
-        return os.path.join(config_dir, "messages.json")
-    except Exception:
-        # 开发环境下或其他情况，使用当前目录
-        return os.path.join(os.path.abspath("."), "messages.json")
-
-
-# 使用 resource_path 函数来定义文件路径
-CONFIG_FILE = get_config_path()
-TRAY_ICON_FILE = resource_path("icon.png") # 明确用于托盘图标
-WINDOW_ICON_FILE = resource_path("icon.ico") # 明确用于窗口图标 (.ico)
-SOUND_FILE = resource_path("ding.mp3")
-
-
-DEFAULT_MESSAGES = [
-    "快提一下菊花，坚持就是胜利 💪🍑",
-    "系统检测你坐太久了，是时候提一提了 🕵️",
-    "你的菊花提醒上线了～ 快动一动～ 😄",
-    "放下鼠标，提一提，然后继续战斗！🧘‍♂️",
-    "提肛一分钟，通畅一整天 🌈",
-    "姿势不变，肌肉在练！🏋️",
-    "每小时提一下，痔疮远离你家！🚽",
-    "来，跟我一起：吸～ 提～ 呼～ ☯️",
-    "提升战斗力，从这一提开始 🚀"
-]
-
-# 默认配置
-DEFAULT_CONFIG = {
-    "messages": DEFAULT_MESSAGES,
-    "auto_start": False,
-    "minimize_to_tray_on_start": False,
-    "theme": "dark"
-}
-
-# 简化后的播放声音函数，只使用pygame
-def play_sound(sound_file):
-    """使用pygame播放声音文件"""
-    # 打印声音文件信息
-    print(f"尝试播放声音文件: {sound_file}")
-    print(f"文件存在检查: {os.path.exists(sound_file)}")
-    
-    if not os.path.exists(sound_file):
-        print(f"警告: 声音文件 '{sound_file}' 未找到")
-        return False
-    
-    # 使用 pygame 播放声音
-    if pygame_available:
-        try:
-            def play_with_pygame():
-                try:
-                    pygame.mixer.music.load(sound_file)
-                    pygame.mixer.music.play()
-                    print("使用 pygame 播放声音成功")
-                except Exception as e:
-                    print(f"pygame 播放声音出错: {e}")
-            
-            sound_thread = threading.Thread(target=play_with_pygame, daemon=True)
-            sound_thread.start()
-            return True
-        except Exception as e:
-            print(f"尝试使用 pygame 时出错: {e}")
-    
-    print("警告: 无法播放声音，pygame不可用")
-    return False
+
+# sv_ttk、pygame、PIL 和 pystray 都改为首次使用时再导入，缩短启动时间
+from tigan_core.config import DEFAULT_MESSAGES, messages_to_text, parse_messages_text
+from tigan_core.countdown import Countdown
+from tigan_core.log import setup_logging
+from tigan_core.metrics import start_metrics_server
+from tigan_core.profiling import configure as configure_profiling, profiled
+from tigan_core.reminder import ReminderCore
+from tigan_core.resources import CONFIG_FILE, RESOURCES, TRAY_ICON_FILE, WINDOW_ICON_FILE
+from tigan_core.stats import format_summary
+from tigan_core.tray import next_change_delay, tray_state
+
+STARTUP.mark("imports")
+
+log = logging.getLogger("tigan_reminder")
+
+# 窗口显示后再创建托盘图标（毫秒）
+TRAY_SETUP_DELAY_MS = 200
+
+
+def set_theme(theme):
+    """应用Sun Valley主题，首次调用时才导入 sv_ttk"""
+    import sv_ttk
+    sv_ttk.set_theme(theme)
+
+
+class CountdownWindow:
+    """可复用的倒计时提醒窗口
+
+    Toplevel 和其中的控件只创建一次，平时保持隐藏；每次提醒只更新文字和进度条后显示，
+    不再重复创建样式、图标、控件和计算窗口位置。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.window = None
+        self.theme = None
+        self.last_show_duration = None  # 最近一次 show() 的耗时（秒），用于分析弹窗延迟
+
+    def exists(self):
+        return self.window is not None and self.window.winfo_exists()
+
+    def build(self):
+        """创建窗口（已创建时直接返回），创建后保持隐藏"""
+        if self.exists():
+            return self.window
+
+        window = tk.Toplevel(self.app.master)
+        window.title("提肛提醒！")
+        
+        # 先隐藏窗口，设置好位置后再显示
+        window.withdraw()
+        
+        # 设置窗口大小
+        window.geometry("350x300")  # 增加窗口高度以容纳进度条
+        # 关闭按钮只隐藏窗口，保留以便下次复用
+        window.protocol("WM_DELETE_WINDOW", self.app.close_countdown)
+        self.window = window
+        
+        # 为子窗口也应用Sun Valley主题
+        self.apply_theme(self.app.current_theme)
+        # 窗口图标使用主窗口设置的默认图标，创建窗口时不再访问文件系统
+        
+        # 创建主框架
+        countdown_frame = ttk.Frame(window, padding="20 15 20 15")
+        countdown_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 提示信息
+        self.message_label = ttk.Label(countdown_frame, text="", wraplength=300, font=("", 12))
+        self.message_label.pack(pady=15)
+        
+        # 倒计时显示
+        self.countdown_label = ttk.Label(countdown_frame, text="", font=("", 14, "bold"))
+        self.countdown_label.pack(pady=10)
+        
+        # 添加进度条
+        self.progress_var = tk.DoubleVar(value=100)
+        self.progress_bar = ttk.Progressbar(countdown_frame, variable=self.progress_var, maximum=100, mode='determinate')
+        self.progress_bar.pack(fill=tk.X, pady=10)
+        
+        # 完成按钮
+        self.complete_btn = ttk.Button(countdown_frame, text="完成", command=self.app.close_countdown, state=tk.DISABLED, width=15)
+        self.complete_btn.pack(pady=10)
+        
+        # 窗口位置只需计算一次
+        self.app.center_window(window)
+        window.attributes('-topmost', True)
+        return window
+
+    def prewarm(self):
+        """在下一次提醒前预先创建窗口并完成布局"""
+        self.build().update_idletasks()
+
+    def apply_theme(self, theme):
+        """为窗口应用Sun Valley主题，主题未变化时不做任何事"""
+        if self.window is None or theme == self.theme:
+            return
+        # 注意：sv_ttk.set_theme()不能直接用于Toplevel窗口，需要使用style参数
+        style = ttk.Style(self.window)
+        if theme == "dark":
+            style.theme_use("sun-valley-dark")
+        else:
+            style.theme_use("sun-valley-light")
+        self.theme = theme
+
+    def show(self, msg, seconds, title=None):
+        """更新提示语、倒计时和进度条后显示窗口"""
+        begin = time.perf_counter()
+        window = self.build()
+        self.apply_theme(self.app.current_theme)
+        window.title(title or "提肛提醒！")
+        self.message_label.config(text=msg)
+        self.countdown_label.config(text=f"倒计时: {seconds} 秒")
+        self.progress_var.set(100)
+        self.complete_btn.config(state=tk.DISABLED)
+        window.deiconify()
+        # 窗口焦点和置顶
+        window.lift()
+        window.focus_force()
+        self.last_show_duration = time.perf_counter() - begin
+
+    def hide(self):
+        if self.exists():
+            self.window.withdraw()
 
 
 class TiganReminderApp:
+    @profiled("startup")
     def __init__(self, master):
         self.master = master
         self.master.title("提肛提醒器 🍑")
         
         # 应用Sun Valley主题
         self.current_theme = "dark"  # 默认使用深色主题
-        sv_ttk.set_theme(self.current_theme)
+        set_theme(self.current_theme)
+        STARTUP.mark("theme")
 
-        # 设置窗口图标 (.ico)
+        # 设置窗口图标 (.ico)，default 使之后创建的子窗口也使用这个图标
         try:
-            # 检查窗口图标文件是否存在
-            if os.path.exists(WINDOW_ICON_FILE):
+            # 是否存在取自启动时解析的资源清单
+            if RESOURCES.exists("icon.ico"):
                 self.master.iconbitmap(WINDOW_ICON_FILE)
+                self.master.iconbitmap(default=WINDOW_ICON_FILE)
             else:
-                print(f"警告: 窗口图标文件 '{WINDOW_ICON_FILE}' 未找到。")
+                log.warning("窗口图标文件 '%s' 未找到。", WINDOW_ICON_FILE)
         except tk.TclError:
              # TclError 通常发生在文件格式不正确或路径有问题时
-             print(f"警告: 无法加载窗口图标 '{WINDOW_ICON_FILE}'。确保文件是有效的 .ico 格式且路径正确。")
+             log.warning("无法加载窗口图标 '%s'。确保文件是有效的 .ico 格式且路径正确。", WINDOW_ICON_FILE)
         except Exception as e:
-             print(f"加载窗口图标 '{WINDOW_ICON_FILE}' 时发生未知错误: {e}")
+             log.error("加载窗口图标 '%s' 时发生未知错误: %s", WINDOW_ICON_FILE, e)
 
         # 先隐藏窗口，设置好位置后再显示
         # self.master.withdraw()
@@ -159,19 +178,29 @@ class TiganReminderApp:
         # self.master.deiconify()
 
         self.master.protocol("WM_DELETE_WINDOW", self.hide_window)
+        self.exit_code = 0  # 主循环结束后的进程退出状态码
 
         self.interval = tk.IntVar(value=60)
-        self.running = False
-        self.thread = None
+        # 调度、配置、提示语选择和提示音都由与界面无关的核心负责
+        self.core = ReminderCore(on_reminder=self.show_reminder, on_prewarm=self.prewarm_reminder,
+                                 on_save_error=self.on_save_error, on_config_change=self.on_config_change)
         self.countdown_time = tk.IntVar(value=60)  # 默认倒计时1分钟（60秒）
-        self.countdown_window = None
+        # 倒计时窗口只创建一次，之后每次提醒复用
+        self.countdown = CountdownWindow(self)
         self.countdown_running = False
+        self.countdown_session = None
+        self.countdown_profile = None
+        self.last_countdown_report = None  # 最近一次完整倒计时的漂移统计
+        self._countdown_after_id = None
         self.auto_start = tk.BooleanVar(value=False)
         self.minimize_to_tray_on_start = tk.BooleanVar(value=False)
         
         # 不再使用 trace_add，改为在UI操作时直接保存
 
-        self.messages = self.load_messages()
+        self.load_messages()
+        # 配置文件被外部修改时自动应用，不重建界面也不重启计时
+        self.core.watch_config()
+        STARTUP.mark("config")
 
         # 创建主框架
         main_frame = ttk.Frame(master, padding="20 10 20 10")
@@ -239,131 +268,78 @@ class TiganReminderApp:
         self.theme_btn = ttk.Button(edit_frame, text="切换主题", command=self.toggle_theme, width=15)
         self.theme_btn.pack(side=tk.LEFT, padx=5, expand=True)
         
-        # 关于按钮
-        self.author_btn = ttk.Button(main_frame, text="关于作者", command=self.show_author_info, width=15)
-        self.author_btn.pack(pady=(15, 5))
-
-        self.setup_tray_icon()
+        # 统计和关于按钮放在同一行
+        info_frame = ttk.Frame(main_frame)
+        info_frame.pack(fill=tk.X, pady=(15, 5))
+        self.stats_btn = ttk.Button(info_frame, text="打卡统计", command=self.show_stats, width=15)
+        self.stats_btn.pack(side=tk.LEFT, padx=5, expand=True)
+        self.author_btn = ttk.Button(info_frame, text="关于作者", command=self.show_author_info, width=15)
+        self.author_btn.pack(side=tk.LEFT, padx=5, expand=True)
+
+        STARTUP.mark("widgets")
+
+        # 托盘图标在窗口显示之后再创建，PIL 和 pystray 也在那时才导入
+        self.icon = None
+        # 托盘图标缓存、当前显示的状态和刷新徽标的计划
+        self.tray_icons = None
+        self._tray_state = None
+        self._tray_schedule = None
+        self._tray_lock = threading.Lock()
+        self.master.after(TRAY_SETUP_DELAY_MS, self.setup_tray_icon)
 
         # 检查是否需要自动开始
         self.master.after(1000, self.check_auto_start)
 
+    @property
+    def running(self):
+        return self.core.running
+
+    @property
+    def messages(self):
+        return self.core.messages
+
+    @messages.setter
+    def messages(self, messages):
+        self.core.messages = messages
+
     def load_messages(self):
-        print(f"尝试加载配置文件: {CONFIG_FILE}")
-        if not os.path.exists(CONFIG_FILE):
-            print("配置文件不存在，创建默认配置")
-            try:
-                config = DEFAULT_CONFIG.copy()
-                config["theme"] = self.current_theme
-                with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-                    json.dump(config, f, indent=2, ensure_ascii=False)
-                self.auto_start.set(config["auto_start"])
-                self.minimize_to_tray_on_start.set(config["minimize_to_tray_on_start"])
-                print(f"默认配置已创建，自动开始: {config['auto_start']}, 最小化托盘: {config['minimize_to_tray_on_start']}, 主题: {config['theme']}")
-                return config["messages"]
-            except Exception as e:
-                print(f"错误: 无法创建或写入默认配置文件 '{CONFIG_FILE}': {e}")
-                self.auto_start.set(DEFAULT_CONFIG["auto_start"])
-                self.minimize_to_tray_on_start.set(DEFAULT_CONFIG["minimize_to_tray_on_start"])
-                return DEFAULT_CONFIG["messages"] # 返回默认值，即使创建失败
-        else:
-            try:
-                with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    print(f"配置文件内容: {content}")
-                    if not content.strip():
-                         raise json.JSONDecodeError("File is empty or contains only whitespace", content, 0)
-                    loaded_config = json.loads(content)
-                    print(f"加载的配置: {loaded_config}")
-                    # 确保加载的是字典且包含所需字段
-                    if isinstance(loaded_config, dict):
-                        # 兼容旧版本只保存消息的配置文件
-                        if "messages" in loaded_config:
-                            messages = loaded_config["messages"]
-                        else:
-                            messages = loaded_config if isinstance(loaded_config, list) else DEFAULT_CONFIG["messages"]
-                        
-                        # 设置自动开始选项
-                        auto_start = loaded_config.get("auto_start", DEFAULT_CONFIG["auto_start"])
-                        self.auto_start.set(auto_start)
-                        
-                        # 设置启动时最小化选项
-                        minimize = loaded_config.get("minimize_to_tray_on_start", DEFAULT_CONFIG["minimize_to_tray_on_start"])
-                        self.minimize_to_tray_on_start.set(minimize)
-                        
-                        # 设置主题
-                        theme = loaded_config.get("theme", "dark")
-                        self.current_theme = theme
-                        sv_ttk.set_theme(self.current_theme)
-                        
-                        print(f"配置已加载，自动开始: {auto_start}, 最小化托盘: {minimize}, 主题: {theme}")
-                        
-                        # 确保消息是列表且不为空
-                        if isinstance(messages, list) and messages:
-                            return messages
-                        else:
-                            print(f"警告: 配置文件中的消息不是有效的非空列表。将使用默认提示语。")
-                            raise json.JSONDecodeError("Messages content is not a non-empty list", content, 0)
-                    else:
-                        # 兼容旧版本只保存消息列表的配置文件
-                        if isinstance(loaded_config, list) and loaded_config:
-                            print("检测到旧版配置文件格式，正在升级...")
-                            self.auto_start.set(DEFAULT_CONFIG["auto_start"])
-                            self.minimize_to_tray_on_start.set(DEFAULT_CONFIG["minimize_to_tray_on_start"])
-                            self.current_theme = "dark"
-                            sv_ttk.set_theme(self.current_theme)
-                            return loaded_config
-                        else:
-                            print(f"警告: '{CONFIG_FILE}' 内容不是有效的配置格式。将使用默认配置。")
-                            raise json.JSONDecodeError("Content is not a valid config format", content, 0)
-
-            except json.JSONDecodeError as e:
-                print(f"警告: 无法加载 {CONFIG_FILE} ({e})。将使用默认配置并尝试重置文件。")
-                try:
-                    config = DEFAULT_CONFIG.copy()
-                    config["theme"] = self.current_theme
-                    with open(CONFIG_FILE, "w", encoding="utf-8") as f_reset:
-                        json.dump(config, f_reset, indent=2, ensure_ascii=False)
-                    self.auto_start.set(DEFAULT_CONFIG["auto_start"])
-                    self.minimize_to_tray_on_start.set(DEFAULT_CONFIG["minimize_to_tray_on_start"])
-                    return DEFAULT_CONFIG["messages"]
-                except OSError as e_reset:
-                     print(f"错误: 无法重置 {CONFIG_FILE}: {e_reset}。将使用默认配置。")
-                     self.auto_start.set(DEFAULT_CONFIG["auto_start"])
-                     self.minimize_to_tray_on_start.set(DEFAULT_CONFIG["minimize_to_tray_on_start"])
-                     return DEFAULT_CONFIG["messages"]
-            except Exception as e:
-                 print(f"错误: 读取 {CONFIG_FILE} 时发生未知错误: {e}。将使用默认配置。")
-                 self.auto_start.set(DEFAULT_CONFIG["auto_start"])
-                 self.minimize_to_tray_on_start.set(DEFAULT_CONFIG["minimize_to_tray_on_start"])
-                 return DEFAULT_CONFIG["messages"]
-
-    def save_messages(self):
-        try:
-            # 在保存前确保 self.messages 是一个列表
-            if not isinstance(self.messages, list):
-                print(f"错误: 尝试保存非列表类型的消息: {type(self.messages)}。将使用默认消息覆盖。")
-                self.messages = DEFAULT_MESSAGES # 重置为默认值以防万一
-            elif not self.messages: # 确保列表不为空，如果为空则可能使用默认值（或保持空，取决于需求）
-                print("警告: 尝试保存空的消息列表。")
-                # 如果不允许保存空列表，可以在这里阻止或重置
-                # self.messages = DEFAULT_MESSAGES
-
-            config = {
-                "messages": self.messages,
-                "auto_start": self.auto_start.get(),
-                "minimize_to_tray_on_start": self.minimize_to_tray_on_start.get(),
-                "theme": self.current_theme
-            }
-            
-            print(f"正在保存配置: {config}")
-            with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
-            print("配置已成功保存")
-            # messagebox.showinfo("成功", "提示语已保存。") # 可以考虑添加成功提示
-        except Exception as e:
-             print(f"错误: 无法保存配置到 {CONFIG_FILE}: {e}")
-             messagebox.showerror("保存错误", f"无法保存配置到 {CONFIG_FILE}: {e}", parent=self.master)
+        """通过核心加载配置，并同步到界面变量和主题"""
+        config = self.core.load_config()
+        self.auto_start.set(config["auto_start"])
+        self.minimize_to_tray_on_start.set(config["minimize_to_tray_on_start"])
+        if config["theme"] != self.current_theme:
+            self.current_theme = config["theme"]
+            set_theme(self.current_theme)
+        return config["messages"]
+
+    def save_messages(self, on_saved=None):
+        """提交配置，由后台线程合并短时间内的多次修改后写入，界面线程不等待磁盘 I/O"""
+        self.core.save_config(
+            on_saved=on_saved,
+            auto_start=self.auto_start.get(),
+            minimize_to_tray_on_start=self.minimize_to_tray_on_start.get(),
+            theme=self.current_theme,
+        )
+
+    def on_config_change(self, changed):
+        """核心检测到配置文件被外部修改时在计时线程中调用，切换到主线程应用"""
+        self.master.after(0, lambda: self.apply_config_changes(changed))
+
+    def apply_config_changes(self, changed):
+        """只应用发生变化的字段；提示语由核心直接使用，无需处理"""
+        if "auto_start" in changed:
+            self.auto_start.set(changed["auto_start"])
+        if "minimize_to_tray_on_start" in changed:
+            self.minimize_to_tray_on_start.set(changed["minimize_to_tray_on_start"])
+        if "theme" in changed and changed["theme"] != self.current_theme:
+            self.current_theme = changed["theme"]
+            set_theme(self.current_theme)
+            self.countdown.apply_theme(self.current_theme)
+
+    def on_save_error(self, error):
+        """后台保存配置失败时调用，切换到主线程显示错误"""
+        self.master.after(0, lambda: messagebox.showerror(
+            "保存错误", f"无法保存配置到 {CONFIG_FILE}: {error}", parent=self.master))
              
     def edit_messages(self):
         """编辑提示语，使用列表样式显示"""
@@ -388,12 +364,7 @@ class TiganReminderApp:
         else:
             style.theme_use("sun-valley-light")
         
-        # 设置窗口图标
-        try:
-            if os.path.exists(WINDOW_ICON_FILE):
-                edit_window.iconbitmap(WINDOW_ICON_FILE)
-        except Exception as e:
-            print(f"设置编辑窗口图标时出错: {e}")
+        # 窗口图标使用主窗口设置的默认图标
         
         # 创建主框架
         main_frame = ttk.Frame(edit_window, padding="10 10 10 10")
@@ -419,7 +390,7 @@ class TiganReminderApp:
         scrollbar.config(command=text_widget.yview)
         
         # 填充当前提示语
-        text_widget.insert(tk.END, "\n".join(current_messages))
+        text_widget.insert(tk.END, messages_to_text(current_messages))
         
         # 添加自动开始和最小化选项
         options_frame = ttk.LabelFrame(main_frame, text="启动选项", padding="10 5 10 5")
@@ -447,13 +418,13 @@ class TiganReminderApp:
         
         # 保存按钮
         def save_messages_func():
-            new_text = text_widget.get("1.0", tk.END).strip()
-            potential_messages = [line.strip() for line in new_text.splitlines() if line.strip()]
+            potential_messages = parse_messages_text(text_widget.get("1.0", tk.END))
             if potential_messages:
                 self.messages = potential_messages
-                self.save_messages()
+                # 后台线程写入成功后再切换到主线程提示；写入失败时 on_save_error 会显示错误
+                self.save_messages(on_saved=lambda: self.master.after(0, lambda: messagebox.showinfo(
+                    "成功", "提示语和设置已保存", parent=self.master)))
                 edit_window.destroy()
-                messagebox.showinfo("成功", "提示语和设置已保存", parent=self.master)
             else:
                 messagebox.showwarning("编辑提示", "提示语列表不能为空", parent=edit_window)
         
@@ -467,7 +438,7 @@ class TiganReminderApp:
         # 添加默认提示语按钮
         def add_default_messages():
             text_widget.delete("1.0", tk.END)
-            text_widget.insert(tk.END, "\n".join(DEFAULT_MESSAGES))
+            text_widget.insert(tk.END, messages_to_text(DEFAULT_MESSAGES))
         
         default_btn = ttk.Button(button_frame, text="恢复默认", command=add_default_messages, width=15)
         default_btn.pack(side=tk.LEFT, padx=5)
@@ -506,186 +477,121 @@ class TiganReminderApp:
                 messagebox.showerror("错误", "请输入有效的整数作为提醒间隔。", parent=self.master)
                 return
 
-            self.running = True
+            self.core.start(interval_value)
+            self.update_tray_badge()
             self.status_label.config(text="状态：运行中")
             self.start_btn.config(state=tk.DISABLED)
             self.stop_btn.config(state=tk.NORMAL)
             self.interval_entry.config(state=tk.DISABLED)
             self.edit_btn.config(state=tk.DISABLED)
-            # 确保旧线程不存在或已结束
-            if self.thread and self.thread.is_alive():
-                print("警告: 尝试启动计时器时，发现旧线程仍在运行。")
-                # 可以选择等待旧线程结束，但这可能不符合用户预期
-                # self.thread.join(timeout=0.5)
-            self.thread = threading.Thread(target=self.run_timer, daemon=True)
-            self.thread.start()
 
 
     def stop_timer(self):
         if self.running:
-            self.running = False
-            # 不需要手动等待线程，因为 run_timer 内部循环会检查 self.running
+            # 取消计划即可，无需等待下一秒的轮询
+            self.core.stop()
+            self.update_tray_badge()
             self.status_label.config(text="状态：已停止")
             self.start_btn.config(state=tk.NORMAL)
             self.stop_btn.config(state=tk.DISABLED)
             self.interval_entry.config(state=tk.NORMAL)
             self.edit_btn.config(state=tk.NORMAL)
-            print("计时器已停止。")
-
 
-    def run_timer(self):
-        print("计时器线程开始运行...")
-        while self.running:
-            interval_minutes = 60 # 默认值
-            try:
-                interval_minutes = int(self.interval.get())
-                if interval_minutes <= 0:
-                    print(f"警告: 无效的间隔值 {interval_minutes}，使用默认值 60 分钟。")
-                    interval_minutes = 60
-            except ValueError:
-                print(f"警告: 无法解析间隔输入，使用默认值 60 分钟。")
-                interval_minutes = 60 # 出错时使用默认值
-
-            # 等待指定分钟数，每秒检查一次 self.running 状态
-            sleep_seconds = interval_minutes * 60
-            for i in range(sleep_seconds):
-                if not self.running:
-                    print("计时器线程检测到停止标志，退出等待。")
-                    return # 提前退出循环和线程
-                time.sleep(1)
-                # 可以在这里添加调试打印，例如打印剩余秒数
-                # if (sleep_seconds - i) % 60 == 0:
-                #     print(f"计时器剩余 {(sleep_seconds - i) // 60} 分钟...")
-
-            # 只有在完成整个等待周期且仍然是 running 状态时才显示提醒
-            if self.running:
-                print("计时器时间到，准备显示提醒...")
-                self.show_reminder()
-            else:
-                # 如果在最后一次 sleep 后 running 变为 False，则不显示
-                print("计时器时间到，但状态已变为停止，不显示提醒。")
-        print("计时器线程正常结束。")
-
-
-    def show_reminder(self):
-        try:
-            # 使用简化的 play_sound 函数
-            if pygame_available:
-                play_sound(SOUND_FILE)
-            else:
-                print(f"警告: 无法播放声音，pygame不可用")
-        except Exception as e:
-            print(f"播放声音 '{SOUND_FILE}' 时出错: {e}")
 
-        # 确保 self.messages 是列表且不为空
-        valid_messages = self.messages if isinstance(self.messages, list) and self.messages else DEFAULT_MESSAGES
-        msg = random.choice(valid_messages)
+    def prewarm_reminder(self):
+        """下一次提醒前由计时线程调用，在主线程中预先准备倒计时窗口"""
+        self.master.after(0, self.countdown.prewarm)
 
+    def show_reminder(self, msg, profile=None):
+        """核心选好提示语后在计时线程中调用，切换到主线程显示提醒"""
         # 使用 after 确保在主线程中调用 messagebox
-        self.master.after(0, lambda m=msg: self.show_reminder_with_countdown(m))
+        self.master.after(0, lambda m=msg, p=profile: self.show_reminder_with_countdown(m, p))
     
-    def show_reminder_with_countdown(self, msg):
-        """显示带有倒计时的提醒框"""
-        if self.countdown_window and self.countdown_window.winfo_exists():
-            self.countdown_window.destroy()  # 确保没有多个倒计时窗口
-        
-        self.countdown_window = tk.Toplevel(self.master)
-        self.countdown_window.title("提肛提醒！")
-        
-        # 先隐藏窗口，设置好位置后再显示
-        self.countdown_window.withdraw()
-        
-        # 设置窗口大小
-        self.countdown_window.geometry("350x300")  # 增加窗口高度以容纳进度条
-        self.countdown_running = True
-        
-        # 为子窗口也应用Sun Valley主题
-        # 注意：sv_ttk.set_theme()不能直接用于Toplevel窗口，需要使用style参数
-        style = ttk.Style(self.countdown_window)
-        if self.current_theme == "dark":
-            style.theme_use("sun-valley-dark")
+    @profiled("show_reminder")
+    def show_reminder_with_countdown(self, msg, profile=None):
+        """显示带有倒计时的提醒框，额外的提醒配置使用自己的倒计时和名称"""
+        # 取消上一次倒计时尚未执行的回调，确保只有一个倒计时在运行
+        self.cancel_countdown_callback()
+        if self.countdown_running:
+            # 上一次倒计时还没结束就被新的提醒替换
+            self.record_countdown(False)
+        self.countdown_profile = profile
+        
+        if profile is not None:
+            countdown_seconds = profile.countdown
         else:
-            style.theme_use("sun-valley-light")
-        
-        try:
-            # 设置窗口图标（如果有）
-            if os.path.exists(WINDOW_ICON_FILE):
-                self.countdown_window.iconbitmap(WINDOW_ICON_FILE)
-        except Exception as e:
-            print(f"设置倒计时窗口图标时出错: {e}")
-        
-        # 创建主框架
-        countdown_frame = ttk.Frame(self.countdown_window, padding="20 15 20 15")
-        countdown_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # 提示信息
-        message_label = ttk.Label(countdown_frame, text=msg, wraplength=300, font=("", 12))
-        message_label.pack(pady=15)
-        
-        # 获取当前设置的倒计时时间
-        try:
-            countdown_seconds = int(self.countdown_time.get())
-            if countdown_seconds <= 0:
+            # 获取当前设置的倒计时时间
+            try:
+                countdown_seconds = int(self.countdown_time.get())
+                if countdown_seconds <= 0:
+                    countdown_seconds = 60  # 默认为60秒
+            except:
                 countdown_seconds = 60  # 默认为60秒
-        except:
-            countdown_seconds = 60  # 默认为60秒
-            
-        # 倒计时显示
-        self.countdown_label = ttk.Label(countdown_frame, text=f"倒计时: {countdown_seconds} 秒", font=("", 14, "bold"))
-        self.countdown_label.pack(pady=10)
-        
-        # 添加进度条
-        self.progress_var = tk.DoubleVar(value=100)
-        self.progress_bar = ttk.Progressbar(countdown_frame, variable=self.progress_var, maximum=100, mode='determinate')
-        self.progress_bar.pack(fill=tk.X, pady=10)
-        
-        # 完成按钮
-        self.complete_btn = ttk.Button(countdown_frame, text="完成", command=self.close_countdown, state=tk.DISABLED, width=15)
-        self.complete_btn.pack(pady=10)
         
-        # 窗口居中显示
-        self.center_window(self.countdown_window)
-        
-        # 显示窗口
-        self.countdown_window.deiconify()
+        self.countdown_running = True
+        self.countdown.show(msg, countdown_seconds, f"{profile.name}！" if profile is not None else None)
         
         # 开始倒计时
         self.start_countdown(countdown_seconds)
         
-        # 窗口焦点和置顶
-        self.countdown_window.focus_force()
-        self.countdown_window.lift()
-        self.countdown_window.attributes('-topmost', True)
-        
     def start_countdown(self, seconds):
-        """开始倒计时"""
-        if not self.countdown_running or not self.countdown_window or not self.countdown_window.winfo_exists():
+        """开始倒计时，剩余时间由固定的结束时间计算，不会因回调延迟而越走越慢"""
+        self.countdown_session = Countdown(seconds)
+        self.update_countdown()
+
+    def update_countdown(self):
+        """刷新倒计时显示，并把下一次刷新安排在下一个整秒边界"""
+        session = self.countdown_session
+        if not self.countdown_running or session is None or not self.countdown.exists():
             return
             
+        seconds = session.tick()
         if seconds > 0:
-            self.countdown_label.config(text=f"倒计时: {seconds} 秒")
+            self.countdown.countdown_label.config(text=f"倒计时: {seconds} 秒")
             # 更新进度条
-            progress_value = (seconds / int(self.countdown_time.get())) * 100
-            self.progress_var.set(progress_value)
-            self.countdown_window.after(1000, lambda: self.start_countdown(seconds-1))
+            self.countdown.progress_var.set(session.progress())
+            self._countdown_after_id = self.countdown.window.after(session.next_tick_ms(), self.update_countdown)
         else:
-            self.countdown_label.config(text="完成！可以继续工作了")
-            self.progress_var.set(0)  # 进度条归零
-            self.complete_btn.config(state=tk.NORMAL)
+            self.last_countdown_report = session.finish()
+            self.record_countdown(True)
+            log.debug("倒计时结束，漂移 %.1f ms，单次刷新最大延迟 %.1f ms",
+                      self.last_countdown_report["drift"] * 1000, self.last_countdown_report["max_tick_lateness"] * 1000)
+            self.countdown.countdown_label.config(text="完成！可以继续工作了")
+            self.countdown.progress_var.set(0)  # 进度条归零
+            self.countdown.complete_btn.config(state=tk.NORMAL)
             self.countdown_running = False
             # 倒计时结束后5秒自动关闭窗口
-            self.countdown_window.after(5000, self.close_countdown)
+            self._countdown_after_id = self.countdown.window.after(5000, self.close_countdown)
     
+    def cancel_countdown_callback(self):
+        """取消尚未执行的倒计时或自动关闭回调"""
+        if self._countdown_after_id is not None:
+            try:
+                self.master.after_cancel(self._countdown_after_id)
+            except tk.TclError:
+                pass
+            self._countdown_after_id = None
+
+    def record_countdown(self, completed):
+        """把本次倒计时的结果写入提醒历史，每次倒计时只记录一次"""
+        session, self.countdown_session = self.countdown_session, None
+        if session is not None:
+            drift = self.last_countdown_report["drift"] if completed else None
+            self.core.record_countdown(self.countdown_profile, session.duration, session.elapsed(), completed, drift)
+
     def close_countdown(self):
-        """关闭倒计时窗口"""
+        """关闭倒计时窗口（隐藏以便下次复用）"""
+        if self.countdown_running:
+            # 倒计时结束前就点了关闭
+            self.record_countdown(False)
         self.countdown_running = False
-        if self.countdown_window and self.countdown_window.winfo_exists():
-            self.countdown_window.destroy()
+        self.cancel_countdown_callback()
+        self.countdown.hide()
 
 
     def hide_window(self):
         self.master.withdraw()
-        print("窗口已隐藏到托盘。")
+        log.debug("窗口已隐藏到托盘。")
         # 可以选择在这里显示一个托盘通知
         # if self.icon and hasattr(self.icon, 'notify'):
         #     self.icon.notify("程序仍在后台运行", "提肛提醒器")
@@ -695,12 +601,11 @@ class TiganReminderApp:
         self.master.after(0, self.master.deiconify)
         self.master.after(10, self.master.lift)
         self.master.after(20, self.master.focus_force)
-        print("窗口已显示。")
+        log.debug("窗口已显示。")
 
 
     def exit_app(self, icon=None, item=None):
-        print("开始退出应用程序...")
-        self.running = False # 确保计时器线程会停止
+        log.info("开始退出应用程序...")
 
         # 停止托盘图标（如果存在且正在运行）
         # 需要注意：直接在 pystray 的菜单回调中调用 icon.stop() 可能导致死锁或异常
@@ -708,46 +613,85 @@ class TiganReminderApp:
         # 或者使用 pystray 提供的 icon.stop 方法，但确保它在合适的线程中被调用
         # 这里尝试直接调用，但要注意潜在风险
         if icon and hasattr(icon, 'stop') and icon.visible:
-             print("正在停止托盘图标...")
+             log.debug("正在停止托盘图标...")
              try:
                  icon.stop()
-                 print("托盘图标已停止。")
+                 log.debug("托盘图标已停止。")
              except Exception as e:
-                 print(f"停止托盘图标时发生错误: {e}") # 记录错误但继续退出流程
+                 log.error("停止托盘图标时发生错误: %s", e) # 记录错误但继续退出流程
         else:
-             print("托盘图标不存在或已停止。")
+             log.debug("托盘图标不存在或已停止。")
 
 
-        # 尝试等待计时器线程结束（可选，设置较短超时）
-        if self.thread and self.thread.is_alive():
-            print("等待计时器线程结束...")
-            self.thread.join(timeout=0.5) # 等待最多 0.5 秒
-            if self.thread.is_alive():
-                print("警告: 计时器线程未能在超时内结束。")
+        if self.countdown_running:
+            self.record_countdown(False)
+        # 停止提醒并等待计时线程结束（设置较短超时）
+        log.debug("等待计时器线程结束...")
+        self.core.shutdown(timeout=0.5)
 
 
-        print("销毁主窗口...")
+        log.debug("销毁主窗口...")
         try:
             self.master.destroy()
-            print("主窗口已销毁。")
+            log.debug("主窗口已销毁。")
         except tk.TclError as e:
-            print(f"销毁主窗口时发生 TclError (可能窗口已关闭): {e}")
+            log.warning("销毁主窗口时发生 TclError (可能窗口已关闭): %s", e)
         except Exception as e:
-            print(f"销毁主窗口时发生未知错误: {e}")
+            log.error("销毁主窗口时发生未知错误: %s", e)
 
-        print("退出进程...")
+        log.info("退出进程...")
         sys.exit(0) # 明确以状态码 0 退出
 
 
+    def update_tray_badge(self, schedule=None):
+        """按提醒状态切换托盘图标，只在显示的状态变化时替换图像
+
+        运行中时在徽标上的分钟数变化的时刻再次检查（在计时线程中执行），暂停时不再检查。
+        """
+        if self.tray_icons is None or self.icon is None:
+            return
+        # 界面线程（开始/停止）和计时线程都会调用
+        with self._tray_lock:
+            remaining = self.core.time_to_next()
+            state = tray_state(remaining)
+            if state != self._tray_state:
+                self._tray_state = state
+                # 图像都已预先合成，这里只替换引用
+                self.icon.icon = self.tray_icons.get(state)
+                self.icon.title = f"提肛提醒器 🍑 - {state[1]} 分钟后提醒" if state[1] else "提肛提醒器 🍑 - 已暂停"
+            if remaining is None:
+                if self._tray_schedule is not None:
+                    self.core.engine.cancel(self._tray_schedule)
+                    self._tray_schedule = None
+                return
+            delay = next_change_delay(remaining) + 0.05
+            if self._tray_schedule is None:
+                self._tray_schedule = self.core.engine.add(60, self.update_tray_badge, delay=delay, name="tray-badge")
+            else:
+                self.core.engine.reschedule(self._tray_schedule, delay=delay)
+
+    def prerender_tray_icons(self, icon, interval):
+        """托盘线程启动后显示图标，并预先合成间隔内可能用到的全部徽标图像"""
+        icon.visible = True
+        self.tray_icons.prerender(interval)
+        log.debug("托盘图标已预先合成 %d 个", self.tray_icons.renders)
+
     def setup_tray_icon(self):
         self.icon = None # 先初始化为 None
         try:
+            import pystray
+            from tigan_core.tray import TrayIconCache
+
             # 使用 TRAY_ICON_FILE (.png)
-            if not os.path.exists(TRAY_ICON_FILE):
-                 print(f"错误: 托盘图标文件 '{TRAY_ICON_FILE}' 未找到！")
+            icon_data = RESOURCES.read("icon.png")
+            if icon_data is None:
+                 log.error("托盘图标文件 '%s' 未找到！", TRAY_ICON_FILE)
                  return # 没有图标文件，无法设置托盘
 
-            image = Image.open(TRAY_ICON_FILE)
+            # 基础图标只从清单缓存的内容解码一次，各状态的徽标图像由缓存合成
+            self.tray_icons = TrayIconCache(icon_data)
+            self._tray_state = tray_state(self.core.time_to_next())
+            image = self.tray_icons.get(self._tray_state)
             menu = pystray.Menu(
                 pystray.MenuItem("显示窗口", self.show_window, default=True),
                 pystray.MenuItem("切换主题", self.toggle_theme),
@@ -758,14 +702,22 @@ class TiganReminderApp:
             self.icon = pystray.Icon("提肛提醒器", image, "提肛提醒器 🍑", menu)
 
             # 启动托盘图标线程
-            tray_thread = threading.Thread(target=self.icon.run, name="TrayIconThread", daemon=True)
+            try:
+                interval = int(self.interval.get())
+            except (ValueError, tk.TclError):
+                interval = 60
+            tray_thread = threading.Thread(target=self.icon.run,
+                                           args=(lambda icon: self.prerender_tray_icons(icon, interval),),
+                                           name="TrayIconThread", daemon=True)
             tray_thread.start()
-            print("托盘图标线程已启动。")
+            log.debug("托盘图标线程已启动。")
+            # 托盘创建前已经开始计时（自动开始）时，安排徽标刷新
+            self.update_tray_badge()
 
         except FileNotFoundError:
-             print(f"错误: 打开托盘图标文件 '{TRAY_ICON_FILE}' 失败 (FileNotFoundError)。")
+             log.error("打开托盘图标文件 '%s' 失败 (FileNotFoundError)。", TRAY_ICON_FILE)
         except Exception as e:
-             print(f"设置托盘图标时发生错误: {e}")
+             log.error("设置托盘图标时发生错误: %s", e)
              self.icon = None # 确保出错时 self.icon 为 None
 
     def check_auto_start(self):
@@ -775,6 +727,14 @@ class TiganReminderApp:
             if self.minimize_to_tray_on_start.get():
                 self.master.after(2000, self.hide_window)  # 稍微延迟再隐藏到托盘
 
+    def show_stats(self):
+        """显示提醒统计，直接读取增量统计的累计值，不扫描历史"""
+        stats = self.core.load_stats()
+        if stats is None:
+            messagebox.showinfo("打卡统计", "未记录提醒历史。", parent=self.master)
+            return
+        messagebox.showinfo("打卡统计", format_summary(stats.summary()), parent=self.master)
+
     def show_author_info(self):
         """显示作者信息弹窗"""
         author_info = (
@@ -793,19 +753,14 @@ class TiganReminderApp:
             self.current_theme = "dark"
         
         # 应用新主题
-        sv_ttk.set_theme(self.current_theme)
+        set_theme(self.current_theme)
         
         # 如果倒计时窗口存在，也更新其主题
-        if self.countdown_window and self.countdown_window.winfo_exists():
-            style = ttk.Style(self.countdown_window)
-            if self.current_theme == "dark":
-                style.theme_use("sun-valley-dark")
-            else:
-                style.theme_use("sun-valley-light")
+        self.countdown.apply_theme(self.current_theme)
         
         # 保存主题设置
         self.save_messages()
-        print(f"主题已切换为: {self.current_theme} 并已保存")
+        log.info("主题已切换为: %s 并已保存", self.current_theme)
         
     def center_window(self, window):
         """使窗口显示在屏幕右下角"""
@@ -821,9 +776,56 @@ class TiganReminderApp:
         window.geometry('{}x{}+{}+{}'.format(width, height, x, y))
 
 
+def report_startup(root, app, args):
+    """首个窗口显示后输出启动耗时报告，并按需检查预算或直接退出"""
+    STARTUP.mark("first_window")
+    if args.startup_report is not None:
+        print(STARTUP.format())
+        if args.startup_report:
+            STARTUP.write_json(args.startup_report)
+    if not STARTUP.within_budget(args.startup_budget):
+        log.warning("启动耗时 %.1f ms 超出预算 %.1f ms", STARTUP.total() * 1000, args.startup_budget)
+        app.exit_code = 1
+    if args.exit_after_startup:
+        app.core.shutdown()
+        root.destroy()
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="提肛提醒器")
+    # 带 --headless 时在文件开头已经转交给无界面入口，这里只为了出现在帮助中
+    parser.add_argument("--headless", action="store_true", help="无界面运行，不导入 tkinter，也不创建 Tk 窗口")
+    parser.add_argument("--startup-report", nargs="?", const="", default=None, metavar="JSON",
+                        help="首个窗口显示后打印启动各阶段耗时，可选写入 JSON 文件")
+    parser.add_argument("--startup-budget", type=float, default=None, metavar="MS",
+                        help="启动耗时预算（毫秒），超出时给出警告并以状态码 1 退出")
+    parser.add_argument("--exit-after-startup", action="store_true", help="首个窗口显示后立即退出，用于测量冷启动")
+    parser.add_argument("--log-level", default=None,
+                        help="日志级别：debug、info、warning 或 error（默认读取 TIGAN_LOG_LEVEL，否则为 info）")
+    parser.add_argument("--perf-profile", nargs="?", const="all", default=None, metavar="SECTIONS",
+                        help="剖析启动、加载、提醒显示和保存配置，可指定逗号分隔的代码段（默认读取 TIGAN_PERF_PROFILE）")
+    parser.add_argument("--metrics-port", default=None, metavar="PORT",
+                        help="在 127.0.0.1 的该端口提供 Prometheus 指标（默认读取 TIGAN_METRICS_PORT）")
+    args = parser.parse_args()
+
+    try:
+        setup_logging(args.log_level)
+        configure_profiling(args.perf_profile)
+        metrics_server = start_metrics_server(args.metrics_port)
+    except ValueError as e:
+        parser.error(str(e))
+    STARTUP.mark("logging")
+
     root = tk.Tk()
+    STARTUP.mark("tk_root")
     app = TiganReminderApp(root)
+
+    def on_first_map(event):
+        if event.widget is root:
+            root.unbind("<Map>")
+            report_startup(root, app, args)
+
+    root.bind("<Map>", on_first_map)
     # 检查托盘图标是否成功启动，如果失败，可能需要确保主窗口可见
     # if not app.icon:
     #    print("警告: 未能成功初始化托盘图标。确保主窗口可见。")
@@ -837,11 +839,14 @@ if __name__ == "__main__":
     try:
         root.mainloop()
     except KeyboardInterrupt:
-        print("\n检测到 Ctrl+C，正在退出...")
+        log.info("检测到 Ctrl+C，正在退出...")
         # 尝试优雅退出
         if app:
             app.exit_app(app.icon) # 传递 icon 对象
         else:
             sys.exit(1) # 如果 app 都没初始化成功，直接退出
     finally:
-        print("应用程序主循环结束。")
+        log.info("应用程序主循环结束。")
+        if metrics_server is not None:
+            metrics_server.stop()
+    sys.exit(app.exit_code)